@@ -9,6 +9,7 @@ from .datastructures import UploadFile as UploadFile
 from .exceptions import HTTPException as HTTPException
 from .params import Body as Body
 from .params import Cookie as Cookie
+from .params import Depends as Depends
 from .params import File as File
 from .params import Form as Form
 from .params import Header as Header
@@ -1,11 +1,14 @@
 import typing
 from asyncio import iscoroutinefunction
-from typing import Any, Callable, Dict, List, Optional, Sequence, Type, Union
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Type, Union
 
 from squall import convertors
+from squall.background import TaskPool
+from squall.batch import Batch, get_batch_endpoint
 from squall.compression import Compression
 from squall.concurrency import run_in_threadpool
 from squall.datastructures import Default
+from squall.encoders import ResponseValidation
 from squall.errors import get_default_debug_response
 from squall.exception_handlers import (
     http_exception_handler,
@@ -17,8 +20,10 @@ from squall.exceptions import (
     RequestHeadValidationError,
     RequestPayloadValidationError,
 )
+from squall.jobs import JobQueue
 from squall.lifespan import LifespanContext, lifespan
 from squall.logger import logger
+from squall.microbatching import BatchFunc, MicroBatcher
 from squall.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
@@ -26,7 +31,13 @@ from squall.openapi.docs import (
 )
 from squall.openapi.utils import get_openapi
 from squall.requests import Request
-from squall.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+from squall.responses import (
+    HTMLResponse,
+    JSONOptions,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+)
 from squall.routing import router
 from squall.routing.routes import APIRoute, WebSocketRoute
 from squall.tracing.constants import SpanName
@@ -77,8 +88,17 @@ class Squall:
         deprecated: Optional[bool] = None,
         include_in_schema: bool = True,
         compression: Optional[Compression] = None,
+        etag: bool = False,
+        background_pool: Optional[TaskPool] = None,
+        jobs: Optional[JobQueue] = None,
+        batch: Optional[Batch] = None,
         trace_internals: bool = False,
         ignore_trailing_slashes: bool = True,
+        redirect_slashes: bool = True,
+        compile_handlers: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
+        json_encoders: Optional[Mapping[type, Callable[[Any], Any]]] = None,
         **extra: Any,
     ) -> None:
         self.debug: bool = debug
@@ -92,6 +112,11 @@ class Squall:
             responses=responses,
             trace_internals=trace_internals,
             ignore_trailing_slashes=ignore_trailing_slashes,
+            redirect_slashes=redirect_slashes,
+            compile_handlers=compile_handlers,
+            response_validation=response_validation,
+            json_options=json_options,
+            json_encoders=json_encoders,
         )
         # Router methods linking for better user experience like having
         # @app.get(...) instead of @app.get(...)
@@ -105,6 +130,8 @@ class Squall:
         self.trace = self.router.trace
         self.include_router = self.router.include_router
         self.routes = self.router.routes
+        self.codecs = self.router.codecs
+        self.json_encoders = self.router.json_encoders
         self.add_route = self.router.add_route
         self.add_api = self.router.add_api
         self.add_api_route = self.router.add_api_route
@@ -166,9 +193,21 @@ class Squall:
         self.openapi_schema: Optional[Dict[str, Any]] = None
         self.on_startup = [] if on_startup is None else list(on_startup)
         self.on_shutdown = [] if on_shutdown is None else list(on_shutdown)
-        self.lifespan_ctx = LifespanContext(self.on_startup, self.on_shutdown)
+        self.background_pool = background_pool or TaskPool()
+        self.jobs = jobs
+        if jobs is not None:
+            self.router.lifespan_contexts.append(jobs)
+        # Pending background tasks are drained before other contexts are closed
+        self.lifespan_ctx = LifespanContext(
+            self.on_startup,
+            self.on_shutdown,
+            self.router.lifespan_contexts,
+            innermost=self.background_pool,
+        )
         self.compression = compression
+        self.etag = etag
         self.trace_internals = trace_internals
+        self.batch = batch
 
         self._setup()
 
@@ -261,6 +300,29 @@ class Squall:
 
         return decorator
 
+    def batcher(
+        self, max_batch_size: int = 64, max_delay: float = 0.005
+    ) -> typing.Callable[[BatchFunc], MicroBatcher[Any, Any]]:
+        """Decorator turning the batch function into the `MicroBatcher`.
+        Pending items are dispatched on the application shutdown.
+
+        Examples:
+            >>> app = Squall()
+            >>>
+            >>> @app.batcher(max_batch_size=32, max_delay=0.002)
+            >>> async def predict(features: List[Features]) -> List[float]:
+            >>>     return await model.predict(features)
+        """
+
+        def decorator(func: BatchFunc) -> MicroBatcher[Any, Any]:
+            batcher: MicroBatcher[Any, Any] = MicroBatcher(
+                func, max_batch_size=max_batch_size, max_delay=max_delay
+            )
+            self.router.lifespan_contexts.append(batcher)
+            return batcher
+
+        return decorator
+
     def add_middleware(self, middleware_class: type, **options: typing.Any) -> None:
         """Adds middleware.
 
@@ -313,21 +375,13 @@ class Squall:
             with CurrentSpan(SpanName.middleware_processing, self.trace_internals):
                 await self.middleware_stack(scope, receive, send)
         except Exception as exc:
-            handler = None
-
-            if isinstance(exc, HTTPException):
-                handler = self.exception_handlers.get(exc.status_code)
-
-            if handler is None:
-                handler = self._lookup_exception_handler(exc)
-
             request = Request(scope)
-            if handler:
-                if iscoroutinefunction(handler):
-                    response = await handler(request, exc)
-                else:
-                    response = await run_in_threadpool(handler, request, exc)
-            elif self.debug:
+            response = await self.get_exception_response(request, exc)
+            if response is not None:
+                await response(scope, receive, send)
+                return
+
+            if self.debug:
                 # In debug mode, return traceback responses.
                 response = get_default_debug_response(request, exc)
             else:
@@ -335,9 +389,31 @@ class Squall:
                 response = self._default_error_response
 
             await response(scope, receive, send)
+            raise exc
+
+    async def get_exception_response(
+        self, request: Request, exc: Exception
+    ) -> Optional[Response]:
+        """Renders the exception with the registered handler.
+        Returns None if there is no handler for the exception.
+        """
+        handler = None
 
-            if not handler:
-                raise exc
+        if isinstance(exc, HTTPException):
+            handler = self.exception_handlers.get(exc.status_code)
+
+        if handler is None:
+            handler = self._lookup_exception_handler(exc)
+
+        if handler is None:
+            return None
+
+        response: Response
+        if iscoroutinefunction(handler):
+            response = await handler(request, exc)
+        else:
+            response = await run_in_threadpool(handler, request, exc)  # type: ignore
+        return response
 
     def _lookup_exception_handler(
         self, exc: Exception
@@ -374,6 +450,7 @@ class Squall:
                 routes=self.routes,
                 tags=self.openapi_tags,
                 servers=self.servers,
+                codecs=self.codecs,
             )
         return self.openapi_schema
 
@@ -435,6 +512,14 @@ class Squall:
             self.router.add_api_route(
                 self.redoc_url, redoc_html, include_in_schema=False
             )
+        if self.batch is not None:
+            self.router.add_api_route(
+                self.batch.path,
+                get_batch_endpoint(self.batch),
+                methods=["POST"],
+                response_class=Response,
+                summary="Batch",
+            )
 
     @staticmethod
     def add_convertor(convertor: Type[convertors.Convertor]) -> None:
@@ -0,0 +1,115 @@
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional
+
+from squall.logger import logger
+from squall.types import ASGIApp, Receive, Scope, Send
+from starlette.background import BackgroundTask as BackgroundTask  # noqa
+from starlette.background import BackgroundTasks as BackgroundTasks  # noqa
+
+
+@dataclass
+class TaskPoolStatistics:
+    """Snapshot of the background tasks pool state
+
+    :param size: number of workers
+    :param queued: number of tasks waiting for a worker
+    :param running: number of currently running tasks
+    :param completed: total number of successfully completed tasks
+    :param failed: total number of tasks raised an exception
+    """
+
+    size: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+
+
+class TaskPool:
+    """Bounded pool running background tasks after responses are sent.
+
+    When the queue is full, sending of the next response waits for a free
+    slot. Pending tasks get drained on the application shutdown.
+    """
+
+    def __init__(self, size: int = 10, max_queue: int = 1000) -> None:
+        """
+        :param size: number of concurrently running tasks
+        :param max_queue: maximal number of tasks waiting for a worker
+        """
+        self.size = size
+        self.max_queue = max_queue
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: "Optional[asyncio.Queue[BackgroundTask]]" = None
+        self._workers: List["asyncio.Task[None]"] = []
+
+    def _start(self) -> "asyncio.Queue[BackgroundTask]":
+        """Starts workers in the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._workers = [loop.create_task(self._work()) for _ in range(self.size)]
+        return self._queue
+
+    async def _work(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        while True:
+            task = await queue.get()
+            self.running += 1
+            try:
+                await task()
+            except Exception:
+                self.failed += 1
+                logger.exception("Background task failed")
+            else:
+                self.completed += 1
+            finally:
+                self.running -= 1
+                queue.task_done()
+
+    async def submit(self, task: BackgroundTask) -> None:
+        """Puts the task into the queue, waits if the queue is full"""
+        await self._start().put(task)
+
+    async def drain(self) -> None:
+        """Waits for completion of all pending tasks and stops workers"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        self._queue, self._workers = None, []
+
+    async def __aenter__(self) -> "TaskPool":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.drain()
+
+    def statistics(self) -> TaskPoolStatistics:
+        return TaskPoolStatistics(
+            size=self.size,
+            queued=self._queue.qsize() if self._queue is not None else 0,
+            running=self.running,
+            completed=self.completed,
+            failed=self.failed,
+        )
+
+
+def get_background_handler(app: ASGIApp) -> ASGIApp:
+    """Wraps route handler with submitting of the tasks collected by the
+    endpoint `BackgroundTasks` parameter once the response is sent
+    """
+
+    async def with_background(scope: Scope, receive: Receive, send: Send) -> None:
+        await app(scope, receive, send)
+        tasks = scope.get("background")
+        if tasks is not None and tasks.tasks:
+            await scope["app"].background_pool.submit(tasks)
+
+    return with_background
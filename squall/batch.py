@@ -0,0 +1,178 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import orjson
+from squall.exceptions import HTTPException
+from squall.logger import logger
+from squall.requests import Request
+from squall.responses import Response
+from squall.types import Message, Scope
+
+# Headers of the batch request which don't describe its sub-requests
+EXCLUDED_HEADERS = {b"content-length", b"content-type", b"accept-encoding"}
+# Scope values which belong to the particular request, not to the connection
+EXCLUDED_SCOPE_KEYS = {"path_params", "background", "loaders", "endpoint"}
+
+
+@dataclass
+class Batch:
+    """Batch endpoint settings.
+
+    :param path: route path of the batch endpoint
+    :param max_entries: maximal number of sub-requests in the single batch
+    :param concurrency: maximal number of sub-requests executed at once
+    """
+
+    path: str = "/batch"
+    max_entries: int = 20
+    concurrency: int = 10
+
+
+@dataclass
+class BatchEntry:
+    """Single sub-request of the batch"""
+
+    path: str
+    method: str = "GET"
+    query: Dict[str, Any] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchDispatcher:
+    """Runs batch entries through the application router in-process.
+
+    Sub-requests get synthetic scopes based on the batch request scope,
+    so authentication headers, cookies and the client are inherited.
+    Responses are buffered and returned as a single JSON array.
+    Application middlewares aren't applied to sub-requests.
+    """
+
+    def __init__(self, settings: Batch) -> None:
+        self.settings = settings
+
+    def get_scope(self, scope: Scope, entry: BatchEntry) -> Tuple[Scope, bytes]:
+        path, _, query_string = entry.path.partition("?")
+        if entry.query:
+            query_string = urlencode(entry.query, doseq=True)
+
+        # Entry headers override headers of the batch request
+        overrides = [
+            (k.lower().encode("latin-1"), v.encode("latin-1"))
+            for k, v in entry.headers.items()
+        ]
+        excluded = EXCLUDED_HEADERS.union(k for k, _ in overrides)
+        headers = [(k, v) for k, v in scope["headers"] if k not in excluded]
+        headers.extend(overrides)
+
+        body = b""
+        if entry.body is not None:
+            body = orjson.dumps(entry.body)
+            headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+        sub_scope = {k: v for k, v in scope.items() if k not in EXCLUDED_SCOPE_KEYS}
+        sub_scope.update(
+            method=entry.method.upper(),
+            path=path,
+            raw_path=path.encode("utf-8"),
+            query_string=query_string.encode("latin-1"),
+            headers=headers,
+            batch=True,
+        )
+        return sub_scope, body
+
+    async def dispatch(self, scope: Scope, entry: BatchEntry) -> bytes:
+        """Runs single entry and returns its rendered result"""
+        sub_scope, body = self.get_scope(scope, entry)
+        status, headers, chunks = 500, [], []
+        body_sent = False
+
+        async def receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Sub-requests never get disconnected on their own
+            await asyncio.get_running_loop().create_future()
+            return {"type": "http.disconnect"}  # pragma: no cover
+
+        async def send(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await scope["router"](sub_scope, receive, send)
+        except Exception as exc:
+            response = await self.get_error_response(sub_scope, exc)
+            headers, chunks = [], []
+            await response(sub_scope, receive, send)
+
+        return self.render(status, headers, b"".join(chunks))
+
+    @staticmethod
+    async def get_error_response(scope: Scope, exc: Exception) -> Response:
+        app = scope["app"]
+        response: Optional[Response] = await app.get_exception_response(
+            Request(scope), exc
+        )
+        if response is None:
+            logger.exception("Batch entry %s %s failed", scope["method"], scope["path"])
+            response = Response(
+                orjson.dumps({"detail": "Internal Server Error"}),
+                status_code=500,
+                media_type="application/json",
+            )
+        return response
+
+    @staticmethod
+    def render(status: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> bytes:
+        """Renders entry result. JSON bodies are embedded as is, without parsing"""
+        headers_dict = {k.decode("latin-1"): v.decode("latin-1") for k, v in headers}
+        content_type = headers_dict.get("content-type", "")
+        if body and content_type.startswith("application/json"):
+            content = body
+        elif body:
+            content = orjson.dumps(body.decode("utf-8", errors="replace"))
+        else:
+            content = b"null"
+        return b'{"status":%d,"headers":%s,"body":%s}' % (
+            status,
+            orjson.dumps(headers_dict),
+            content,
+        )
+
+    async def __call__(self, scope: Scope, entries: List[BatchEntry]) -> Response:
+        if scope.get("batch"):
+            raise HTTPException(status_code=400, detail="Nested batches aren't allowed")
+        if len(entries) > self.settings.max_entries:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch exceeds {self.settings.max_entries} entries",
+            )
+
+        semaphore = asyncio.Semaphore(self.settings.concurrency)
+
+        async def run(entry: BatchEntry) -> bytes:
+            async with semaphore:
+                return await self.dispatch(scope, entry)
+
+        results = await asyncio.gather(*[run(entry) for entry in entries])
+        return Response(b"[" + b",".join(results) + b"]", media_type="application/json")
+
+
+def get_batch_endpoint(settings: Batch) -> Callable[..., Awaitable[Response]]:
+    """Builds endpoint running the posted JSON array of requests in-process"""
+    dispatcher = BatchDispatcher(settings)
+
+    async def batch(request: Request, entries: List[BatchEntry]) -> Response:
+        """Runs the requests in-process and returns their results in order"""
+        return await dispatcher(request.scope, entries)
+
+    return batch
@@ -0,0 +1,243 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Set, Tuple
+
+from squall.logger import logger
+from squall.responses import NotModifiedResponse, is_not_modified
+from squall.types import ASGIApp, Message, Receive, Scope, Send
+
+CacheKey = Tuple[Any, ...]
+
+# Request headers which let the handler skip the body, refreshes need it anyway
+CONDITIONAL_HEADERS = {b"if-none-match", b"if-modified-since"}
+
+
+@dataclass
+class Cache:
+    """Response cache policy of the route.
+
+    :param ttl: seconds the stored response is fresh
+    :param stale_while_revalidate: seconds the expired response is still served
+                                   while it is refreshed in the background
+    :param vary: request headers names which select different responses
+    :param max_entries: maximal number of stored responses, least recently used
+                        are evicted first
+    """
+
+    ttl: float
+    stale_while_revalidate: float = 0
+    vary: List[str] = field(default_factory=list)
+    max_entries: int = 1024
+
+    @property
+    def cache_control(self) -> bytes:
+        value = f"max-age={int(self.ttl)}"
+        if self.stale_while_revalidate:
+            value += f", stale-while-revalidate={int(self.stale_while_revalidate)}"
+        return value.encode("latin-1")
+
+
+@dataclass
+class CacheEntry:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    created_at: float
+    etag: Optional[bytes] = None
+
+
+class ResponseCache:
+    """In-process LRU storage of the final response bytes and headers"""
+
+    def __init__(self, policy: Cache) -> None:
+        self.policy = policy
+        self.entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.vary = [i.lower().encode("latin-1") for i in policy.vary]
+        self.hits = 0
+        self.misses = 0
+        self.refreshing: Set[CacheKey] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def get_key(self, scope: Scope) -> CacheKey:
+        """Builds cache key from the path parameters, canonicalized query string,
+        negotiated content encoding and values of the vary headers.
+        """
+        query_string: bytes = scope.get("query_string", b"")
+        if b"&" in query_string:
+            # Stable sort by name keeps order of repeated parameters
+            parts: List[bytes] = query_string.split(b"&")
+            parts.sort(key=lambda i: i.split(b"=", 1)[0])
+            query_string = b"&".join(parts)
+
+        vary = self.vary
+        headers = [b""] * len(vary)
+        accept_encoding = b""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept_encoding = value
+            if key in vary:
+                headers[vary.index(key)] = value
+
+        encoding = ""
+        compression = getattr(scope.get("app"), "compression", None)
+        if compression and accept_encoding:
+            for backend in compression.backends:
+                if backend.encoding_name.encode("latin-1") in accept_encoding:
+                    encoding = backend.encoding_name
+                    break
+
+        path_params = tuple(scope.get("path_params", {}).items())
+        return path_params, query_string, encoding, *headers
+
+    def get(self, key: CacheKey) -> Tuple[Optional[CacheEntry], bool]:
+        """Returns stored entry and whether it is stale.
+        Expired entries are removed.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None, False
+
+        age = time.monotonic() - entry.created_at
+        if age <= self.policy.ttl:
+            self.entries.move_to_end(key)
+            return entry, False
+        elif age <= self.policy.ttl + self.policy.stale_while_revalidate:
+            self.entries.move_to_end(key)
+            return entry, True
+
+        del self.entries[key]
+        return None, False
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.policy.max_entries:
+            self.entries.popitem(last=False)
+
+    def prepare_headers(
+        self, headers: List[Tuple[bytes, bytes]]
+    ) -> List[Tuple[bytes, bytes]]:
+        """Adds Cache-Control and Vary headers to the response headers"""
+        result = [(k, v) for k, v in headers if k != b"cache-control" and k != b"vary"]
+        result.append((b"cache-control", self.policy.cache_control))
+        vary = [v for k, v in headers if k == b"vary"]
+        vary.extend(self.vary)
+        if vary:
+            result.append((b"vary", b", ".join(vary)))
+        return result
+
+    async def fetch(
+        self, app: ASGIApp, key: CacheKey, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Runs the handler, forwards response to the client and stores it.
+        Only complete successful GET responses get stored.
+        """
+        status = 0
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def send_and_store(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = message.get("headers", [])
+                if status == 200:
+                    # Errors, like 503 of the overloaded route, mustn't be cached
+                    headers = self.prepare_headers(headers)
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                is_complete = not message.get("more_body", False)
+                if is_complete and status == 200 and scope["method"] == "GET":
+                    entry = CacheEntry(
+                        status,
+                        headers,
+                        b"".join(chunks),
+                        time.monotonic(),
+                        next((v for k, v in headers if k == b"etag"), None),
+                    )
+                    self.set(key, entry)
+            await send(message)
+
+        await app(scope, receive, send_and_store)
+
+    def refresh(self, app: ASGIApp, key: CacheKey, scope: Scope) -> None:
+        """Refreshes stale entry in the background"""
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            pass
+
+        refresh_scope = {
+            **scope,
+            "method": "GET",
+            "headers": [
+                (k, v) for k, v in scope["headers"] if k not in CONDITIONAL_HEADERS
+            ],
+        }
+
+        async def run() -> None:
+            try:
+                await self.fetch(app, key, refresh_scope, receive, send)
+            except Exception:
+                logger.exception("Response cache refresh failed")
+            finally:
+                self.refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def serve(
+        entry: CacheEntry, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if entry.etag is not None and is_not_modified(scope, entry.etag):
+            response = NotModifiedResponse(entry.etag, entry.headers)
+            await response(scope, receive, send)
+            return
+
+        age = str(int(time.monotonic() - entry.created_at)).encode("latin-1")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": [*entry.headers, (b"age", age)],
+            }
+        )
+        await send({"type": "http.response.body", "body": entry.body})
+
+
+def get_cached_handler(app: ASGIApp, cache: ResponseCache) -> ASGIApp:
+    """Wraps route handler with the response cache.
+
+    Stored responses are served before head validation, the endpoint call
+    and the response rendering take place.
+    """
+
+    async def cached(scope: Scope, receive: Receive, send: Send) -> None:
+        method = scope["method"]
+        if method != "GET" and method != "HEAD":
+            await app(scope, receive, send)
+            return
+
+        key = cache.get_key(scope)
+        entry, is_stale = cache.get(key)
+        if entry is not None:
+            cache.hits += 1
+            if is_stale:
+                cache.refresh(app, key, scope)
+            await cache.serve(entry, scope, receive, send)
+            return
+
+        cache.misses += 1
+        await cache.fetch(app, key, scope, receive, send)
+
+    return cached
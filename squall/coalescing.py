@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from squall.params import ParamTypes
+from squall.routing.utils import HeadParam
+from squall.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request headers which change the rendered response regardless of the endpoint
+NEGOTIATION_HEADERS = {b"accept-encoding", b"if-none-match"}
+
+
+def is_complete(messages: List[Message]) -> bool:
+    """Recorded messages hold the whole response"""
+    if not messages:
+        return False
+    last = messages[-1]
+    return last["type"] == "http.response.body" and not last.get("more_body", False)
+
+
+def get_coalesced_handler(app: ASGIApp, head_params: List[HeadParam]) -> ASGIApp:
+    """Wraps route handler with the in-flight requests coalescing.
+
+    Concurrent GET and HEAD requests having the same path parameters,
+    query string and values of headers and cookies the route consumes
+    share the single handler execution. The first request runs the handler,
+    others wait for its completion and get the same response messages.
+    """
+    headers = set(NEGOTIATION_HEADERS)
+    for param in head_params:
+        if param.source == ParamTypes.header.value:
+            headers.add(param.alias.lower().encode("latin-1"))
+        elif param.source == ParamTypes.cookie.value:
+            headers.add(b"cookie")
+
+    in_flight: Dict[Tuple[Any, ...], "asyncio.Future[List[Message]]"] = {}
+
+    async def coalesced(scope: Scope, receive: Receive, send: Send) -> None:
+        method = scope["method"]
+        if method != "GET" and method != "HEAD":
+            await app(scope, receive, send)
+            return
+
+        key = (
+            method,
+            tuple(scope["path_params"].items()),
+            scope.get("query_string", b""),
+            *[(k, v) for k, v in scope["headers"] if k in headers],
+        )
+        future = in_flight.get(key)
+        if future is not None:
+            try:
+                messages = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leading request was cancelled, run the handler on our own
+                await app(scope, receive, send)
+                return
+            for message in messages:
+                await send(message)
+            return
+
+        future = in_flight[key] = asyncio.get_running_loop().create_future()
+        messages = []
+
+        async def send_and_record(message: Message) -> None:
+            messages.append(message)
+            await send(message)
+
+        try:
+            await app(scope, receive, send_and_record)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark exception as retrieved, nobody may be waiting for it
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            if is_complete(messages):
+                future.set_result(messages)
+            else:
+                # Handler gave up on the response, e.g. the client disconnected
+                future.cancel()
+        finally:
+            del in_flight[key]
+
+    return coalesced
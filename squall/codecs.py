@@ -0,0 +1,73 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class CodecStatistics:
+    """Codecs of the application built so far
+
+    :param built: number of built codecs by kind
+    :param build_time: seconds spent on building codecs by kind
+    :param reused: number of times an already built codec was shared
+    """
+
+    built: Dict[str, int] = field(default_factory=dict)
+    build_time: Dict[str, float] = field(default_factory=dict)
+    reused: int = 0
+
+    @property
+    def total_built(self) -> int:
+        return sum(self.built.values())
+
+    @property
+    def total_build_time(self) -> float:
+        return sum(self.build_time.values())
+
+
+class CodecRegistry:
+    """Application storage of serializers, deserializers and JSON schemas.
+
+    Routes sharing the same model with the same options get the same codec,
+    built once when it is requested first. Codecs with unhashable keys,
+    like models annotated with unhashable metadata, are built every time.
+
+    Example:
+        >>> registry = CodecRegistry()
+        >>> decode = registry.get("deserializer", Item, lambda: build(Item))
+    """
+
+    def __init__(self) -> None:
+        self.codecs: Dict[Tuple[str, Hashable], Any] = {}
+        self.stats = CodecStatistics()
+
+    def get(self, kind: str, key: Hashable, factory: Callable[[], T]) -> T:
+        """Returns codec of the kind stored by the key.
+        Builds it with the factory first, if it is missing.
+        """
+        codec_key = (kind, key)
+        try:
+            codec: T = self.codecs[codec_key]
+        except KeyError:
+            hashable = True
+        except TypeError:
+            hashable = False
+        else:
+            self.stats.reused += 1
+            return codec
+
+        started_at = time.perf_counter()
+        codec = factory()
+        if hashable:
+            self.codecs[codec_key] = codec
+        elapsed = time.perf_counter() - started_at
+        stats = self.stats
+        stats.built[kind] = stats.built.get(kind, 0) + 1
+        stats.build_time[kind] = stats.build_time.get(kind, 0.0) + elapsed
+        return codec
+
+    def statistics(self) -> CodecStatistics:
+        stats = self.stats
+        return CodecStatistics(dict(stats.built), dict(stats.build_time), stats.reused)
@@ -0,0 +1,662 @@
+import ast
+import asyncio
+import inspect
+import typing
+from types import CodeType, FunctionType
+
+from apischema import ValidationError
+from orjson import JSONDecodeError
+from squall.background import BackgroundTasks
+from squall.bindings import RequestField
+from squall.datastructures import Default, DefaultPlaceholder
+from squall.dependencies import DependencyResolver
+from squall.exceptions import (
+    HTTPException,
+    RequestHeadValidationError,
+    RequestPayloadValidationError,
+    ResponsePayloadValidationError,
+)
+from squall.executors import Executor, InlineExecutor
+from squall.handlers import get_item_serializer
+from squall.requests import Request
+from squall.responses import (
+    JSONResponse,
+    JSONStreamingResponse,
+    NotModifiedResponse,
+    Response,
+    Versioned,
+    is_not_modified,
+)
+from squall.tracing.constants import SpanName
+from squall.tracing.helpers import CurrentSpan
+from squall.utils import get_types
+from squall.validators.ast_helpers import (
+    assign,
+    await_,
+    call,
+    getattribute,
+    getitem,
+    name,
+    raise_,
+    set_attribute,
+    setitem,
+)
+from starlette.concurrency import run_in_threadpool
+
+
+class HandlerCompiler:
+    """Provides interface for building a route specialised HTTP handler.
+
+    `squall.handlers.get_http_handler` decides on every request which steps
+    should be performed. The compiler takes these decisions once, during route
+    registration, and emits a single coroutine function containing only
+    the steps the route actually needs.
+
+    Example:
+        ```
+        >>> async def get_items():
+        >>>     return [1, 2, 3]
+        >>>
+        >>> handler = HandlerCompiler(endpoint=get_items).build()
+        ```
+        Will generate the following code:
+        ```
+        >>> async def handler(scope, receive, send):
+        >>>     raw_response = await endpoint()
+        >>>     await response_class(raw_response)(scope, receive, send)
+        ```
+    """
+
+    def __init__(
+        self,
+        endpoint: typing.Callable[..., typing.Any],
+        head_validator: typing.Optional[typing.Callable[..., typing.Any]] = None,
+        body_fields: typing.Optional[typing.List[typing.Any]] = None,
+        status_code: typing.Optional[int] = None,
+        response_class: typing.Union[
+            typing.Type[Response], DefaultPlaceholder
+        ] = Default(JSONResponse),
+        request_field: typing.Optional[RequestField] = None,
+        request_deserializer: typing.Optional[typing.Callable[..., typing.Any]] = None,
+        response_deserializer: typing.Optional[typing.Callable[..., typing.Any]] = None,
+        response_serializer: typing.Optional[typing.Callable[..., typing.Any]] = None,
+        trace_internals: bool = False,
+        executor: typing.Optional[Executor] = None,
+        dependencies: typing.Optional[DependencyResolver] = None,
+    ) -> None:
+        if isinstance(response_class, DefaultPlaceholder):
+            actual_response_class: typing.Type[Response] = response_class.value
+        else:
+            actual_response_class = response_class
+
+        self.endpoint = endpoint
+        self.head_validator = head_validator
+        self.body_fields = body_fields or []
+        self.status_code = status_code
+        self.request_field = request_field if request_deserializer is not None else None
+        self.response_deserializer = (
+            response_deserializer if response_serializer is not None else None
+        )
+        self.response_serializer = response_serializer
+        self.trace_internals = trace_internals
+        self.executor = executor
+        self.dependencies = dependencies
+        self.is_streaming = issubclass(actual_response_class, JSONStreamingResponse)
+
+        self.globals: typing.Dict[str, typing.Any] = {
+            "endpoint": endpoint,
+            "head_validator": head_validator,
+            "request_deserializer": request_deserializer,
+            "response_deserializer": response_deserializer,
+            "response_serializer": response_serializer,
+            "response_class": actual_response_class,
+            "item_serializer": get_item_serializer(
+                self.response_deserializer, response_serializer
+            ),
+            "isinstance": isinstance,
+            "str": str,
+            "run_in_threadpool": run_in_threadpool,
+            "executor": executor,
+            "dependencies": dependencies,
+            "Request": Request,
+            "BackgroundTasks": BackgroundTasks,
+            "Response": Response,
+            "Versioned": Versioned,
+            "NotModifiedResponse": NotModifiedResponse,
+            "is_not_modified": is_not_modified,
+            "HTTPException": HTTPException,
+            "JSONDecodeError": JSONDecodeError,
+            "ValidationError": ValidationError,
+            "RequestHeadValidationError": RequestHeadValidationError,
+            "RequestPayloadValidationError": RequestPayloadValidationError,
+            "ResponsePayloadValidationError": ResponsePayloadValidationError,
+            "CurrentSpan": CurrentSpan,
+            "SpanName": SpanName,
+        }
+
+    @property
+    def has_kwargs(self) -> bool:
+        """Endpoint receives any arguments"""
+        return bool(
+            self.head_validator
+            or self.body_fields
+            or self.request_field
+            or self.dependencies
+        )
+
+    @property
+    def has_request(self) -> bool:
+        """Request instance is necessary for getting endpoint arguments"""
+        return self.has_kwargs
+
+    def may_return(self, cls: typing.Type[typing.Any]) -> bool:
+        """Endpoint return annotation allows `cls` instances"""
+        annotation = inspect.signature(self.endpoint).return_annotation
+        if annotation is inspect.Signature.empty or annotation is typing.Any:
+            return True
+        if isinstance(annotation, str):
+            return True
+        for i in get_types(annotation):
+            if inspect.isclass(i) and issubclass(i, cls):
+                return True
+        return False
+
+    @property
+    def may_return_response(self) -> bool:
+        """Endpoint return annotation allows `Response` instances"""
+        return self.may_return(Response)
+
+    @property
+    def may_return_versioned(self) -> bool:
+        """Endpoint return annotation allows `Versioned` results"""
+        return self.may_return(Versioned)
+
+    def span(
+        self, span_name: SpanName, body: typing.List[typing.Any]
+    ) -> typing.List[typing.Any]:
+        """Wraps statements with tracing span if internals tracing enabled.
+
+        Generates the following code:
+            >>> with CurrentSpan(SpanName.<span_name>, True):
+            >>>     <body>
+        """
+        if not self.trace_internals:
+            return body
+        context = call(
+            "CurrentSpan",
+            args=[getattribute("SpanName", [span_name.name]), ast.Constant(value=True)],
+        )
+        return [
+            ast.With(
+                items=[ast.withitem(context_expr=context, optional_vars=None)],
+                body=body,
+                type_comment=None,
+            )
+        ]
+
+    @staticmethod
+    def except_handler(
+        exc_name: str, body: typing.List[typing.Any]
+    ) -> ast.ExceptHandler:
+        """Generates the following code: `except <exc_name> as e: <body>`"""
+        return ast.ExceptHandler(type=name(exc_name), name="e", body=body)
+
+    def build_head(self) -> typing.List[typing.Any]:
+        """Builds request instance creation and HEAD parameters validation
+
+        Generates the following code:
+            >>> request = Request(scope, receive, send)
+            >>> kwargs, errors = head_validator(request)
+            >>> if errors:
+            >>>     raise RequestHeadValidationError(errors)
+        """
+        rows: typing.List[typing.Any] = []
+        if self.has_request:
+            scope_args = [name("scope"), name("receive"), name("send")]
+            rows.append(assign("request", call("Request", args=scope_args)))
+
+        if self.head_validator is not None:
+            rows.append(
+                ast.Assign(
+                    targets=[
+                        ast.Tuple(
+                            elts=[
+                                ast.Name(id="kwargs", ctx=ast.Store()),
+                                ast.Name(id="errors", ctx=ast.Store()),
+                            ],
+                            ctx=ast.Store(),
+                        )
+                    ],
+                    value=call("head_validator", args=[name("request")]),
+                )
+            )
+            rows.append(
+                ast.If(
+                    test=name("errors"),
+                    body=[
+                        raise_(
+                            call("RequestHeadValidationError", args=[name("errors")])
+                        )
+                    ],
+                    orelse=[],
+                )
+            )
+        elif self.has_kwargs:
+            rows.append(assign("kwargs", ast.Dict(keys=[], values=[])))
+        return rows
+
+    def build_dependencies(self) -> typing.List[typing.Any]:
+        """Builds endpoint dependencies resolving
+
+        Generates the following code:
+            >>> kwargs.update(await dependencies(request))
+        """
+        if self.dependencies is None:
+            return []
+        values = await_(call("dependencies", args=[name("request")]))
+        return [call("kwargs", ["update"], args=[values], is_standalone=True)]
+
+    def build_body_field(
+        self, field: typing.Dict[str, typing.Any], is_first_form: bool
+    ) -> typing.List[typing.Any]:
+        """Builds getting of the single body field value"""
+        field_name = field["name"]
+        kind = field["kind"]
+        if kind == "request":
+            return [setitem("kwargs", field_name, name("request"))]
+        elif kind == "deadline":
+            deadline = call("scope", ["get"], args=[ast.Constant("deadline")])
+            return [setitem("kwargs", field_name, deadline)]
+        elif kind == "background":
+            background = call(
+                "scope",
+                ["setdefault"],
+                args=[ast.Constant("background"), call("BackgroundTasks")],
+            )
+            return [setitem("kwargs", field_name, background)]
+        elif kind == "jobs":
+            app = getitem("scope", ast.Constant("app"))
+            jobs = ast.Attribute(value=app, attr="jobs", ctx=ast.Load())
+            return [setitem("kwargs", field_name, jobs)]
+        elif kind == "loader":
+            loader_name = f"loader_{field_name}"
+            self.globals[loader_name] = field["loader"]
+            loader = call(loader_name, ["get"], args=[name("scope")])
+            return [setitem("kwargs", field_name, loader)]
+        elif kind == "body":
+            # if ct is not None and ct[-4:] == "json":
+            content_type = call(
+                "request", ["headers", "get"], args=[ast.Constant("content-type")]
+            )
+            is_json = ast.BoolOp(
+                op=ast.And(),
+                values=[
+                    ast.Compare(
+                        left=name("ct"),
+                        ops=[ast.IsNot()],
+                        comparators=[ast.Constant(value=None)],
+                    ),
+                    ast.Compare(
+                        left=ast.Subscript(
+                            value=name("ct"),
+                            slice=ast.Slice(lower=ast.Constant(value=-4)),
+                            ctx=ast.Load(),
+                        ),
+                        ops=[ast.Eq()],
+                        comparators=[ast.Constant(value="json")],
+                    ),
+                ],
+            )
+            return [
+                assign("ct", content_type),
+                ast.If(
+                    test=is_json,
+                    body=[
+                        setitem("kwargs", field_name, await_(call("request", ["json"])))
+                    ],
+                    orelse=[
+                        setitem("kwargs", field_name, await_(call("request", ["body"])))
+                    ],
+                ),
+            ]
+        elif kind == "form":
+            rows: typing.List[typing.Any] = []
+            if is_first_form:
+                rows.append(assign("form", await_(call("request", ["form"]))))
+                rows.append(assign("form_missed", ast.List(elts=[], ctx=ast.Load())))
+
+            missed = ast.Dict(
+                keys=[ast.Constant(value="loc"), ast.Constant(value="msg")],
+                values=[
+                    ast.List(
+                        elts=[
+                            ast.Constant(value="form"),
+                            ast.Constant(value=field_name),
+                        ],
+                        ctx=ast.Load(),
+                    ),
+                    ast.Constant(value="field required"),
+                ],
+            )
+            rows.append(
+                assign("value", call("form", ["get"], args=[ast.Constant(field_name)]))
+            )
+            rows.append(
+                ast.If(
+                    test=ast.Compare(
+                        left=name("value"),
+                        ops=[ast.Is()],
+                        comparators=[ast.Constant(value=None)],
+                    ),
+                    body=[
+                        call(
+                            "form_missed",
+                            ["append"],
+                            args=[missed],
+                            is_standalone=True,
+                        )
+                    ],
+                    orelse=[setitem("kwargs", field_name, name("value"))],
+                )
+            )
+            return rows
+        raise ValueError(f"Unknown body field kind: {kind}")
+
+    def build_body(self) -> typing.List[typing.Any]:
+        """Builds body fields and request model processing"""
+        rows: typing.List[typing.Any] = []
+        if self.request_field is not None:
+            # kwargs[<name>] = request_deserializer(await request.json())
+            body = await_(call("request", ["json"]))
+            deserialized = call("request_deserializer", args=[body])
+            rows.append(setitem("kwargs", self.request_field.name, deserialized))
+
+        has_form = False
+        for field in self.body_fields:
+            is_first_form = field["kind"] == "form" and not has_form
+            has_form = has_form or is_first_form
+            rows.extend(self.build_body_field(field, is_first_form))
+
+        if has_form:
+            from_errors = call(
+                "ValidationError", ["from_errors"], args=[name("form_missed")]
+            )
+            rows.append(
+                ast.If(test=name("form_missed"), body=[raise_(from_errors)], orelse=[])
+            )
+
+        if not rows:
+            return rows
+
+        messages = getattribute("e", ["messages"])
+        children = getattribute("e", ["children"])
+        error_str = ast.List(elts=[call("str", args=[name("e")])], ctx=ast.Load())
+        bad_request = call(
+            "HTTPException",
+            keywords=[
+                ast.keyword(arg="status_code", value=ast.Constant(value=400)),
+                ast.keyword(
+                    arg="detail",
+                    value=ast.Constant(value="There was an error parsing the body"),
+                ),
+            ],
+        )
+        return [
+            ast.Try(
+                body=rows,
+                handlers=[
+                    self.except_handler(
+                        "JSONDecodeError",
+                        [
+                            raise_(
+                                call("RequestPayloadValidationError", args=[error_str])
+                            )
+                        ],
+                    ),
+                    self.except_handler(
+                        "ValidationError",
+                        [
+                            raise_(
+                                call(
+                                    "RequestPayloadValidationError",
+                                    args=[messages, children],
+                                )
+                            )
+                        ],
+                    ),
+                    self.except_handler("Exception", [raise_(bad_request, cause="e")]),
+                ],
+                orelse=[],
+                finalbody=[],
+            )
+        ]
+
+    def build_endpoint_call(self) -> typing.List[typing.Any]:
+        """Builds endpoint calling
+
+        Generates one of the following codes:
+            >>> raw_response = await endpoint(**kwargs)
+            >>> raw_response = endpoint(**kwargs)
+            >>> raw_response = await executor.run(endpoint, **kwargs)
+            >>> raw_response = await run_in_threadpool(endpoint, **kwargs)
+        """
+        keywords = []
+        if self.has_kwargs:
+            keywords.append(ast.keyword(arg=None, value=name("kwargs")))
+
+        if inspect.isasyncgenfunction(self.endpoint) or isinstance(
+            self.executor, InlineExecutor
+        ):
+            return [assign("raw_response", call("endpoint", keywords=keywords))]
+        elif asyncio.iscoroutinefunction(self.endpoint):
+            value = call("endpoint", keywords=keywords)
+        elif self.executor is not None:
+            value = call(
+                "executor", ["run"], args=[name("endpoint")], keywords=keywords
+            )
+        else:
+            value = call(
+                "run_in_threadpool", args=[name("endpoint")], keywords=keywords
+            )
+        return [assign("raw_response", await_(value))]
+
+    def send(self, response: str) -> ast.Expr:
+        """Generates the following code: `await <response>(scope, receive, send)`"""
+        scope_args = [name("scope"), name("receive"), name("send")]
+        return ast.Expr(value=ast.Await(value=call(response, args=scope_args)))
+
+    def build_versioned(self) -> typing.List[typing.Any]:
+        """Builds unwrapping of the `Versioned` endpoint result
+
+        Generates the following code:
+            >>> etag = None
+            >>> if isinstance(raw_response, Versioned):
+            >>>     etag = raw_response.etag
+            >>>     if is_not_modified(scope, etag):
+            >>>         response = NotModifiedResponse(etag)
+            >>>         await response(scope, receive, send)
+            >>>         return
+            >>>     raw_response = raw_response.content
+        """
+        not_modified = [
+            assign("response", call("NotModifiedResponse", args=[name("etag")])),
+            self.send("response"),
+            ast.Return(value=None),
+        ]
+        is_versioned = call(
+            "isinstance", args=[name("raw_response"), name("Versioned")]
+        )
+        return [
+            assign("etag", ast.Constant(value=None)),
+            ast.If(
+                test=is_versioned,
+                body=[
+                    assign("etag", getattribute("raw_response", ["etag"])),
+                    ast.If(
+                        test=call(
+                            "is_not_modified", args=[name("scope"), name("etag")]
+                        ),
+                        body=not_modified,
+                        orelse=[],
+                    ),
+                    assign("raw_response", getattribute("raw_response", ["content"])),
+                ],
+                orelse=[],
+            ),
+        ]
+
+    def build_response(self) -> typing.List[typing.Any]:
+        """Builds serialization and sending of the response"""
+        rows: typing.List[typing.Any] = []
+        if self.may_return_versioned:
+            rows.extend(self.build_versioned())
+
+        if self.may_return_response:
+            # if isinstance(raw_response, Response):
+            #     raw_response.request = request
+            #     await raw_response(scope, receive, send)
+            #     return
+            body: typing.List[typing.Any] = []
+            if self.has_request:
+                body.append(set_attribute("raw_response", "request", name("request")))
+            if self.may_return_versioned:
+                body.append(
+                    ast.If(
+                        test=ast.Compare(
+                            left=name("etag"),
+                            ops=[ast.IsNot()],
+                            comparators=[ast.Constant(value=None)],
+                        ),
+                        body=[set_attribute("raw_response", "etag", name("etag"))],
+                        orelse=[],
+                    )
+                )
+            body.extend(
+                self.span(SpanName.returning_response, [self.send("raw_response")])
+            )
+            body.append(ast.Return(value=None))
+            is_response = call(
+                "isinstance", args=[name("raw_response"), name("Response")]
+            )
+            rows.append(ast.If(test=is_response, body=body, orelse=[]))
+
+        if self.is_streaming:
+            rows.extend(self.build_streaming_response())
+            return rows
+
+        preparation: typing.List[typing.Any] = []
+        result = "raw_response"
+        if self.response_serializer is not None:
+            result = "result"
+            value: ast.expr = name("raw_response")
+            if self.response_deserializer is not None:
+                value = ast.Call(
+                    func=name("response_deserializer"), args=[value], keywords=[]
+                )
+            messages = getattribute("e", ["messages"])
+            children = getattribute("e", ["children"])
+            error_str = ast.List(elts=[call("str", args=[name("e")])], ctx=ast.Load())
+            preparation.append(
+                ast.Try(
+                    body=[assign("result", call("response_serializer", args=[value]))],
+                    handlers=[
+                        self.except_handler(
+                            "ValidationError",
+                            [
+                                raise_(
+                                    call(
+                                        "ResponsePayloadValidationError",
+                                        args=[messages, children],
+                                    )
+                                )
+                            ],
+                        ),
+                        self.except_handler(
+                            "TypeError",
+                            [
+                                raise_(
+                                    call(
+                                        "ResponsePayloadValidationError",
+                                        args=[error_str],
+                                    )
+                                )
+                            ],
+                        ),
+                    ],
+                    orelse=[],
+                    finalbody=[],
+                )
+            )
+
+        keywords = []
+        if self.status_code is not None:
+            keywords.append(
+                ast.keyword(
+                    arg="status_code", value=ast.Constant(value=self.status_code)
+                )
+            )
+        response = call("response_class", args=[name(result)], keywords=keywords)
+        preparation.append(assign("response", response))
+        if self.has_request:
+            preparation.append(set_attribute("response", "request", name("request")))
+        if self.may_return_versioned:
+            preparation.append(set_attribute("response", "etag", name("etag")))
+        rows.extend(self.span(SpanName.response_preparation, preparation))
+        rows.extend(self.span(SpanName.returning_response, [self.send("response")]))
+        return rows
+
+    def build_streaming_response(self) -> typing.List[typing.Any]:
+        """Builds streaming of the endpoint result items
+
+        Generates the following code:
+            >>> response = response_class(raw_response, serializer=item_serializer)
+            >>> await response(scope, receive, send)
+        """
+        keywords = [ast.keyword(arg="serializer", value=name("item_serializer"))]
+        if self.status_code is not None:
+            keywords.append(
+                ast.keyword(
+                    arg="status_code", value=ast.Constant(value=self.status_code)
+                )
+            )
+        response = call(
+            "response_class", args=[name("raw_response")], keywords=keywords
+        )
+        return [
+            assign("response", response),
+            *self.span(SpanName.returning_response, [self.send("response")]),
+        ]
+
+    def build(self) -> FunctionType:
+        """Builds handler function"""
+        rows: typing.List[typing.Any] = []
+        rows.extend(
+            self.span(
+                SpanName.pulling_request_data,
+                self.build_head() + self.build_dependencies() + self.build_body(),
+            )
+        )
+        rows.extend(self.span(SpanName.handle, self.build_endpoint_call()))
+        rows.extend(self.build_response())
+
+        function_ast = ast.AsyncFunctionDef(
+            name="handler",
+            args=ast.arguments(
+                args=[ast.arg(i) for i in ("scope", "receive", "send")],
+                vararg=None,
+                kwarg=None,
+                defaults=[],
+                kwonlyargs=[],
+                kw_defaults=[],
+                posonlyargs=[],
+            ),
+            body=rows,
+            decorator_list=[],
+        )
+        module_ast = ast.Module(body=[function_ast], type_ignores=[])
+        ast.fix_missing_locations(module_ast)
+
+        module_code = compile(module_ast, "<not_a_file>", "exec")
+        function_code = [c for c in module_code.co_consts if isinstance(c, CodeType)][0]
+
+        return FunctionType(function_code, globals=self.globals)
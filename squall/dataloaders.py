@@ -0,0 +1,141 @@
+import asyncio
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Scope
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+LoadFunc = Callable[[List[Any]], Any]
+
+
+class DataLoader(Generic[K, V]):
+    """Deduplicates and batches lookups made within the single request.
+
+    Keys requested in the same event loop iteration are loaded with
+    the single batch function call. Results are cached for the rest
+    of the request.
+    """
+
+    def __init__(self, load_func: LoadFunc, max_batch_size: Optional[int] = None):
+        """
+        :param load_func: takes the list of keys and returns the list of values
+                          in the same order or the mapping of keys to values.
+                          Sync functions run in the thread pool.
+        :param max_batch_size: maximal number of keys in the single call
+        """
+        self.load_func = load_func
+        self.is_coroutine = asyncio.iscoroutinefunction(load_func)
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self._cache: Dict[K, "asyncio.Future[V]"] = {}
+        self._queue: List[Tuple[K, "asyncio.Future[V]"]] = []
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        """Returns awaitable value of the key"""
+        if (future := self._cache.get(key)) is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = self._cache[key] = loop.create_future()
+        if not self._queue:
+            loop.call_soon(self.dispatch)
+        self._queue.append((key, future))
+        return future
+
+    async def load_many(self, keys: List[K]) -> List[V]:
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    def prime(self, key: K, value: V) -> None:
+        """Puts the value into the cache, unless the key is already loaded"""
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self, key: K) -> None:
+        self._cache.pop(key, None)
+
+    def dispatch(self) -> None:
+        """Starts loading of the queued keys"""
+        queue, self._queue = self._queue, []
+        size = self.max_batch_size or len(queue)
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(queue), size):
+            task = loop.create_task(self.load_batch(queue[i : i + size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def load_batch(self, batch: List[Tuple[K, "asyncio.Future[V]"]]) -> None:
+        """Loads values of the keys and resolves their futures.
+        Futures are passed along with the keys, as keys may be cleared
+        from the cache meanwhile.
+        """
+        self.batches += 1
+        keys = [key for key, _ in batch]
+        try:
+            if self.is_coroutine:
+                values = await self.load_func(keys)
+            else:
+                values = await run_in_threadpool(self.load_func, keys)
+            if isinstance(values, Mapping):
+                values = [values.get(key) for key in keys]
+            elif len(values) != len(keys):
+                raise ValueError(
+                    f"Load function returned {len(values)} values for {len(keys)} keys"
+                )
+        except Exception as e:
+            for key, future in batch:
+                # Failed keys get loaded again on the next call
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (key, future), value in zip(batch, values):
+            if not future.done():
+                future.set_result(value)
+
+
+class Loader:
+    """Declares request-scoped `DataLoader` endpoint parameter.
+    Parameters with the same declaration share the loader within the request.
+
+    Examples:
+        >>> async def get_users(ids: List[int]) -> List[User]:
+        >>>     ...
+        >>>
+        >>> users = Loader(get_users)
+        >>>
+        >>> @app.get("/posts")
+        >>> async def get_posts(loader: DataLoader = users):
+        >>>     posts = await fetch_posts()
+        >>>     authors = await loader.load_many([i.author_id for i in posts])
+    """
+
+    def __init__(self, load_func: LoadFunc, max_batch_size: Optional[int] = None):
+        self.load_func = load_func
+        self.max_batch_size = max_batch_size
+
+    def get(self, scope: Scope) -> DataLoader[Any, Any]:
+        """Returns the loader of the current request"""
+        loaders = scope.setdefault("loaders", {})
+        loader: Optional[DataLoader[Any, Any]] = loaders.get(self)
+        if loader is None:
+            loader = loaders[self] = DataLoader(self.load_func, self.max_batch_size)
+        return loader
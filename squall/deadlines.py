@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from squall.responses import JSONResponse
+from squall.types import ASGIApp, Message, Receive, Scope, Send
+
+# Incoming header with the remaining time budget of the request in seconds
+DEADLINE_HEADER = b"x-request-deadline"
+
+
+class Deadline:
+    """Point in time the request handling should complete by.
+
+    Endpoints get it by declaring a parameter annotated with `Deadline`
+    and can pass the remaining budget on to downstream calls.
+
+    Examples:
+        >>> @app.get("/search", timeout=1.5)
+        >>> async def search(deadline: Deadline, q: str = Query()):
+        >>>     return await backend.search(q, timeout=deadline.remaining())
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: float) -> None:
+        """
+        :param expires_at: `time.monotonic()` based expiration time
+        """
+        self.expires_at = expires_at
+
+    def remaining(self) -> float:
+        """Returns seconds left till the deadline"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+def get_budget(scope: Scope, timeout: float) -> float:
+    """Returns the time budget of the request. The route timeout gets
+    shortened by the deadline header value, if the client sent one.
+    """
+    for key, value in scope["headers"]:
+        if key == DEADLINE_HEADER:
+            try:
+                return min(timeout, float(value))
+            except ValueError:
+                break
+    return timeout
+
+
+def get_timeout_handler(app: ASGIApp, timeout: float) -> ASGIApp:
+    """Wraps route handler with the deadline.
+
+    On expiry the handler gets cancelled and `504 Gateway Timeout` is sent,
+    unless the response has already been started.
+    """
+    gateway_timeout = JSONResponse({"detail": "Gateway Timeout"}, status_code=504)
+
+    async def timed(scope: Scope, receive: Receive, send: Send) -> None:
+        budget = get_budget(scope, timeout)
+        if budget <= 0:
+            await gateway_timeout(scope, receive, send)
+            return
+
+        scope["deadline"] = Deadline(time.monotonic() + budget)
+        is_started = False
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal is_started
+            is_started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(app(scope, receive, send_tracked), budget)
+        except asyncio.TimeoutError:
+            if is_started:
+                raise
+            await gateway_timeout(scope, receive, send)
+
+    return timed
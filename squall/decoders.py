@@ -0,0 +1,312 @@
+import ast
+import dataclasses
+import typing
+from types import CodeType, FunctionType
+
+from apischema import deserialization_method, settings
+from apischema.conversions import converters
+from apischema.schemas import get_schema
+from apischema.validation.validators import get_validators
+from squall.validators.ast_helpers import append, assign, call, name, raise_, setitem
+
+# Types checked with `type(value) is <type>`, as apischema does not coerce them
+EXACT_TYPES = {str: "str", int: "int", bool: "bool"}
+
+
+class Unsupported(Exception):
+    """Model can't be decoded by the generated code"""
+
+
+class Invalid(Exception):
+    """Document doesn't match the model exactly, apischema takes over"""
+
+
+def type_is_not(value: str, type_name: str) -> ast.Compare:
+    """Generates the following code: `type(value) is not type_name`"""
+    return ast.Compare(
+        left=ast.Call(func=name("type"), args=[name(value)], keywords=[]),
+        ops=[ast.IsNot()],
+        comparators=[name(type_name)],
+    )
+
+
+def is_not(value: str, other: ast.expr) -> ast.Compare:
+    """Generates the following code: `value is not other`"""
+    return ast.Compare(left=name(value), ops=[ast.IsNot()], comparators=[other])
+
+
+def raise_invalid() -> ast.Raise:
+    return raise_(name("Invalid"))
+
+
+class DecoderCompiler:
+    """Builds decoder of the request model from the parsed JSON document.
+
+    For every dataclass of the model a function checking the document types
+    and constructing the instance directly gets generated.
+    Generated code accepts documents apischema would deserialize into equal
+    instances only. Anything else, including invalid documents, is passed
+    to the apischema deserializer, so errors are reported the same way.
+
+    Example:
+        >>> @dataclass
+        >>> class Item:
+        >>>     name: str
+        >>>     price: float
+        >>>     tags: List[str] = field(default_factory=list)
+
+        Will generate code similar to the following:
+        >>> def decode_1(data):
+        >>>     if type(data) is not dict:
+        >>>         raise Invalid
+        >>>     found = 2
+        >>>     kwargs = {}
+        >>>     v_0 = data["name"]
+        >>>     if type(v_0) is not str:
+        >>>         raise Invalid
+        >>>     v_1 = data["price"]
+        >>>     if type(v_1) is not float:
+        >>>         if type(v_1) is not int:
+        >>>             raise Invalid
+        >>>         v_1 = float(v_1)
+        >>>     v_2 = data.get("tags", MISSING)
+        >>>     if v_2 is not MISSING:
+        >>>         ...
+        >>>         kwargs["tags"] = v_2
+        >>>         found += 1
+        >>>     if len(data) != found:
+        >>>         raise Invalid
+        >>>     return model_2(name=v_0, price=v_1, **kwargs)
+    """
+
+    def __init__(self, model: typing.Any) -> None:
+        self.model = model
+        self.globals: typing.Dict[str, typing.Any] = {
+            "type": type,
+            "len": len,
+            "dict": dict,
+            "list": list,
+            "float": float,
+            "Invalid": Invalid,
+            "MISSING": object(),
+            **{v: k for k, v in EXACT_TYPES.items()},
+        }
+        self.functions: typing.Dict[typing.Any, str] = {}
+        self.definitions: typing.List[typing.Tuple[str, typing.List[typing.Any]]] = []
+        self._names = 0
+
+    def get_name(self, prefix: str) -> str:
+        self._names += 1
+        return f"{prefix}_{self._names}"
+
+    def build_value(self, tp: typing.Any, var: str) -> typing.List[typing.Any]:
+        """Builds checks and conversion of `var` holding the `tp` value"""
+        origin, args = typing.get_origin(tp), typing.get_args(tp)
+        if tp is typing.Any:
+            return []
+        elif origin is typing.Annotated:
+            # Annotations may carry apischema schema constraints
+            raise Unsupported(f"{tp} is annotated")
+        elif tp in EXACT_TYPES:
+            return [
+                ast.If(
+                    test=type_is_not(var, EXACT_TYPES[tp]),
+                    body=[raise_invalid()],
+                    orelse=[],
+                )
+            ]
+        elif tp is float:
+            to_float = assign(var, call("float", args=[name(var)]))
+            return [
+                ast.If(
+                    test=type_is_not(var, "float"),
+                    body=[
+                        ast.If(
+                            test=type_is_not(var, "int"),
+                            body=[raise_invalid()],
+                            orelse=[],
+                        ),
+                        to_float,
+                    ],
+                    orelse=[],
+                )
+            ]
+        elif tp is type(None):
+            return [
+                ast.If(
+                    test=is_not(var, ast.Constant(None)),
+                    body=[raise_invalid()],
+                    orelse=[],
+                )
+            ]
+        elif origin is typing.Union and len(args) == 2 and type(None) in args:
+            # Optional value
+            value_type = args[0] if args[1] is type(None) else args[1]
+            body = self.build_value(value_type, var)
+            if not body:
+                return []
+            return [ast.If(test=is_not(var, ast.Constant(None)), body=body, orelse=[])]
+        elif origin is list and len(args) == 1:
+            items, item = self.get_name("items"), self.get_name("item")
+            loop = ast.For(
+                target=ast.Name(id=item, ctx=ast.Store()),
+                iter=name(var),
+                body=[*self.build_value(args[0], item), append(items, name(item))],
+                orelse=[],
+                type_comment=None,
+            )
+            return [
+                ast.If(
+                    test=type_is_not(var, "list"), body=[raise_invalid()], orelse=[]
+                ),
+                assign(items, ast.List(elts=[], ctx=ast.Load())),
+                loop,
+                assign(var, name(items)),
+            ]
+        elif dataclasses.is_dataclass(tp) and isinstance(tp, type):
+            return [assign(var, call(self.build_dataclass(tp), args=[name(var)]))]
+        raise Unsupported(f"{tp} isn't supported")
+
+    def build_dataclass(self, model: typing.Type[typing.Any]) -> str:
+        """Builds decoding function of the dataclass, returns its name"""
+        if model in self.functions:
+            return self.functions[model]
+
+        function_name = self.functions[model] = self.get_name("decode")
+        model_name = self.get_name("model")
+        self.globals[model_name] = model
+        if (
+            get_schema(model) is not None
+            or get_validators(model)
+            or getattr(converters, "_deserializers", {}).get(model)
+        ):
+            raise Unsupported(
+                f"{model} has apischema schema, validators or conversions"
+            )
+
+        hints = typing.get_type_hints(model, include_extras=True)
+        fields = dataclasses.fields(model)
+        required = [i for i in fields if not self.has_default(i)]
+        optional = [i for i in fields if self.has_default(i)]
+        rows: typing.List[typing.Any] = [
+            ast.If(test=type_is_not("data", "dict"), body=[raise_invalid()], orelse=[])
+        ]
+        if optional:
+            rows.append(assign("found", ast.Constant(len(required))))
+            rows.append(assign("kwargs", ast.Dict(keys=[], values=[])))
+
+        keywords = []
+        for field in fields:
+            if field.metadata or not field.init:
+                raise Unsupported(f"{model}.{field.name} is customized")
+            if settings.aliaser(field.name) != field.name:
+                raise Unsupported("apischema aliaser is set")
+
+            var = self.get_name("v")
+            key = ast.Constant(field.name)
+            checks = self.build_value(hints[field.name], var)
+            if field in required:
+                subscript = ast.Subscript(value=name("data"), slice=key, ctx=ast.Load())
+                rows.append(assign(var, subscript))
+                rows.extend(checks)
+                keywords.append(ast.keyword(arg=field.name, value=name(var)))
+            else:
+                rows.append(
+                    assign(var, call("data", ["get"], args=[key, name("MISSING")]))
+                )
+                increment = ast.AugAssign(
+                    target=ast.Name(id="found", ctx=ast.Store()),
+                    op=ast.Add(),
+                    value=ast.Constant(1),
+                )
+                body = [*checks, setitem("kwargs", field.name, name(var)), increment]
+                rows.append(
+                    ast.If(test=is_not(var, name("MISSING")), body=body, orelse=[])
+                )
+
+        found = name("found") if optional else ast.Constant(len(required))
+        # Unexpected properties are rejected by apischema
+        rows.append(
+            ast.If(
+                test=ast.Compare(
+                    left=ast.Call(func=name("len"), args=[name("data")], keywords=[]),
+                    ops=[ast.NotEq()],
+                    comparators=[found],
+                ),
+                body=[raise_invalid()],
+                orelse=[],
+            )
+        )
+        if optional:
+            keywords.append(ast.keyword(arg=None, value=name("kwargs")))
+        rows.append(
+            ast.Return(
+                value=ast.Call(func=name(model_name), args=[], keywords=keywords)
+            )
+        )
+        self.definitions.append((function_name, rows))
+        return function_name
+
+    @staticmethod
+    def has_default(field: "dataclasses.Field[typing.Any]") -> bool:
+        default_factory: typing.Any = getattr(field, "default_factory")
+        return (
+            field.default is not dataclasses.MISSING
+            or default_factory is not dataclasses.MISSING
+        )
+
+    def build_function(self, function_name: str, rows: typing.List[typing.Any]) -> None:
+        function_ast = ast.FunctionDef(
+            name=function_name,
+            args=ast.arguments(
+                args=[ast.arg("data")],
+                vararg=None,
+                kwarg=None,
+                defaults=[],
+                kwonlyargs=[],
+                kw_defaults=[],
+                posonlyargs=[],
+            ),
+            body=rows,
+            decorator_list=[],
+        )
+        module_ast = ast.Module(body=[function_ast], type_ignores=[])
+        ast.fix_missing_locations(module_ast)
+
+        module_code = compile(module_ast, "<not_a_file>", "exec")
+        function_code = [c for c in module_code.co_consts if isinstance(c, CodeType)][0]
+        self.globals[function_name] = FunctionType(function_code, globals=self.globals)
+
+    def build(self) -> typing.Callable[[typing.Any], typing.Any]:
+        """Builds decoder of the model. Raises `Unsupported` if not possible"""
+        if settings.additional_properties or settings.deserialization.coerce:
+            raise Unsupported("apischema deserialization settings are customized")
+
+        rows = self.build_value(self.model, "data")
+        rows.append(ast.Return(value=name("data")))
+        self.definitions.append(("decode", rows))
+        for function_name, function_rows in self.definitions:
+            self.build_function(function_name, function_rows)
+        decode: typing.Callable[[typing.Any], typing.Any] = self.globals["decode"]
+        return decode
+
+
+def get_request_decoder(model: typing.Any) -> typing.Callable[[typing.Any], typing.Any]:
+    """Returns the fastest available deserializer of the request model.
+
+    The generated decoder is tried first. If the document doesn't match it,
+    apischema deserializes the document or raises the validation error.
+    """
+    deserializer = deserialization_method(model)
+    try:
+        decode = DecoderCompiler(model).build()
+    except Unsupported:
+        return deserializer
+
+    def decoder(data: typing.Any) -> typing.Any:
+        try:
+            return decode(data)
+        except Exception:
+            return deserializer(data)
+
+    return decoder
@@ -0,0 +1,189 @@
+import asyncio
+import inspect
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from squall.params import Depends
+from squall.requests import Request
+from starlette.concurrency import run_in_threadpool
+
+# Key of the request instance among resolved values
+REQUEST = Request
+
+
+@dataclass
+class DependencyCall:
+    """Single provider call of the resolved dependencies graph
+
+    :param key: key of the provided value, the provider itself if cached
+    :param func: provider callable
+    :param arguments: provider parameters names, keys of values passed to them
+                      and whether the value is a singleton
+    :param singleton: value lives as long as the application
+    :param is_coroutine: provider is awaited, otherwise runs in the thread pool
+    """
+
+    key: Hashable
+    func: Callable[..., Any]
+    arguments: List[Tuple[str, Hashable, bool]]
+    singleton: bool = False
+    is_coroutine: bool = False
+
+
+def get_dependencies(func: Callable[..., Any]) -> Dict[str, Depends]:
+    """Returns parameters declared with `Depends`"""
+    signature = inspect.signature(func)
+    return {
+        k: v.default
+        for k, v in signature.parameters.items()
+        if isinstance(v.default, Depends)
+    }
+
+
+class Singletons:
+    """Application lifetime dependencies.
+
+    Values are created on the application startup in the dependencies order
+    and finalized on shutdown in the reversed one. Values requested before
+    the startup, e.g. without lifespan, are created on the first use.
+    """
+
+    def __init__(self) -> None:
+        self.calls: Dict[Hashable, DependencyCall] = {}
+        self.values: Dict[Hashable, Any] = {}
+        self._exit_stack = AsyncExitStack()
+
+    def register(self, calls: List[DependencyCall]) -> None:
+        for call in calls:
+            self.calls.setdefault(call.key, call)
+
+    async def get(self, key: Hashable) -> Any:
+        if key not in self.values:
+            call = self.calls[key]
+            kwargs = {}
+            for name, argument, _ in call.arguments:
+                kwargs[name] = await self.get(argument)
+            self.values[key] = await self.create(call.func, kwargs)
+        return self.values[key]
+
+    async def create(self, func: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+        if inspect.isasyncgenfunction(func):
+            manager = asynccontextmanager(func)(**kwargs)
+            return await self._exit_stack.enter_async_context(manager)
+        elif inspect.isgeneratorfunction(func):
+            return self._exit_stack.enter_context(contextmanager(func)(**kwargs))
+        elif asyncio.iscoroutinefunction(func):
+            return await func(**kwargs)
+        return func(**kwargs)
+
+    async def __aenter__(self) -> "Singletons":
+        for key in self.calls:
+            await self.get(key)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        try:
+            await self._exit_stack.aclose()
+        finally:
+            self.values.clear()
+            self._exit_stack = AsyncExitStack()
+
+
+class DependencyResolver:
+    """Resolves endpoint dependencies.
+
+    The dependencies graph is flattened into the call order once,
+    on the route creation. Per request, providers get called in this order
+    and their values are passed to dependants.
+    """
+
+    def __init__(self, endpoint: Callable[..., Any]) -> None:
+        self.calls: List[DependencyCall] = []
+        self.singleton_calls: List[DependencyCall] = []
+        self.singletons = Singletons()
+        self._resolved: Dict[Hashable, bool] = {REQUEST: False}
+        self.parameters = [
+            (name, *self.resolve(depends, (endpoint,)))
+            for name, depends in get_dependencies(endpoint).items()
+        ]
+
+    def resolve(
+        self, depends: Depends, path: Tuple[Callable[..., Any], ...]
+    ) -> Tuple[Hashable, bool]:
+        """Adds provider and its dependencies to the calls order.
+        Returns the provided value key and whether it is a singleton.
+        """
+        func = depends.dependency
+        assert func not in path, f"Circular dependency {func} of {path[-1]}"
+        key: Hashable = func if depends.use_cache or depends.singleton else object()
+        if key in self._resolved:
+            return key, self._resolved[key]
+        assert depends.singleton or not (
+            inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func)
+        ), f"Generator {func} can be a singleton dependency only"
+
+        arguments = []
+        for name, param in inspect.signature(func).parameters.items():
+            if isinstance(param.default, Depends):
+                argument, singleton = self.resolve(param.default, (*path, func))
+                assert singleton or not depends.singleton, (
+                    f"Singleton {func} can't depend "
+                    f"on request-scoped {param.default.dependency}"
+                )
+            elif param.annotation == Request:
+                assert not depends.singleton, f"Singleton {func} can't use request"
+                argument, singleton = REQUEST, False
+            elif param.default is not param.empty:
+                continue
+            else:
+                raise AssertionError(f"Parameter {name} of {func} isn't injectable")
+            arguments.append((name, argument, singleton))
+
+        call = DependencyCall(
+            key,
+            func,
+            arguments,
+            singleton=depends.singleton,
+            is_coroutine=asyncio.iscoroutinefunction(func),
+        )
+        if depends.singleton:
+            self.singleton_calls.append(call)
+        else:
+            self.calls.append(call)
+        self._resolved[key] = depends.singleton
+        return key, depends.singleton
+
+    def bind(self, singletons: Singletons) -> None:
+        """Uses the application singletons"""
+        singletons.register(self.singleton_calls)
+        self.singletons = singletons
+
+    async def __call__(self, request: Request) -> Dict[str, Any]:
+        """Returns values of the endpoint dependencies"""
+        values: Dict[Hashable, Any] = {REQUEST: request}
+        singletons = self.singletons.values
+        for call in self.calls:
+            kwargs = {}
+            for name, key, singleton in call.arguments:
+                if not singleton:
+                    kwargs[name] = values[key]
+                elif key in singletons:
+                    kwargs[name] = singletons[key]
+                else:
+                    kwargs[name] = await self.singletons.get(key)
+
+            if call.is_coroutine:
+                values[call.key] = await call.func(**kwargs)
+            else:
+                values[call.key] = await run_in_threadpool(call.func, **kwargs)
+
+        result = {}
+        for name, key, singleton in self.parameters:
+            if not singleton:
+                result[name] = values[key]
+            elif key in singletons:
+                result[name] = singletons[key]
+            else:
+                result[name] = await self.singletons.get(key)
+        return result
@@ -0,0 +1,47 @@
+import asyncio
+
+from squall.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class DisconnectCounter:
+    """Counts requests whose handling got cancelled by the client disconnect"""
+
+    def __init__(self) -> None:
+        self.cancelled = 0
+
+
+def get_cancellable_handler(app: ASGIApp, counter: DisconnectCounter) -> ASGIApp:
+    """Wraps route handler with watching of the client disconnect.
+
+    The handler runs in a separate task, while the `receive` channel is
+    pumped into it. Once `http.disconnect` arrives the task gets cancelled.
+    """
+
+    async def cancellable(scope: Scope, receive: Receive, send: Send) -> None:
+        # Single slot keeps the request body streaming backpressure
+        messages: "asyncio.Queue[Message]" = asyncio.Queue(maxsize=1)
+        handler = asyncio.ensure_future(app(scope, messages.get, send))
+        is_disconnected = False
+
+        async def watch() -> None:
+            nonlocal is_disconnected
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    is_disconnected = True
+                    handler.cancel()
+                    return
+                await messages.put(message)
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not is_disconnected:
+                raise
+            counter.cancelled += 1
+        finally:
+            handler.cancel()
+            watcher.cancel()
+
+    return cancellable
@@ -0,0 +1,227 @@
+import dataclasses
+from datetime import date, datetime, time
+from decimal import Decimal
+from random import random
+from typing import Any, Callable, Optional, Tuple, Type
+from uuid import UUID
+
+import orjson
+from apischema import ValidationError, deserialization_method, serialization_method
+from apischema.serialization import PassThroughOptions
+from squall.codecs import CodecRegistry
+from squall.logger import logger
+from squall.responses import (
+    JSONResponse,
+    JSONStreamingResponse,
+    PrettyJSONResponse,
+    Response,
+)
+
+Codec = Callable[[Any], Any]
+
+# Values orjson renders on its own, or with `squall.responses.default`,
+# exactly the same way apischema serializes them
+PASS_THROUGH = PassThroughOptions(
+    collections=True,
+    dataclasses=True,
+    enums=True,
+    tuple=True,
+    types=(date, datetime, time, UUID, Decimal),
+)
+
+VALIDATION_MODES = ("always", "sampled", "never", "startup")
+
+
+def renders_with_orjson(response_class: Type[Response]) -> bool:
+    """Response class renders dataclasses and other pass-through values"""
+    if getattr(response_class, "json_option", 0) & orjson.OPT_PASSTHROUGH_DATACLASS:
+        return False
+    if issubclass(response_class, JSONStreamingResponse):
+        return response_class.render_item is JSONStreamingResponse.render_item
+    return response_class.render in (JSONResponse.render, PrettyJSONResponse.render)
+
+
+def is_identity(method: Codec) -> bool:
+    """Serialization method returns values as is"""
+    probe = object()
+    try:
+        return method(probe) is probe
+    except Exception:
+        return False
+
+
+def get_response_codecs(
+    model: Any, response_class: Type[Response], deserialize: bool
+) -> Tuple[Optional[Codec], Codec]:
+    """Builds response deserializer and serializer of the model.
+
+    Returned model instances are type checked, fields included, by apischema
+    serialization. If the response class renders with orjson, values orjson
+    renders natively are passed to it as is, so they are rendered the same way
+    with or without the check. Results converted into the model are rendered
+    as is, if the whole model consists of such values.
+
+    :param model: response model
+    :param response_class: class of the rendered response
+    :param deserialize: endpoint result should be converted into the model,
+                        otherwise the endpoint returns model instances
+    :returns: deserializer, if needed, and serializer
+    """
+    orjson_native = renders_with_orjson(response_class)
+    if not deserialize:
+        if orjson_native:
+            return None, serialization_method(
+                model, check_type=True, pass_through=PASS_THROUGH
+            )
+        return None, serialization_method(model, check_type=True)
+    if not orjson_native:
+        return (
+            deserialization_method(model),
+            serialization_method(model, check_type=False),
+        )
+
+    encoder = serialization_method(model, check_type=False, pass_through=PASS_THROUGH)
+    deserializer = deserialization_method(model)
+    if is_identity(encoder):
+        # Deserialized instances are rendered as is
+        return None, deserializer
+
+    def encode(value: Any) -> Any:
+        return encoder(deserializer(value))
+
+    return None, encode
+
+
+def get_fast_codecs(
+    model: Any, response_class: Type[Response], deserialize: bool
+) -> Tuple[Optional[Codec], Optional[Codec]]:
+    """Builds response deserializer and serializer of the model skipping
+    type checks where possible. Serializer is None if the endpoint result
+    is rendered as is: the response class renders with orjson and the model
+    consists of values orjson renders natively.
+    """
+    if deserialize:
+        # Endpoint results are converted into the model by the deserialization,
+        # so it can't be skipped
+        return get_response_codecs(model, response_class, deserialize)
+    if not renders_with_orjson(response_class):
+        return None, serialization_method(model, check_type=False)
+
+    encoder = serialization_method(model, check_type=False, pass_through=PASS_THROUGH)
+    if is_identity(encoder):
+        return None, None
+    return None, encoder
+
+
+@dataclasses.dataclass
+class ResponseValidation:
+    """Response model validation policy.
+
+    :param mode: `always` validates every response.
+                 `never` renders responses with the fastest serializer.
+                 `sampled` validates the `rate` fraction of responses.
+                 `startup` validates the first response of the route only.
+                 Violations found in `sampled` and `startup` modes are logged
+                 and counted, the response is rendered anyway
+    :param rate: fraction of validated responses in the `sampled` mode
+    """
+
+    mode: str = "always"
+    rate: float = 1.0
+
+    def __post_init__(self) -> None:
+        assert self.mode in VALIDATION_MODES, f"Unknown validation mode {self.mode}"
+        assert 0 <= self.rate <= 1, "Sampling rate should be within [0, 1]"
+
+    @classmethod
+    def always(cls) -> "ResponseValidation":
+        return cls("always")
+
+    @classmethod
+    def sampled(cls, rate: float) -> "ResponseValidation":
+        return cls("sampled", rate)
+
+    @classmethod
+    def never(cls) -> "ResponseValidation":
+        return cls("never")
+
+    @classmethod
+    def startup_only(cls) -> "ResponseValidation":
+        return cls("startup")
+
+
+class ResponseValidator:
+    """Builds response codecs of the route according to the validation policy
+    and counts responses validated out of the request path.
+    """
+
+    def __init__(self, policy: Optional[ResponseValidation] = None) -> None:
+        self.policy = policy or ResponseValidation()
+        self.checked = 0
+        self.violations = 0
+
+    def get_codecs(
+        self,
+        model: Any,
+        response_class: Type[Response],
+        deserialize: bool,
+        codecs: Optional[CodecRegistry] = None,
+    ) -> Tuple[Optional[Codec], Optional[Codec]]:
+        """Returns response deserializer and serializer of the model.
+        Codecs are shared with other routes via the registry.
+        """
+        registry = codecs or CodecRegistry()
+        key = (model, response_class, deserialize)
+        mode = self.policy.mode
+        if mode == "always" or (mode == "sampled" and self.policy.rate == 1):
+            return registry.get(
+                "response",
+                key,
+                lambda: get_response_codecs(model, response_class, deserialize),
+            )
+
+        fast_deserializer, fast = registry.get(
+            "response_fast",
+            key,
+            lambda: get_fast_codecs(model, response_class, deserialize),
+        )
+        if mode == "never" or (mode == "sampled" and self.policy.rate == 0):
+            return fast_deserializer, fast
+        if deserialize:
+            # Fast codecs validate anyway
+            return fast_deserializer, fast
+
+        # Values orjson renders natively are passed through, as the result
+        # of the check is dropped anyway
+        checker: Codec = registry.get(
+            "response_check",
+            model,
+            lambda: serialization_method(
+                model, check_type=True, pass_through=PASS_THROUGH
+            ),
+        )
+        rate = self.policy.rate
+
+        def check(value: Any) -> None:
+            self.checked += 1
+            try:
+                checker(value)
+            except (ValidationError, TypeError) as e:
+                self.violations += 1
+                logger.warning("Response doesn't match the model %s: %s", model, e)
+
+        if mode == "sampled":
+
+            def serializer(value: Any) -> Any:
+                if random() < rate:
+                    check(value)
+                return value if fast is None else fast(value)
+
+        else:
+
+            def serializer(value: Any) -> Any:
+                if not self.checked:
+                    check(value)
+                return value if fast is None else fast(value)
+
+        return None, serializer
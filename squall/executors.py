@@ -0,0 +1,205 @@
+import asyncio
+import functools
+import multiprocessing.context
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import anyio
+from squall.exceptions import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+
+@dataclass
+class ExecutorStatistics:
+    """Snapshot of the executor state
+
+    :param name: executor name
+    :param size: maximal number of concurrently running calls
+    :param running: number of currently running calls
+    :param queued: number of calls waiting for a free thread
+    :param rejected: total number of calls rejected because of the full queue
+    """
+
+    name: str
+    size: Optional[int]
+    running: int
+    queued: int
+    rejected: int
+
+
+class Executor:
+    """Runs sync endpoints"""
+
+    name: str
+
+    async def run(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+    def statistics(self) -> ExecutorStatistics:
+        raise NotImplementedError
+
+
+class DefaultExecutor(Executor):
+    """Starlette's thread pool shared by all routes. Used by default"""
+
+    name = "default"
+
+    async def run(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        return await run_in_threadpool(func, **kwargs)
+
+    def statistics(self) -> ExecutorStatistics:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        stats = limiter.statistics()
+        return ExecutorStatistics(
+            name=self.name,
+            size=int(limiter.total_tokens),
+            running=stats.borrowed_tokens,
+            queued=stats.tasks_waiting,
+            rejected=0,
+        )
+
+
+class InlineExecutor(Executor):
+    """Calls the endpoint right in the event loop thread.
+    Suitable for fast sync endpoints which never block.
+    """
+
+    name = "inline"
+
+    async def run(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        return func(**kwargs)
+
+    def statistics(self) -> ExecutorStatistics:
+        return ExecutorStatistics(self.name, None, 0, 0, 0)
+
+
+class ThreadPool(Executor):
+    """Dedicated bounded pool of worker threads.
+
+    Routes sharing the same instance share its capacity, while calls of
+    other routes never wait for it. Calls exceeding the queue limit are
+    rejected with `503 Service Unavailable`.
+
+    Examples:
+        >>> reports = ThreadPool("reports", size=4, queue_limit=100)
+        >>>
+        >>> @app.get("/report", executor=reports)
+        >>> def get_report():
+        >>>     return build_report()
+    """
+
+    def __init__(
+        self, name: str, size: int = 10, queue_limit: Optional[int] = None
+    ) -> None:
+        """
+        :param name: pool name used in statistics
+        :param size: number of threads
+        :param queue_limit: maximal number of calls waiting for a free thread.
+                            Unlimited if None
+        """
+        self.name = name
+        self.size = size
+        self.queue_limit = queue_limit
+        self.rejected = 0
+        # Limiter can be created only inside of the running event loop
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+
+    async def run(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        limiter = self._limiter
+        if limiter is None:
+            limiter = self._limiter = anyio.CapacityLimiter(self.size)
+        if (
+            self.queue_limit is not None
+            and limiter.available_tokens == 0
+            and limiter.statistics().tasks_waiting >= self.queue_limit
+        ):
+            self.rejected += 1
+            raise HTTPException(status_code=503)
+
+        return await anyio.to_thread.run_sync(
+            functools.partial(func, **kwargs), limiter=limiter
+        )
+
+    def statistics(self) -> ExecutorStatistics:
+        running = queued = 0
+        if self._limiter is not None:
+            stats = self._limiter.statistics()
+            running, queued = stats.borrowed_tokens, stats.tasks_waiting
+        return ExecutorStatistics(
+            name=self.name,
+            size=self.size,
+            running=running,
+            queued=queued,
+            rejected=self.rejected,
+        )
+
+
+class ProcessPool(Executor):
+    """Pool of worker processes for CPU-bound sync endpoints.
+
+    The endpoint and its arguments should be picklable. The result returns
+    to the regular response serialization in the main process.
+    The pool gets started and shut down together with the application.
+
+    Examples:
+        >>> thumbnails = ProcessPool("thumbnails", size=4)
+        >>>
+        >>> @app.get("/thumbnail/{image_id}", executor=thumbnails)
+        >>> def get_thumbnail(image_id: int):
+        >>>     return make_thumbnail(image_id)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: Optional[int] = None,
+        mp_context: Optional[multiprocessing.context.BaseContext] = None,
+    ) -> None:
+        """
+        :param name: pool name used in statistics
+        :param size: number of processes. Number of CPUs if None
+        :param mp_context: multiprocessing context used for starting processes
+        """
+        self.name = name
+        self.size = size or os.cpu_count() or 1
+        self.mp_context = mp_context
+        self.submitted = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def __aenter__(self) -> "ProcessPool":
+        # Pool belongs to a single application lifespan
+        assert self._pool is None, f"Process pool {self.name!r} is already started"
+        self._pool = ProcessPoolExecutor(self.size, mp_context=self.mp_context)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await anyio.to_thread.run_sync(pool.shutdown)
+
+    async def run(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        assert self._pool is not None, f"Process pool {self.name!r} isn't started"
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        try:
+            return await loop.run_in_executor(
+                self._pool, functools.partial(func, **kwargs)
+            )
+        finally:
+            self.submitted -= 1
+
+    def statistics(self) -> ExecutorStatistics:
+        running = min(self.submitted, self.size)
+        return ExecutorStatistics(
+            name=self.name,
+            size=self.size,
+            running=running,
+            queued=self.submitted - running,
+            rejected=0,
+        )
+
+
+default = DefaultExecutor()
+inline = InlineExecutor()
@@ -1,10 +1,13 @@
 import asyncio
+import inspect
 from typing import Any, Callable, Coroutine, Dict, List, Optional, Type, Union
 
 from apischema import ValidationError
 from orjson import JSONDecodeError
+from squall.background import BackgroundTasks
 from squall.bindings import RequestField
 from squall.datastructures import Default, DefaultPlaceholder
+from squall.dependencies import DependencyResolver
 from squall.exceptions import (
     HTTPException,
     RequestHeadValidationError,
@@ -12,15 +15,23 @@ from squall.exceptions import (
     ResponsePayloadValidationError,
     WebSocketRequestValidationError,
 )
+from squall.executors import Executor, InlineExecutor
 from squall.requests import Request
-from squall.responses import JSONResponse, Response
+from squall.responses import (
+    JSONResponse,
+    JSONStreamingResponse,
+    NotModifiedResponse,
+    Response,
+    Versioned,
+    is_not_modified,
+)
 from squall.tracing.constants import SpanName
 from squall.tracing.helpers import CurrentSpan
 from squall.types import ASGIApp
 from squall.websockets import WebSocket
 from starlette.concurrency import run_in_threadpool
 from starlette.status import WS_1008_POLICY_VIOLATION
-from starlette.types import Receive, Scope, Send
+from starlette.types import Message, Receive, Scope, Send
 
 
 def get_http_handler(
@@ -34,8 +45,11 @@ def get_http_handler(
     response_deserializer: Optional[Callable[..., Any]] = None,
     response_serializer: Optional[Callable[..., Any]] = None,
     trace_internals: bool = False,
+    executor: Optional[Executor] = None,
+    dependencies: Optional[DependencyResolver] = None,
 ) -> ASGIApp:
     is_coroutine = asyncio.iscoroutinefunction(endpoint)
+    is_inline = isinstance(executor, InlineExecutor)
     # is_body_form = body_field and isinstance(body_field.field_info, params.Form)
     if isinstance(response_class, DefaultPlaceholder):
         actual_response_class: Type[Response] = response_class.value
@@ -47,6 +61,14 @@ def get_http_handler(
         request_model_param = request_field.name
         request_model = request_field.model
 
+    is_async_generator = inspect.isasyncgenfunction(endpoint)
+    is_streaming = issubclass(actual_response_class, JSONStreamingResponse)
+    streaming_args: Dict[str, Any] = {
+        "serializer": get_item_serializer(response_deserializer, response_serializer)
+    }
+    if status_code is not None:
+        streaming_args["status_code"] = status_code
+
     async def app(scope: Scope, receive: Receive, send: Send) -> None:
         with CurrentSpan(SpanName.pulling_request_data, trace_internals):
             request = Request(scope, receive=receive, send=send)
@@ -59,6 +81,9 @@ def get_http_handler(
             else:
                 kwargs = {}
 
+            if dependencies is not None:
+                kwargs.update(await dependencies(request))
+
             # Body fields and request object
             form = None
             try:
@@ -72,6 +97,17 @@ def get_http_handler(
                         kind = field["kind"]
                         if kind == "request":
                             kwargs[field["name"]] = request
+                        elif kind == "deadline":
+                            kwargs[field["name"]] = scope.get("deadline")
+                        elif kind == "background":
+                            background = scope.setdefault(
+                                "background", BackgroundTasks()
+                            )
+                            kwargs[field["name"]] = background
+                        elif kind == "jobs":
+                            kwargs[field["name"]] = scope["app"].jobs
+                        elif kind == "loader":
+                            kwargs[field["name"]] = field["loader"].get(scope)
                         elif kind == "body":
                             ct = request.headers.get("content-type")
                             if ct is not None and ct[-4:] == "json":
@@ -105,15 +141,36 @@ def get_http_handler(
         with CurrentSpan(SpanName.handle, trace_internals):
             if is_coroutine:
                 raw_response = await endpoint(**kwargs)
+            elif is_async_generator or is_inline:
+                raw_response = endpoint(**kwargs)
+            elif executor is not None:
+                raw_response = await executor.run(endpoint, **kwargs)
             else:
                 raw_response = await run_in_threadpool(endpoint, **kwargs)
 
+        etag = None
+        if isinstance(raw_response, Versioned):
+            etag = raw_response.etag
+            if is_not_modified(scope, etag):
+                await NotModifiedResponse(etag)(scope, receive, send)
+                return
+            raw_response = raw_response.content
+
         if isinstance(raw_response, Response):
             raw_response.request = request
+            if etag is not None:
+                raw_response.etag = etag
             with CurrentSpan(SpanName.returning_response, trace_internals):
                 await raw_response(scope, receive, send)
             return
 
+        if is_streaming:
+            # Items get serialized one by one while the response is being sent
+            response = actual_response_class(raw_response, **streaming_args)
+            with CurrentSpan(SpanName.returning_response, trace_internals):
+                await response(scope, receive, send)
+            return
+
         with CurrentSpan(SpanName.response_preparation, trace_internals):
             response_args: Dict[str, Any] = {}
 
@@ -140,6 +197,7 @@ def get_http_handler(
             response = actual_response_class(result, **response_args)
             # Temporary solution in order to avoid header initialization
             response.request = request
+            response.etag = etag
 
         with CurrentSpan(SpanName.returning_response, trace_internals):
             await response(scope, receive, send)
@@ -147,6 +205,42 @@ def get_http_handler(
     return app
 
 
+def get_item_serializer(
+    response_deserializer: Optional[Callable[..., Any]] = None,
+    response_serializer: Optional[Callable[..., Any]] = None,
+) -> Optional[Callable[[Any], Any]]:
+    """Returns serializer of the single streamed item"""
+    if response_serializer is None:
+        return None
+    if response_deserializer is None:
+        return response_serializer
+
+    serialize, deserialize = response_serializer, response_deserializer
+
+    def serializer(item: Any) -> Any:
+        return serialize(deserialize(item))
+
+    return serializer
+
+
+def get_head_handler(app: ASGIApp) -> ASGIApp:
+    """Wraps GET handler for serving HEAD requests.
+    Endpoint runs and response headers are calculated as for GET,
+    but the response body is never sent.
+    """
+
+    async def head(scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_head(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await send(message)
+            elif not message.get("more_body", False):
+                await send({"type": "http.response.body", "body": b""})
+
+        await app(scope, receive, send_head)
+
+    return head
+
+
 def get_websocket_handler(
     endpoint: Callable[..., Any],
     head_validator: Optional[Callable[..., Any]] = None,
@@ -0,0 +1,269 @@
+import asyncio
+import sqlite3
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import anyio
+import orjson
+from squall.logger import logger
+from starlette.concurrency import run_in_threadpool
+
+JobFunc = Callable[..., Any]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, run_at);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    name: str
+    args: List[Any]
+    kwargs: Dict[str, Any]
+    attempts: int
+
+
+@dataclass
+class JobQueueStatistics:
+    """Number of the stored jobs by status
+
+    :param pending: waiting for execution, including retries
+    :param running: being executed at the moment
+    :param failed: exceeded the maximal number of attempts
+    :param completed: successfully executed since the queue start
+    """
+
+    pending: int
+    running: int
+    failed: int
+    completed: int
+
+
+class JobQueue:
+    """Durable queue of the deferred jobs stored in the SQLite database.
+
+    Jobs survive the application restart. Functions are registered by name,
+    arguments should be JSON serializable. Async functions are awaited,
+    sync ones run in the thread pool. Workers start and stop together
+    with the application.
+
+    Examples:
+        >>> jobs = JobQueue("jobs.sqlite3")
+        >>> app = Squall(jobs=jobs)
+        >>>
+        >>> @jobs.job
+        >>> async def send_report(user_id: int):
+        >>>     ...
+        >>>
+        >>> @app.post("/reports", status_code=202)
+        >>> async def create_report(jobs: JobQueue, user_id: int = Query()):
+        >>>     await jobs.enqueue(send_report, user_id)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 1,
+        batch_size: int = 10,
+        max_attempts: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        :param path: SQLite database file path
+        :param workers: number of concurrently processed batches
+        :param batch_size: maximal number of jobs taken by the worker at once
+        :param max_attempts: number of attempts before the job marked as failed
+        :param backoff: delay before the first retry, doubles on each next one
+        :param max_backoff: maximal delay between retries
+        :param poll_interval: seconds between checks for the scheduled jobs
+        """
+        self.path = path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.functions: Dict[str, JobFunc] = {}
+        self.completed = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        # Connection is used by a single thread at once
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List["asyncio.Task[None]"] = []
+
+    def job(self, func: JobFunc) -> JobFunc:
+        """Registers the job function under its qualified name"""
+        self.functions[self.get_name(func)] = func
+        return func
+
+    @staticmethod
+    def get_name(func: JobFunc) -> str:
+        return f"{func.__module__}.{func.__qualname__}"
+
+    async def _execute(self, query: Callable[[sqlite3.Connection], Any]) -> Any:
+        assert self._connection is not None, "Job queue isn't started"
+        connection: sqlite3.Connection = self._connection
+
+        def transaction() -> Any:
+            with connection:
+                return query(connection)
+
+        return await anyio.to_thread.run_sync(transaction, limiter=self._limiter)
+
+    async def enqueue(
+        self, func: Union[str, JobFunc], *args: Any, delay: float = 0, **kwargs: Any
+    ) -> int:
+        """Stores the job and returns its id
+
+        :param func: registered job function or its name
+        :param delay: seconds to postpone the job execution for
+        """
+        name = func if isinstance(func, str) else self.get_name(func)
+        assert name in self.functions, f"Job {name} isn't registered"
+        payload = orjson.dumps([args, kwargs])
+        run_at = time.time() + delay
+
+        def insert(connection: sqlite3.Connection) -> int:
+            cursor = connection.execute(
+                "INSERT INTO jobs (name, payload, run_at) VALUES (?, ?, ?)",
+                (name, payload, run_at),
+            )
+            return cursor.lastrowid or 0
+
+        job_id: int = await self._execute(insert)
+        if self._wakeup is not None and not delay:
+            self._wakeup.set()
+        return job_id
+
+    async def dequeue(self) -> List[Job]:
+        """Takes the batch of jobs ready for execution"""
+
+        def select(connection: sqlite3.Connection) -> List[Tuple[Any, ...]]:
+            rows = connection.execute(
+                "SELECT id, name, payload, attempts FROM jobs "
+                "WHERE status = 'pending' AND run_at <= ? "
+                "ORDER BY run_at, id LIMIT ?",
+                (time.time(), self.batch_size),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE jobs SET status = 'running' WHERE id = ?",
+                [(row[0],) for row in rows],
+            )
+            return rows
+
+        jobs = []
+        for job_id, name, payload, attempts in await self._execute(select):
+            args, kwargs = orjson.loads(payload)
+            jobs.append(Job(job_id, name, args, kwargs, attempts))
+        return jobs
+
+    async def complete(self, job: Job) -> None:
+        await self._execute(
+            lambda c: c.execute("DELETE FROM jobs WHERE id = ?", (job.id,))
+        )
+        self.completed += 1
+
+    async def retry(self, job: Job, error: str) -> None:
+        """Postpones the job with exponential backoff or marks it as failed"""
+        attempts = job.attempts + 1
+        if attempts >= self.max_attempts:
+            status, run_at = "failed", time.time()
+        else:
+            delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+            status, run_at = "pending", time.time() + delay
+
+        await self._execute(
+            lambda c: c.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, run_at = ?, last_error = ? "
+                "WHERE id = ?",
+                (status, attempts, run_at, error, job.id),
+            )
+        )
+
+    async def run(self, job: Job) -> None:
+        func = self.functions.get(job.name)
+        try:
+            if func is None:
+                raise LookupError(f"Job {job.name} isn't registered")
+            if asyncio.iscoroutinefunction(func):
+                await func(*job.args, **job.kwargs)
+            else:
+                await run_in_threadpool(func, *job.args, **job.kwargs)
+        except Exception:
+            logger.exception("Job %s #%s failed", job.name, job.id)
+            await self.retry(job, traceback.format_exc())
+        else:
+            await self.complete(job)
+
+    async def _work(self) -> None:
+        wakeup = self._wakeup
+        assert wakeup is not None
+        while True:
+            jobs = await self.dequeue()
+            if not jobs:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for job in jobs:
+                await self.run(job)
+
+    async def statistics(self) -> JobQueueStatistics:
+        rows = await self._execute(
+            lambda c: c.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        )
+        counts = dict(rows)
+        return JobQueueStatistics(
+            pending=counts.get("pending", 0),
+            running=counts.get("running", 0),
+            failed=counts.get("failed", 0),
+            completed=self.completed,
+        )
+
+    async def __aenter__(self) -> "JobQueue":
+        def connect() -> sqlite3.Connection:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            # Jobs interrupted by the previous shutdown run again
+            with connection:
+                connection.execute(
+                    "UPDATE jobs SET status = 'pending' WHERE status = 'running'"
+                )
+            return connection
+
+        self._limiter = anyio.CapacityLimiter(1)
+        self._connection = await anyio.to_thread.run_sync(connect)
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._work()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await anyio.to_thread.run_sync(connection.close)
@@ -1,6 +1,7 @@
 import asyncio
 import traceback
-from typing import List, TypeVar
+from contextlib import AsyncExitStack
+from typing import Any, AsyncContextManager, List, Optional, TypeVar
 
 from squall.types import AnyFunc, Receive, Scope, Send
 
@@ -8,9 +9,20 @@ _T = TypeVar("_T")
 
 
 class LifespanContext:
-    def __init__(self, on_startup: List[AnyFunc], on_shutdown: List[AnyFunc]):
+    def __init__(
+        self,
+        on_startup: List[AnyFunc],
+        on_shutdown: List[AnyFunc],
+        contexts: Optional[List[AsyncContextManager[Any]]] = None,
+        innermost: Optional[AsyncContextManager[Any]] = None,
+    ):
         self._on_startup = on_startup
         self._on_shutdown = on_shutdown
+        # Entered before startup handlers, exited after shutdown ones
+        self._contexts = [] if contexts is None else contexts
+        # Entered after contexts, exited before them, so it may use them
+        self._innermost = innermost
+        self._exit_stack = AsyncExitStack()
 
     @staticmethod
     async def _run_handlers(handlers: List[AnyFunc]) -> None:
@@ -21,10 +33,19 @@ class LifespanContext:
                 handler()
 
     async def __aenter__(self) -> None:
-        await self._run_handlers(self._on_startup)
+        async with AsyncExitStack() as stack:
+            for context in self._contexts:
+                await stack.enter_async_context(context)
+            if self._innermost is not None:
+                await stack.enter_async_context(self._innermost)
+            await self._run_handlers(self._on_startup)
+            self._exit_stack = stack.pop_all()
 
     async def __aexit__(self, *exc_info: object) -> None:
-        await self._run_handlers(self._on_shutdown)
+        try:
+            await self._run_handlers(self._on_shutdown)
+        finally:
+            await self._exit_stack.aclose()
 
     def __call__(self: _T, app: object) -> _T:
         return self
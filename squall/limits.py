@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+from squall.responses import JSONResponse
+from squall.types import ASGIApp, Receive, Scope, Send
+
+
+@dataclass
+class ConcurrencyLimit:
+    """Concurrency limit policy of the route.
+
+    :param max_concurrency: maximal number of requests handled at once
+    :param max_queue: maximal number of requests waiting for a free slot
+    :param queue_timeout: seconds a request may wait for a free slot
+    :param codel_target: enables CoDel-like shedding. If the minimal queueing
+                         delay within the `codel_interval` exceeds the target,
+                         queued requests wait no longer than the target,
+                         otherwise no longer than the interval
+    :param codel_interval: seconds of the queueing delay observation
+    :param retry_after: value of the Retry-After header of the 503 response
+    """
+
+    max_concurrency: int
+    max_queue: int = 0
+    queue_timeout: Optional[float] = None
+    codel_target: Optional[float] = None
+    codel_interval: float = 0.1
+    retry_after: int = 1
+
+
+class ConcurrencyLimiter:
+    """Admits requests according to the route concurrency limit"""
+
+    def __init__(self, policy: ConcurrencyLimit) -> None:
+        self.policy = policy
+        self.in_flight = 0
+        self.shed = 0
+        self.waiters: Deque["asyncio.Future[None]"] = deque()
+        self.response = JSONResponse(
+            {"detail": "Service Unavailable"},
+            status_code=503,
+            headers={"Retry-After": str(policy.retry_after)},
+        )
+        # CoDel state
+        self.overloaded = False
+        self.interval_end = 0.0
+        self.min_delay = float("inf")
+
+    @property
+    def queued(self) -> int:
+        return len(self.waiters)
+
+    def get_queue_timeout(self, now: float) -> Optional[float]:
+        policy = self.policy
+        if policy.codel_target is None:
+            return policy.queue_timeout
+
+        if now >= self.interval_end:
+            # Interval without admitted requests isn't considered as overloaded
+            self.overloaded = policy.codel_target < self.min_delay < float("inf")
+            self.min_delay = float("inf")
+            self.interval_end = now + policy.codel_interval
+
+        timeout = policy.codel_target if self.overloaded else policy.codel_interval
+        if policy.queue_timeout is not None:
+            timeout = min(timeout, policy.queue_timeout)
+        return timeout
+
+    def observe_delay(self, delay: float) -> None:
+        if delay < self.min_delay:
+            self.min_delay = delay
+
+    async def acquire(self) -> bool:
+        """Takes a slot. Returns False if the request should be shed"""
+        if self.in_flight < self.policy.max_concurrency and not self.waiters:
+            self.in_flight += 1
+            self.observe_delay(0)
+            return True
+
+        if len(self.waiters) >= self.policy.max_queue:
+            self.shed += 1
+            return False
+
+        now = time.monotonic()
+        timeout = self.get_queue_timeout(now)
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before timeout or cancellation
+                self.release()
+            elif waiter in self.waiters:
+                self.waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.shed += 1
+            return False
+
+        self.observe_delay(time.monotonic() - now)
+        return True
+
+    def release(self) -> None:
+        """Hands the slot over to the first waiting request or frees it"""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+def get_limited_handler(app: ASGIApp, limiter: ConcurrencyLimiter) -> ASGIApp:
+    """Wraps route handler with the concurrency limit.
+    Requests exceeding the limit get the prepared `503 Service Unavailable`.
+    """
+
+    async def limited(scope: Scope, receive: Receive, send: Send) -> None:
+        if not await limiter.acquire():
+            await limiter.response(scope, receive, send)
+            return
+        try:
+            await app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    return limited
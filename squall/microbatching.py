@@ -0,0 +1,155 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from squall.logger import logger
+from starlette.concurrency import run_in_threadpool
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+BatchFunc = Callable[[List[Any]], Any]
+
+
+@dataclass
+class MicroBatcherStatistics:
+    """Snapshot of the micro-batcher counters
+
+    :param batches: number of dispatched batches
+    :param items: number of items in the dispatched batches
+    :param failed: number of batches raised an exception
+    :param pending: number of items waiting for the next batch
+    :param histogram: number of batches by size, keys are upper bounds
+                      of the power of two buckets
+    """
+
+    batches: int
+    items: int
+    failed: int
+    pending: int
+    histogram: Dict[int, int] = field(default_factory=dict)
+
+
+class MicroBatcher(Generic[K, V]):
+    """Merges concurrent calls into the single batched function call.
+
+    Items are collected until `max_batch_size` is reached or `max_delay`
+    seconds passed since the first one. The batch function takes the list
+    of items and returns the list of results in the same order.
+    Each caller gets its own result or the exception raised by the batch.
+
+    Examples:
+        >>> app = Squall()
+        >>>
+        >>> @app.batcher(max_batch_size=32, max_delay=0.002)
+        >>> async def get_values(keys: List[str]) -> List[Optional[bytes]]:
+        >>>     return await redis.mget(keys)
+        >>>
+        >>> @app.get("/values/{key}")
+        >>> async def get_value(key: str):
+        >>>     return {"value": await get_values(key)}
+    """
+
+    def __init__(
+        self,
+        func: BatchFunc,
+        max_batch_size: int = 64,
+        max_delay: float = 0.005,
+    ) -> None:
+        """
+        :param func: batch function, sync ones run in the thread pool
+        :param max_batch_size: maximal number of items in the single call
+        :param max_delay: seconds the first item waits for others
+        """
+        self.func = func
+        self.is_coroutine = asyncio.iscoroutinefunction(func)
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self.failed = 0
+        self.histogram: Dict[int, int] = {}
+        self._pending: List[Tuple[K, "asyncio.Future[V]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def __call__(self, item: K) -> V:
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[V]" = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Dispatches collected items without waiting for the batch to fill"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self.dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def dispatch(self, batch: List[Tuple[K, "asyncio.Future[V]"]]) -> None:
+        size = len(batch)
+        self.batches += 1
+        self.items += size
+        bucket = 1 << (size - 1).bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+        items = [item for item, _ in batch]
+        try:
+            if self.is_coroutine:
+                results = await self.func(items)
+            else:
+                results = await run_in_threadpool(self.func, items)
+            if len(results) != size:
+                raise ValueError(
+                    f"Batch function returned {len(results)} results for {size} items"
+                )
+        except Exception as e:
+            self.failed += 1
+            logger.exception("Batch function failed")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def statistics(self) -> MicroBatcherStatistics:
+        return MicroBatcherStatistics(
+            batches=self.batches,
+            items=self.items,
+            failed=self.failed,
+            pending=len(self._pending),
+            histogram=dict(sorted(self.histogram.items())),
+        )
+
+    async def __aenter__(self) -> "MicroBatcher[K, V]":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Dispatches pending items and waits for the running batches"""
+        self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def batched(
+    max_batch_size: int = 64, max_delay: float = 0.005
+) -> Callable[[Any], MicroBatcher[Any, Any]]:
+    """Decorator turning the batch function into the `MicroBatcher`"""
+
+    def decorator(func: BatchFunc) -> MicroBatcher[Any, Any]:
+        return MicroBatcher(func, max_batch_size=max_batch_size, max_delay=max_delay)
+
+    return decorator
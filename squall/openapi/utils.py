@@ -8,6 +8,7 @@ from apischema.json_schema import (
     deserialization_schema,
     serialization_schema,
 )
+from squall.codecs import CodecRegistry
 from squall.datastructures import DefaultPlaceholder
 from squall.openapi.constants import (
     METHODS_WITH_BODY,
@@ -106,13 +107,30 @@ def get_openapi_operation_metadata(*, route: APIRoute, method: str) -> Dict[str,
 
 
 class OpenAPIRoute:
-    def __init__(self, route: APIRoute, version: JsonSchemaVersion) -> None:
+    def __init__(
+        self,
+        route: APIRoute,
+        version: JsonSchemaVersion,
+        codecs: Optional[CodecRegistry] = None,
+    ) -> None:
         self.version = version
         self.route = route
+        self.codecs = codecs or CodecRegistry()
         self._response_class = route.response_class
         self.request_schemas: typing.Set[Any] = set()
         self.response_schemas: typing.Set[Any] = set()
 
+    def get_schema(self, model: Any, serialization: bool) -> Mapping[str, Any]:
+        """Returns JSON schema of the model shared between routes"""
+        method = serialization_schema if serialization else deserialization_schema
+        version = self.version
+        return self.codecs.get(
+            "serialization_schema" if serialization else "deserialization_schema",
+            # Schema versions are module constants
+            (model, id(version)),
+            lambda: method(model, all_refs=True, version=version),
+        )
+
     @property
     def response_class(self) -> Type[Response]:
         if isinstance(self._response_class, DefaultPlaceholder):
@@ -150,10 +168,8 @@ class OpenAPIRoute:
                 and self.response_class.media_type[-4:] == "json"
             ):
                 if self.route.response_field:
-                    response_schema = serialization_schema(
-                        self.route.response_field.model,
-                        all_refs=True,
-                        version=self.version,
+                    response_schema = self.get_schema(
+                        self.route.response_field.model, serialization=True
                     )
                     self.response_schemas.add(self.route.response_field.model)
                 else:
@@ -196,9 +212,7 @@ class OpenAPIRoute:
                 responses[status_code] = {}
 
             if model := response.get("model"):
-                response_schema = serialization_schema(
-                    model, all_refs=True, version=self.version
-                )
+                response_schema = self.get_schema(model, serialization=True)
                 media_type = self.response_class.media_type or "application/json"
 
                 responses[status_code]["content"] = {
@@ -222,10 +236,8 @@ class OpenAPIRoute:
             return None
 
         self.request_schemas.add(self.route.request_field.model)
-        response_schema = deserialization_schema(
-            self.route.request_field.model,
-            all_refs=True,
-            version=self.version,
+        response_schema = self.get_schema(
+            self.route.request_field.model, serialization=False
         )
 
         settings: Optional[Body] = self.route.request_field.settings
@@ -343,6 +355,7 @@ def get_openapi(
     terms_of_service: Optional[str] = None,
     contact: Optional[Dict[str, Union[str, Any]]] = None,
     license_info: Optional[Dict[str, Union[str, Any]]] = None,
+    codecs: Optional[CodecRegistry] = None,
 ) -> Dict[str, Any]:
     info: Dict[str, Any] = {"title": title, "version": version}
     if description:
@@ -369,7 +382,7 @@ def get_openapi(
         if not route.include_in_schema or not route.path.schema_path:
             continue
 
-        openapi_route = OpenAPIRoute(route, version=_version)
+        openapi_route = OpenAPIRoute(route, version=_version, codecs=codecs)
         if route.path.schema_path in paths:
             paths[route.path.schema_path].update(openapi_route.spec)
         else:
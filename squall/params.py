@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from decimal import Decimal
 from enum import Enum
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
 
 Number = Union[int, float, Decimal]
 
@@ -99,3 +99,20 @@ class Form(Body):
 class File(Body):
     media_type: str = "multipart/form-data"
     alias: Optional[str] = None
+
+
+@dataclass
+class Depends:
+    """Declares endpoint or dependency parameter provided by the callable.
+
+    :param dependency: provider, sync or async callable. Its parameters
+                       are other dependencies or the `Request`
+    :param use_cache: call provider once per request, even if it is used
+                      by the several dependants
+    :param singleton: call provider once on the application startup.
+                      Generator providers are finalized on shutdown
+    """
+
+    dependency: Callable[..., Any]
+    use_cache: bool = True
+    singleton: bool = False
@@ -1,13 +1,16 @@
 import decimal
 import typing
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import quote
 
 import orjson
+from isal.isal_zlib import crc32
 from squall.compression import Compression
 from squall.requests import Request
 from squall.types import Receive, Scope, Send
-from starlette.datastructures import URL, MutableHeaders
+from starlette.background import BackgroundTask
+from starlette.datastructures import URL, Headers, MutableHeaders
 from starlette.responses import FileResponse as StarletteFileResponse  # noqa
 from starlette.responses import Response as StarletteResponse  # noqa
 from starlette.responses import StreamingResponse as StarletteStreamingResponse  # noqa
@@ -15,16 +18,140 @@ from starlette.responses import StreamingResponse as StarletteStreamingResponse
 json_dumps = orjson.dumps
 json_option = orjson.OPT_NON_STR_KEYS
 json_pretty_option = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+json_ndjson_option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
 
 
-def default(obj: Any) -> Any:
-    if isinstance(obj, decimal.Decimal):
-        return float(obj)
-    elif isinstance(obj, set):
-        return tuple(obj)
-    elif isinstance(obj, bytes):
-        return obj.decode("utf-8")
-    raise TypeError
+Encoder = typing.Callable[[Any], Any]
+
+
+class JSONEncoders:
+    """Encoders of values orjson doesn't serialize natively, by type.
+
+    Instance is passed to `orjson.dumps` as `default`. Encoder is looked up
+    once per concrete type of the value, walking its MRO, so subclasses are
+    encoded as their registered bases.
+    """
+
+    def __init__(
+        self, encoders: Optional[typing.Mapping[type, Encoder]] = None
+    ) -> None:
+        self.encoders: Dict[type, Encoder] = {
+            decimal.Decimal: float,
+            set: tuple,
+            bytes: bytes.decode,
+        }
+        if encoders:
+            self.encoders.update(encoders)
+        self._dispatch: Dict[type, Optional[Encoder]] = {}
+
+    def register(self, tp: type, encoder: Encoder) -> None:
+        self.encoders[tp] = encoder
+        self._dispatch.clear()
+
+    def lookup(self, tp: type) -> Optional[Encoder]:
+        for base in tp.__mro__:
+            if base in self.encoders:
+                return self.encoders[base]
+        return None
+
+    def __call__(self, obj: Any) -> Any:
+        tp = type(obj)
+        try:
+            encoder = self._dispatch[tp]
+        except KeyError:
+            encoder = self._dispatch[tp] = self.lookup(tp)
+        if encoder is None:
+            raise TypeError(f"Type is not JSON serializable: {tp.__name__}")
+        return encoder(obj)
+
+
+default = JSONEncoders()
+
+
+@dataclass(frozen=True)
+class JSONOptions:
+    """orjson options of the route JSON responses.
+
+    :param non_str_keys: serialize dict keys of other types than str
+    :param naive_utc: serialize naive datetimes as UTC
+    :param utc_z: serialize UTC timezone as `Z` instead of `+00:00`
+    :param omit_microseconds: don't serialize microseconds of datetimes and times
+    :param passthrough_dataclass: pass dataclasses to the type encoders,
+                                  response models are serialized by apischema
+    :param sort_keys: serialize dict keys sorted
+    """
+
+    non_str_keys: bool = True
+    naive_utc: bool = False
+    utc_z: bool = False
+    omit_microseconds: bool = False
+    passthrough_dataclass: bool = False
+    sort_keys: bool = False
+
+    @property
+    def option(self) -> int:
+        option = 0
+        if self.non_str_keys:
+            option |= orjson.OPT_NON_STR_KEYS
+        if self.naive_utc:
+            option |= orjson.OPT_NAIVE_UTC
+        if self.utc_z:
+            option |= orjson.OPT_UTC_Z
+        if self.omit_microseconds:
+            option |= orjson.OPT_OMIT_MICROSECONDS
+        if self.passthrough_dataclass:
+            option |= orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+
+def make_etag(body: bytes) -> bytes:
+    """Weak entity tag of the rendered, not yet compressed body.
+    Weak, because the same tag is used for all content encodings.
+    """
+    return b'W/"%08x"' % crc32(body)
+
+
+def is_not_modified(scope: Scope, etag: bytes) -> bool:
+    """Checks request If-None-Match header against the given entity tag
+    using weak comparison.
+    """
+    for key, value in scope["headers"]:
+        if key == b"if-none-match":
+            break
+    else:
+        return False
+
+    if value.strip() == b"*":
+        return True
+    opaque_tag = etag[2:] if etag[:2] == b"W/" else etag
+    for tag in value.split(b","):
+        tag = tag.strip()
+        if tag[:2] == b"W/":
+            tag = tag[2:]
+        if tag == opaque_tag:
+            return True
+    return False
+
+
+class Versioned:
+    """Endpoint result with the version token known up front.
+
+    When the token matches the request If-None-Match header `304 Not Modified`
+    is returned and the content never gets serialized.
+
+    Examples:
+        >>> @app.get("/catalog")
+        >>> async def get_catalog():
+        >>>     return Versioned(catalog.version, catalog.items)
+    """
+
+    __slots__ = ("etag", "content")
+
+    def __init__(self, version: typing.Union[str, int], content: Any = None) -> None:
+        self.etag = f'W/"{version}"'.encode("latin-1")
+        self.content = content
 
 
 def init_headers(
@@ -62,6 +189,9 @@ class Response(StarletteResponse):
     media_type = None
     charset: str = "utf-8"
     request: Request
+    etag: Optional[bytes] = None
+    # Starlette declares it as BackgroundTask, though it is None by default
+    background: Optional[BackgroundTask] = None  # type: ignore[assignment]
 
     def __init__(
         self,
@@ -69,51 +199,104 @@ class Response(StarletteResponse):
         status_code: int = 200,
         headers: Optional[Dict[str, str]] = None,
         media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
     ) -> None:
         self.status_code = status_code
         if media_type is not None:
             self.media_type = media_type
+        self.background = background
         self.body = body = self.render(content)
         self.raw_headers = init_headers(body, self.charset, self.media_type, headers)
 
+    def get_etag(self) -> bytes:
+        """Returns entity tag given in headers or calculated from the body"""
+        if self.etag is None:
+            for key, value in self.raw_headers:
+                if key == b"etag":
+                    self.etag = value
+                    break
+            else:
+                self.etag = make_etag(self.body)
+        return self.etag
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.send_response(scope, receive, send)
+        if self.background is not None:
+            await scope["app"].background_pool.submit(self.background)
+
+    async def send_response(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body, raw_headers = self.body, self.raw_headers
+        if self.status_code == 200 and (self.etag is not None or scope["app"].etag):
+            etag = self.get_etag()
+            if is_not_modified(scope, etag):
+                await NotModifiedResponse(etag, raw_headers)(scope, receive, send)
+                return
+            if (b"etag", etag) not in raw_headers:
+                raw_headers = [*raw_headers, (b"etag", etag)]
+
         compression: Optional[Compression] = scope["app"].compression
-        body = self.body
         if (
             scope["type"] == "http"
             and compression
             and len(body) > compression.minimal_size
         ):
-            accept_encoding = self.request.headers.get("Accept-Encoding", "")
+            request: Optional[Request] = getattr(self, "request", None)
+            headers = request.headers if request is not None else Headers(scope=scope)
+            accept_encoding = headers.get("Accept-Encoding", "")
             for backend in compression.backends:
                 if backend.encoding_name in accept_encoding:
                     body = backend.compress(body, compression.level)
-                    headers = MutableHeaders(raw=self.raw_headers)
-                    headers["Content-Encoding"] = backend.encoding_name
-                    headers["Content-Length"] = str(len(body))
-                    headers.add_vary_header("Accept-Encoding")
+                    # Copy headers, so the response instance stays reusable
+                    encoded = MutableHeaders(raw=list(raw_headers))
+                    encoded["Content-Encoding"] = backend.encoding_name
+                    encoded["Content-Length"] = str(len(body))
+                    encoded.add_vary_header("Accept-Encoding")
+                    raw_headers = encoded.raw
                     break
 
         await send(
             {
                 "type": "http.response.start",
                 "status": self.status_code,
-                "headers": self.raw_headers,
+                "headers": raw_headers,
             }
         )
+        if scope.get("method") == "HEAD":
+            # Headers are the same as for GET, compression included
+            body = b""
         await send({"type": "http.response.body", "body": body})
 
 
+class NotModifiedResponse(Response):
+    # Representation headers of the 200 response which 304 must not carry
+    excluded_headers = (b"content-length", b"content-type", b"content-encoding")
+
+    def __init__(
+        self,
+        etag: bytes,
+        raw_headers: Optional[List[Tuple[bytes, bytes]]] = None,
+    ) -> None:
+        self.status_code = 304
+        self.body = b""
+        self.raw_headers = [
+            (k, v)
+            for k, v in raw_headers or []
+            if k not in self.excluded_headers and k != b"etag"
+        ]
+        self.raw_headers.append((b"etag", etag))
+
+
 class JSONResponse(Response):
     media_type = "application/json"
+    json_default: JSONEncoders = default
+    json_option: int = json_option
 
     def render(self, content: Any) -> Any:
-        return json_dumps(content, default=default, option=json_option)
+        return json_dumps(content, default=self.json_default, option=self.json_option)
 
 
 class PrettyJSONResponse(JSONResponse):
-    def render(self, content: Any) -> Any:
-        return json_dumps(content, default=default, option=json_pretty_option)
+    json_option = json_pretty_option
 
 
 class HTMLResponse(Response):
@@ -145,3 +328,107 @@ class FileResponse(StarletteFileResponse, Response):
 
 class StreamingResponse(StarletteStreamingResponse, Response):
     ...
+
+
+class JSONStreamingResponse(Response):
+    """Streams items of the async iterable serializing them one by one.
+
+    Serialized items are coalesced into chunks of `chunk_size` bytes,
+    so peak memory doesn't depend on the number of items.
+    """
+
+    media_type = "application/json"
+    chunk_size: int = 64 * 1024
+    json_default: JSONEncoders = default
+    json_option: int = json_option
+    prefix: bytes = b""
+    separator: bytes = b""
+    suffix: bytes = b""
+
+    def __init__(
+        self,
+        content: typing.AsyncIterable[Any],
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+        serializer: Optional[typing.Callable[[Any], Any]] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        self.status_code = status_code
+        if media_type is not None:
+            self.media_type = media_type
+        self.background = background
+        self.content = content
+        self.serializer = serializer
+        self.body = b""
+        self.raw_headers = init_headers(b"", self.charset, self.media_type, headers)
+
+    def render_item(self, item: Any) -> bytes:
+        return json_dumps(item, default=self.json_default, option=self.json_option)
+
+    async def send_response(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        serializer, render_item = self.serializer, self.render_item
+        separator, chunk_size = self.separator, self.chunk_size
+        chunk = bytearray(self.prefix)
+        is_first = True
+        async for item in self.content:
+            if is_first:
+                is_first = False
+            else:
+                chunk += separator
+            if serializer is not None:
+                item = serializer(item)
+            chunk += render_item(item)
+            if len(chunk) >= chunk_size:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": bytes(chunk),
+                        "more_body": True,
+                    }
+                )
+                chunk.clear()
+
+        chunk += self.suffix
+        await send({"type": "http.response.body", "body": bytes(chunk)})
+
+
+class JSONArrayResponse(JSONStreamingResponse):
+    prefix = b"["
+    separator = b","
+    suffix = b"]"
+
+
+class NDJSONResponse(JSONStreamingResponse):
+    media_type = "application/x-ndjson"
+    json_option = json_ndjson_option
+
+
+def get_json_response_class(
+    response_class: typing.Type[Response],
+    encoders: JSONEncoders,
+    options: JSONOptions,
+) -> typing.Type[Response]:
+    """Returns subclass of the JSON response class rendering with the given
+    type encoders and orjson options. Other classes are returned as is.
+    """
+    if not hasattr(response_class, "json_option"):
+        return response_class
+
+    class_option: int = getattr(response_class, "json_option")
+    option = (class_option & ~orjson.OPT_NON_STR_KEYS) | options.option
+    if getattr(response_class, "json_default") is encoders and option == class_option:
+        return response_class
+    namespace = {"json_default": encoders, "json_option": option}
+    return type(response_class.__name__, (response_class,), namespace)
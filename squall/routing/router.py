@@ -1,21 +1,38 @@
+from contextlib import AbstractAsyncContextManager
 from typing import (
     Any,
+    AsyncContextManager,
     Awaitable,
     Callable,
     Dict,
     List,
+    Mapping,
     Optional,
-    Sequence,
     Set,
+    Tuple,
     Type,
     Union,
 )
 
 import squall_router
 from squall import convertors
+from squall.caching import Cache
+from squall.codecs import CodecRegistry
 from squall.datastructures import Default
+from squall.dependencies import Singletons
+from squall.encoders import ResponseValidation
 from squall.exceptions import HTTPException
-from squall.responses import JSONResponse, PlainTextResponse, Response
+from squall.executors import Executor
+from squall.handlers import get_head_handler
+from squall.limits import ConcurrencyLimit
+from squall.responses import (
+    JSONEncoders,
+    JSONOptions,
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    Response,
+)
 from squall.routing.routes import APIRoute, WebSocketRoute
 from squall.staticfiles import StaticFiles
 from squall.types import ASGIApp, DecoratedCallable, Receive, Scope, Send
@@ -26,6 +43,15 @@ PLACEHOLDER_DYNAMIC = "*"
 PLACEHOLDER_LOCATION = "**"
 
 
+def toggle_trailing_slash(path: str) -> str:
+    """Adds trailing slash to the path or removes it if exists
+
+    >>> assert toggle_trailing_slash("/items") == "/items/"
+    >>> assert toggle_trailing_slash("/items/") == "/items"
+    """
+    return path[:-1] if path.endswith("/") else path + "/"
+
+
 class Router:
     def __init__(
         self,
@@ -38,6 +64,9 @@ class Router:
         deprecated: Optional[bool] = None,
         include_in_schema: bool = True,
         trace_internals: bool = False,
+        compile_handlers: Optional[bool] = None,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> None:
         self._prefix = prefix
         self._tags = tags or []
@@ -48,6 +77,9 @@ class Router:
         self._routes: List[Union[APIRoute, WebSocketRoute]] = routes or []
 
         self.trace_internals = trace_internals
+        self.compile_handlers = compile_handlers
+        self.response_validation = response_validation
+        self.json_options = json_options
         self.route_class = route_class
 
     def add_api_route(
@@ -70,6 +102,14 @@ class Router:
         name: Optional[str] = None,
         route_class_override: Optional[Type[APIRoute]] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: Optional[Cache] = None,
+        coalesce: bool = False,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> None:
         route_class = route_class_override or self.route_class
         responses = responses or {}
@@ -99,6 +139,15 @@ class Router:
             name=name,
             openapi_extra=openapi_extra,
             trace_internals=self.trace_internals,
+            compile_handler=self.compile_handlers,
+            cache=cache,
+            coalesce=coalesce,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation or self.response_validation,
+            json_options=json_options or self.json_options,
         )
         self.route_register(route)
 
@@ -174,6 +223,14 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: Optional[Cache] = None,
+        coalesce: bool = False,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         """Registrates API endpoint.
 
@@ -203,6 +260,14 @@ class Router:
                 response_class=response_class,
                 name=name,
                 openapi_extra=openapi_extra,
+                cache=cache,
+                coalesce=coalesce,
+                executor=executor,
+                concurrency_limit=concurrency_limit,
+                timeout=timeout,
+                cancel_on_disconnect=cancel_on_disconnect,
+                response_validation=response_validation,
+                json_options=json_options,
             )
             return func
 
@@ -283,6 +348,14 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: Optional[Cache] = None,
+        coalesce: bool = False,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         return self.add_api(
             path=path,
@@ -300,6 +373,14 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            cache=cache,
+            coalesce=coalesce,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
     def put(
@@ -319,6 +400,12 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         return self.add_api(
             path=path,
@@ -336,6 +423,12 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
     def post(
@@ -355,6 +448,12 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         return self.add_api(
             path=path,
@@ -372,6 +471,12 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
     def delete(
@@ -391,6 +496,12 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         return self.add_api(
             path=path,
@@ -408,6 +519,12 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
     def options(
@@ -427,6 +544,12 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         return self.add_api(
             path=path,
@@ -444,6 +567,12 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
     def head(
@@ -463,6 +592,12 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         return self.add_api(
             path=path,
@@ -480,6 +615,12 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
     def patch(
@@ -499,6 +640,12 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
         return self.add_api(
             path=path,
@@ -516,6 +663,12 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
     def trace(
@@ -535,6 +688,12 @@ class Router:
         response_class: Type[Response] = Default(JSONResponse),
         name: Optional[str] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
 
         return self.add_api(
@@ -553,6 +712,12 @@ class Router:
             response_class=response_class,
             name=name,
             openapi_extra=openapi_extra,
+            executor=executor,
+            concurrency_limit=concurrency_limit,
+            timeout=timeout,
+            cancel_on_disconnect=cancel_on_disconnect,
+            response_validation=response_validation,
+            json_options=json_options,
         )
 
 
@@ -571,6 +736,10 @@ class RootRouter(Router):
         include_in_schema: bool = True,
         trace_internals: bool = False,
         ignore_trailing_slashes: bool = False,
+        compile_handlers: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
+        json_encoders: Optional[Mapping[type, Callable[[Any], Any]]] = None,
     ) -> None:
         # Need both, Router and Router
         super(RootRouter, self).__init__(
@@ -583,11 +752,31 @@ class RootRouter(Router):
             include_in_schema=include_in_schema,
             responses=responses,
             trace_internals=trace_internals,
+            compile_handlers=compile_handlers,
+            response_validation=response_validation,
+            json_options=json_options,
         )
-        self.redirect_slashes = redirect_slashes
+        self.redirect_slashes = redirect_slashes and not ignore_trailing_slashes
         self.default = default or self.not_found
-        self._fast_path_route_http: Dict[str, Any] = {}
-        self._fast_path_route_ws: Dict[str, Any] = {}
+        # Exact match lookup tables for routes without dynamic segments
+        self._fast_path_route_http: Dict[Tuple[str, str], ASGIApp] = {}
+        self._fast_path_route_ws: Dict[str, ASGIApp] = {}
+        # Allowed methods per registered path, prepared 405 responses for them
+        self._allowed_methods: Dict[str, Set[str]] = {}
+        self._method_not_allowed: Dict[str, Response] = {}
+        self._method_not_allowed_ids: Dict[str, int] = {}
+        # Handlers registered by the router itself, e.g. HEAD for GET routes
+        self._implicit_handler_ids: Dict[Tuple[str, str], int] = {}
+        self._explicit_handlers: Set[Tuple[str, str]] = set()
+        # Slash-toggled variants of static paths with prepared 308 redirects
+        self._redirects: Dict[str, Response] = {}
+        # Resources of the routes, like process pools, living with the app
+        self.singletons = Singletons()
+        self.lifespan_contexts: List[AsyncContextManager[Any]] = [self.singletons]
+        # Serializers, deserializers and schemas shared between routes
+        self.codecs = CodecRegistry()
+        # Encoders of the types JSON responses of the routes render
+        self.json_encoders = JSONEncoders(json_encoders)
         self._router = squall_router.Router()
         if ignore_trailing_slashes:
             self._router.set_ignore_trailing_slashes()
@@ -604,23 +793,79 @@ class RootRouter(Router):
         if "router" not in scope:
             scope["router"] = self
 
-        routes: Sequence[Union[APIRoute, WebSocketRoute]]
+        path = scope["path"]
+        if self.ignore_trailing_slashes and path != "/":
+            path = path.rstrip("/") or "/"
 
         if scope["type"] == "http":
             method = scope["method"]
+            handler = self._fast_path_route_http.get((method, path))
         elif scope["type"] == "websocket":
             method = "WS"
+            handler = self._fast_path_route_ws.get(path)
         else:
             assert False, f"RootRouter doesn't allow scope type: {scope['type']}"
 
+        if handler is not None:
+            scope["path_params"] = {}
+            return handler(scope, receive, send)
+
         if resolved := self._router.resolve(method, scope["path"]):
             handler_id, params = resolved
             if handler := self._handlers.get(handler_id):
                 scope["path_params"] = dict(params)
                 return handler(scope, receive, send)
 
+        if method != "WS":
+            # Path exists, but the method isn't registered for it
+            if response := self._method_not_allowed.get(path):
+                return response(scope, receive, send)
+            if resolved := self._router.resolve(PLACEHOLDER_DYNAMIC, scope["path"]):
+                if handler := self._handlers.get(resolved[0]):
+                    return handler(scope, receive, send)
+
+            if self.redirect_slashes and path != "/":
+                if response := self.get_slash_redirect(scope, method, path):
+                    return response(scope, receive, send)
+
         return self.default(scope, receive, send)
 
+    def get_slash_redirect(
+        self, scope: Scope, method: str, path: str
+    ) -> Optional[Response]:
+        """Returns redirect to the slash-toggled variant of path if it is routed.
+
+        Static routes variants are precomputed and, if there is no query string
+        and root path, served with prepared responses.
+        """
+        if response := self._redirects.get(path):
+            if not scope.get("query_string") and not scope.get("root_path"):
+                return response
+            target = toggle_trailing_slash(path)
+        else:
+            target = toggle_trailing_slash(path)
+            if not self._router.resolve(method, target):
+                return None
+
+        url = scope.get("root_path", "") + target
+        if query_string := scope.get("query_string"):
+            url += "?" + query_string.decode("latin-1")
+        return RedirectResponse(url, status_code=308)
+
+    @staticmethod
+    def method_not_allowed(methods: Set[str]) -> Response:
+        """Builds reusable 405 response with the `Allow` header
+
+        >>> response = RootRouter.method_not_allowed({"GET", "POST"})
+        >>> assert response.status_code == 405
+        >>> assert response.headers["allow"] == "GET, POST"
+        """
+        return JSONResponse(
+            {"detail": "Method Not Allowed"},
+            status_code=405,
+            headers={"Allow": ", ".join(sorted(methods))},
+        )
+
     @staticmethod
     async def not_found(scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] == "websocket":
@@ -642,15 +887,107 @@ class RootRouter(Router):
         if self.ignore_trailing_slashes:
             route.path.strip_trailing_slash()
 
+        if isinstance(route, APIRoute):
+            # Routes of the included routers get the application defaults here
+            route.apply_defaults(
+                self.response_validation, self.json_options, self.compile_handlers
+            )
+            route.build_codecs(self.codecs, self.json_encoders)
+        handler = route.get_route_handler()
         for method in methods:
-            self._router.add_route(
-                method, route.path.router_path, self._last_handler_id
+            self.method_register(route, method, handler)
+
+        dependencies = getattr(route, "dependencies", None)
+        if dependencies is not None:
+            dependencies.bind(self.singletons)
+
+        executor = getattr(route, "executor", None)
+        if isinstance(executor, AbstractAsyncContextManager):
+            if executor not in self.lifespan_contexts:
+                self.lifespan_contexts.append(executor)
+
+        # GET routes serve HEAD requests as well, unless HEAD is declared
+        if "GET" in methods and "HEAD" not in methods:
+            self.method_register(
+                route, "HEAD", get_head_handler(handler), implicit=True
             )
-            self._handlers[self._last_handler_id] = route.get_route_handler()
-            self._last_handler_id += 1
+            methods = [*methods, "HEAD"]
 
+        if "WS" not in methods:
+            self.allowed_methods_register(route, methods)
+            if self.redirect_slashes and not route.path.path_params:
+                self.redirect_register(route.path.path)
         self._routes.append(route)
 
+    def method_register(
+        self,
+        route: Union[APIRoute, WebSocketRoute],
+        method: str,
+        handler: ASGIApp,
+        implicit: bool = False,
+    ) -> None:
+        """Registers route handler for the given method.
+
+        Implicitly registered handlers, like HEAD for GET routes, never
+        shadow explicitly declared ones and get replaced by them.
+        """
+        key = (method, route.path.router_path)
+        replaces_implicit = key in self._implicit_handler_ids
+        if replaces_implicit:
+            if implicit:
+                return
+            handler_id = self._implicit_handler_ids.pop(key)
+        elif implicit and key in self._explicit_handlers:
+            return
+        else:
+            handler_id = self._last_handler_id
+            self._router.add_route(method, route.path.router_path, handler_id)
+            self._last_handler_id += 1
+
+        if implicit:
+            self._implicit_handler_ids[key] = handler_id
+        else:
+            self._explicit_handlers.add(key)
+        self._handlers[handler_id] = handler
+
+        if route.path.path_params:
+            return
+        if method == "WS":
+            self._fast_path_route_ws.setdefault(route.path.path, handler)
+        elif replaces_implicit:
+            self._fast_path_route_http[(method, route.path.path)] = handler
+        else:
+            self._fast_path_route_http.setdefault((method, route.path.path), handler)
+
+    def redirect_register(self, path: str) -> None:
+        """Precomputes redirect from the slash-toggled variant of the static path"""
+        if path == "/":
+            return
+        self._redirects.setdefault(
+            toggle_trailing_slash(path), RedirectResponse(path, status_code=308)
+        )
+
+    def allowed_methods_register(
+        self, route: Union[APIRoute, WebSocketRoute], methods: List[str]
+    ) -> None:
+        """Updates path methods index and the prepared 405 response for the path"""
+        router_path = route.path.router_path
+        allowed = self._allowed_methods.setdefault(router_path, set())
+        allowed.update(methods)
+        response = self.method_not_allowed(allowed)
+
+        if not route.path.path_params:
+            self._method_not_allowed[route.path.path] = response
+            return
+
+        if router_path not in self._method_not_allowed_ids:
+            self._method_not_allowed_ids[router_path] = self._last_handler_id
+            self._router.add_route(
+                PLACEHOLDER_DYNAMIC, router_path, self._last_handler_id
+            )
+            self._last_handler_id += 1
+        self._handlers[self._method_not_allowed_ids[router_path]] = response
+
     def add_location(
         self, path: str, handler: ASGIApp, name: str, method: str = "GET"
     ) -> None:
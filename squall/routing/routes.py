@@ -1,14 +1,45 @@
+import asyncio
+import collections.abc
 import enum
 import functools
 import inspect
-from typing import Any, Callable, Dict, List, Optional, Set, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
 
-from apischema import deserialization_method, serialization_method
 from squall import convertors
+from squall.background import get_background_handler
 from squall.bindings import RequestField, ResponseField
+from squall.caching import Cache, ResponseCache, get_cached_handler
+from squall.coalescing import get_coalesced_handler
+from squall.codecs import CodecRegistry
+from squall.compiler import HandlerCompiler
 from squall.datastructures import Default, DefaultPlaceholder
+from squall.deadlines import get_timeout_handler
+from squall.decoders import get_request_decoder
+from squall.dependencies import DependencyResolver, get_dependencies
+from squall.disconnects import DisconnectCounter, get_cancellable_handler
+from squall.encoders import ResponseValidation, ResponseValidator
+from squall.executors import Executor
 from squall.handlers import get_http_handler, get_websocket_handler
-from squall.responses import JSONResponse, Response
+from squall.limits import ConcurrencyLimit, ConcurrencyLimiter, get_limited_handler
+from squall.responses import (
+    JSONEncoders,
+    JSONOptions,
+    JSONResponse,
+    Response,
+    default,
+    get_json_response_class,
+)
 from squall.routing.path import Path
 from squall.routing.utils import (
     HeadParam,
@@ -155,6 +186,15 @@ class APIRoute(Route):
         ),
         openapi_extra: Optional[Dict[str, Any]] = None,
         trace_internals: bool = False,
+        compile_handler: Optional[bool] = None,
+        cache: Optional[Cache] = None,
+        coalesce: bool = False,
+        executor: Optional[Executor] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
     ) -> None:
         # normalise enums e.g. http.HTTPStatus
         if isinstance(status_code, enum.IntEnum):
@@ -162,6 +202,9 @@ class APIRoute(Route):
         self.path = Path(path, endpoint)
         self.endpoint = endpoint
         self.body_fields = get_handler_body_params(endpoint)
+        self.dependencies: Optional[DependencyResolver] = None
+        if get_dependencies(endpoint):
+            self.dependencies = DependencyResolver(endpoint)
 
         request_fields = get_handler_request_fields(endpoint)
         assert len(request_fields) < 2, "Only one request model allowed"
@@ -169,7 +212,6 @@ class APIRoute(Route):
         self.request_deserializer: Optional[Callable[..., Any]] = None
         if request_fields:
             self.request_field = request_fields[0]
-            self.request_deserializer = deserialization_method(self.request_field.model)
 
         self.name = get_callable_name(endpoint) if name is None else name
         if methods is None:
@@ -178,8 +220,17 @@ class APIRoute(Route):
         self.response_field: Optional[ResponseField] = None
         self.response_deserializer: Optional[Callable[..., Any]] = None
         self.response_serializer: Optional[Callable[..., Any]] = None
+        self.response_validation = response_validation
+        self.response_validator = ResponseValidator(response_validation)
 
         endpoint_returns = inspect.signature(endpoint).return_annotation
+        if get_origin(endpoint_returns) in (
+            collections.abc.AsyncIterator,
+            collections.abc.AsyncIterable,
+            collections.abc.AsyncGenerator,
+        ):
+            # Streamed results are described by the single item type
+            endpoint_returns = get_args(endpoint_returns)[0]
         res_deserialize = response_model != endpoint_returns
         # elif endpoint_returns != inspect._empty and response_model is None:
         #     response_model = endpoint_returns
@@ -187,15 +238,8 @@ class APIRoute(Route):
 
         if response_model is not None:
             self.response_field = ResponseField(model=response_model)
-            check_type_on_serialization = True
-            if res_deserialize:
-                self.response_deserializer = deserialization_method(
-                    self.response_field.model
-                )
-                check_type_on_serialization = False
-            self.response_serializer = serialization_method(
-                self.response_field.model, check_type=check_type_on_serialization
-            )
+        self.response_deserialize = res_deserialize
+        self.codecs: Optional[CodecRegistry] = None
 
         self.status_code = status_code
         self.tags = tags or []
@@ -208,12 +252,26 @@ class APIRoute(Route):
         self.operation_id = operation_id
         self.include_in_schema = include_in_schema
         self.response_class = response_class
+        self.json_options = json_options
 
         assert callable(endpoint), "An endpoint must be a callable"
 
         self.openapi_extra = openapi_extra
         self.head_params: List[HeadParam] = []
         self.trace_internals = trace_internals
+        self.compile_handler = compile_handler
+        self.cache = cache
+        self.response_cache: Optional[ResponseCache] = None
+        self.coalesce = coalesce
+        self.executor = executor
+        assert executor is None or not asyncio.iscoroutinefunction(
+            endpoint
+        ), "Executors are applicable to sync endpoints only"
+        self.concurrency_limit = concurrency_limit
+        self.concurrency_limiter: Optional[ConcurrencyLimiter] = None
+        self.timeout = timeout
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self.disconnects = DisconnectCounter()
 
     @property
     def unique_id(self) -> str:
@@ -222,11 +280,112 @@ class APIRoute(Route):
         )
 
     def get_route_handler(self) -> ASGIApp:
+        handler = self.get_endpoint_handler()
+        if any(field["kind"] == "background" for field in self.body_fields):
+            handler = get_background_handler(handler)
+        if self.concurrency_limit is not None:
+            self.concurrency_limiter = ConcurrencyLimiter(self.concurrency_limit)
+            handler = get_limited_handler(handler, self.concurrency_limiter)
+        if self.cancel_on_disconnect:
+            handler = get_cancellable_handler(handler, self.disconnects)
+        if self.timeout is not None:
+            handler = get_timeout_handler(handler, self.timeout)
+        if self.coalesce:
+            handler = get_coalesced_handler(handler, self.head_params)
+        if self.cache is not None and "GET" in self.methods:
+            self.response_cache = ResponseCache(self.cache)
+            handler = get_cached_handler(handler, self.response_cache)
+        return handler
+
+    def apply_defaults(
+        self,
+        response_validation: Optional[ResponseValidation] = None,
+        json_options: Optional[JSONOptions] = None,
+        compile_handler: Optional[bool] = None,
+    ) -> None:
+        """Applies the application settings the route doesn't set on its own"""
+        if self.compile_handler is None:
+            self.compile_handler = compile_handler
+        if self.response_validation is None and response_validation is not None:
+            self.response_validation = response_validation
+            self.response_validator = ResponseValidator(response_validation)
+        if self.json_options is None:
+            self.json_options = json_options
+
+    def build_codecs(
+        self, codecs: CodecRegistry, json_encoders: Optional[JSONEncoders] = None
+    ) -> None:
+        """Builds request and response codecs, sharing them via the registry.
+        JSON responses are rendered with the application type encoders
+        and the route orjson options.
+        """
+        self.codecs = codecs
+        if json_encoders is not None or self.json_options is not None:
+            self.response_class = self.get_json_response_class(
+                codecs, json_encoders or default, self.json_options or JSONOptions()
+            )
+        if self.request_field is not None:
+            model = self.request_field.model
+            self.request_deserializer = codecs.get(
+                "request", model, lambda: get_request_decoder(model)
+            )
+
+        if self.response_field is not None:
+            response_class = (
+                self.response_class.value
+                if isinstance(self.response_class, DefaultPlaceholder)
+                else self.response_class
+            )
+            (
+                self.response_deserializer,
+                self.response_serializer,
+            ) = self.response_validator.get_codecs(
+                self.response_field.model,
+                response_class,
+                self.response_deserialize,
+                codecs,
+            )
+
+    def get_json_response_class(
+        self, codecs: CodecRegistry, encoders: JSONEncoders, options: JSONOptions
+    ) -> Union[Type[Response], DefaultPlaceholder]:
+        if isinstance(self.response_class, DefaultPlaceholder):
+            response_class = self.response_class.value
+        else:
+            response_class = self.response_class
+        json_class = codecs.get(
+            "response_class",
+            (response_class, encoders, options),
+            lambda: get_json_response_class(response_class, encoders, options),
+        )
+        if isinstance(self.response_class, DefaultPlaceholder):
+            return Default(json_class)
+        return json_class
+
+    def get_endpoint_handler(self) -> ASGIApp:
+        if self.codecs is None:
+            self.build_codecs(CodecRegistry())
         self.head_params = get_handler_head_params(
             self.endpoint, self.path.get_path_params_from_handler()
         )
         head_validator = build_head_validator(self.head_params)
 
+        if self.compile_handler:
+            return HandlerCompiler(
+                endpoint=self.endpoint,
+                status_code=self.status_code,
+                response_class=self.response_class,
+                request_field=self.request_field,
+                request_deserializer=self.request_deserializer,
+                response_deserializer=self.response_deserializer,
+                response_serializer=self.response_serializer,
+                head_validator=head_validator if self.head_params else None,
+                body_fields=self.body_fields,
+                trace_internals=self.trace_internals,
+                executor=self.executor,
+                dependencies=self.dependencies,
+            ).build()
+
         return get_http_handler(
             endpoint=self.endpoint,
             status_code=self.status_code,
@@ -238,4 +397,6 @@ class APIRoute(Route):
             head_validator=head_validator,
             body_fields=self.body_fields,
             trace_internals=self.trace_internals,
+            executor=self.executor,
+            dependencies=self.dependencies,
         )
@@ -15,11 +15,16 @@ from typing import (
 )
 
 from squall import convertors
+from squall.background import BackgroundTasks
 from squall.bindings import RequestField
+from squall.dataloaders import Loader
+from squall.deadlines import Deadline
+from squall.jobs import JobQueue
 from squall.params import (
     Body,
     CommonParam,
     Cookie,
+    Depends,
     File,
     Form,
     Header,
@@ -159,8 +164,19 @@ def get_handler_body_params(func: Callable[..., Any]) -> List[Dict[str, Any]]:
         param: Dict[str, Any] = {"name": k}
         annotation = v.annotation
 
-        if annotation == Request:
+        if isinstance(v.default, Depends):
+            continue
+        elif annotation == Request:
             param["kind"] = "request"
+        elif annotation == Deadline or annotation == Optional[Deadline]:
+            param["kind"] = "deadline"
+        elif annotation == BackgroundTasks:
+            param["kind"] = "background"
+        elif annotation == JobQueue:
+            param["kind"] = "jobs"
+        elif isinstance(v.default, Loader):
+            param["kind"] = "loader"
+            param["loader"] = v.default
         elif isinstance(v.default, (Form, File)):
             param["kind"] = "form"
             param["model_class"] = annotation
@@ -179,6 +195,8 @@ def get_handler_request_fields(func: Callable[..., Any]) -> List[RequestField]:
     signature = inspect.signature(func)
     results = []
     for name, v in signature.parameters.items():
+        if isinstance(v.default, Depends):
+            continue
         if is_valid_body_model(v.annotation):
             settings = v.default if isinstance(v.default, Body) else None
             field = RequestField(name, model=v.annotation, settings=settings)
@@ -68,6 +68,7 @@ def call(
     attributes: typing.Optional[typing.List[str]] = None,
     args: typing.Optional[typing.List[typing.Any]] = None,
     is_standalone: bool = False,
+    keywords: typing.Optional[typing.List[ast.keyword]] = None,
 ) -> typing.Union[ast.Call, ast.Expr]:
     """Generates function or attribute calling.
     Use is is_expression=True if the call is not a part of another expression
@@ -80,8 +81,10 @@ def call(
     :param attributes: list of attributes names
     :param args: list of arguments expressions
     :param is_standalone: is a part of another expression or not. True if not
+    :param keywords: list of keyword arguments
     """
     args = args or []
+    keywords = keywords or []
     func: typing.Union[ast.Name, ast.Attribute]
     if attributes:
         func = getattribute(entity_name, attributes)
@@ -89,8 +92,8 @@ def call(
         func = ast.Name(id=entity_name, ctx=ast.Load())
 
     if is_standalone:
-        return ast.Expr(value=ast.Call(func=func, args=args, keywords=[]))
-    return ast.Call(func=func, args=args, keywords=[])
+        return ast.Expr(value=ast.Call(func=func, args=args, keywords=keywords))
+    return ast.Call(func=func, args=args, keywords=keywords)
 
 
 def append(list_name: str, value: typing.Any) -> ast.Expr:
@@ -118,3 +121,56 @@ def assign(name: str, value: typing.Any) -> ast.Assign:
     :returns: assign ast
     """
     return ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=value)
+
+
+def set_attribute(entity_name: str, attribute: str, value: typing.Any) -> ast.Assign:
+    """Assign value to the object attribute
+
+    Generates the following code: `entity_name.attribute = value`
+
+    :param entity_name: object variable name
+    :param attribute: attribute name
+    :param value: target value expression
+    :returns: assign ast
+    """
+    target = ast.Attribute(
+        value=ast.Name(id=entity_name, ctx=ast.Load()), attr=attribute, ctx=ast.Store()
+    )
+    return ast.Assign(targets=[target], value=value)
+
+
+def await_(value: typing.Any, is_standalone: bool = False) -> typing.Any:
+    """Awaits given expression
+
+    Generates the following code: `await value`
+
+    :param value: awaitable expression
+    :param is_standalone: is a part of another expression or not. True if not
+    :returns: await expression ast
+    """
+    if is_standalone:
+        return ast.Expr(value=ast.Await(value=value))
+    return ast.Await(value=value)
+
+
+def name(entity_name: str) -> ast.Name:
+    """Loads variable by name
+
+    Generates the following code: `entity_name`
+
+    :param entity_name: variable name
+    :returns: name ast
+    """
+    return ast.Name(id=entity_name, ctx=ast.Load())
+
+
+def raise_(exc: typing.Any, cause: typing.Optional[str] = None) -> ast.Raise:
+    """Raises given exception
+
+    Generates the following code: `raise exc from cause`
+
+    :param exc: exception expression
+    :param cause: name of the exception variable to chain
+    :returns: raise ast
+    """
+    return ast.Raise(exc=exc, cause=name(cause) if cause else None)
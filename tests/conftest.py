@@ -13,6 +13,11 @@ def client(app):
     return TestClient(app)
 
 
+@pytest.fixture(params=[False, True], ids=["interpreted", "compiled"])
+def compile_handlers(request):
+    return request.param
+
+
 @pytest.fixture(scope="session")
 def response_file(tmp_path_factory):
     file_path = tmp_path_factory.mktemp("data") / "response_file.txt"
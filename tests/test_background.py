@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from squall import Squall
+from squall.background import BackgroundTask, BackgroundTasks, TaskPool
+from squall.responses import JSONResponse, NDJSONResponse
+from squall.testclient import TestClient
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+    app.done = []
+
+    async def audit(event):
+        app.done.append(event)
+
+    def sync_audit(event):
+        app.done.append(event)
+
+    @app.post("/items")
+    async def create_item(background: BackgroundTasks):
+        background.add_task(audit, "created")
+        background.add_task(sync_audit, "synced")
+        return {"created": True}
+
+    @app.get("/response")
+    async def get_response():
+        return JSONResponse({}, background=BackgroundTask(audit, "response"))
+
+    @app.get("/stream", response_class=NDJSONResponse)
+    async def get_stream(background: BackgroundTasks):
+        background.add_task(audit, "streamed")
+        yield 1
+
+    @app.get("/failed")
+    async def failed(background: BackgroundTasks):
+        background.add_task(audit, "not run")
+        raise ValueError("Endpoint failed")
+
+    return app
+
+
+@pytest.mark.parametrize(
+    "method,path,expected",
+    [
+        ["POST", "/items", ["created", "synced"]],
+        ["GET", "/response", ["response"]],
+        ["GET", "/stream", ["streamed"]],
+    ],
+)
+def test_tasks_run_after_response(app, method, path, expected):
+    with TestClient(app) as client:
+        response = client.request(method, path)
+        assert response.status_code == 200
+    # Pending tasks are drained on shutdown
+    assert app.done == expected
+    assert app.background_pool.statistics().completed == 1
+
+
+def test_tasks_are_not_run_on_failure(app):
+    with TestClient(app, raise_server_exceptions=False) as client:
+        assert client.get("/failed").status_code == 500
+    assert app.done == []
+
+
+def test_pool_backpressure_and_statistics():
+    pool = TaskPool(size=1, max_queue=1)
+    release = None
+    done = []
+
+    async def task(i):
+        await release.wait()
+        done.append(i)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        await pool.submit(BackgroundTask(task, 1))
+        await asyncio.sleep(0)
+        await pool.submit(BackgroundTask(task, 2))
+        stats = pool.statistics()
+        assert (stats.running, stats.queued) == (1, 1)
+
+        # Queue is full, submitting waits for a free slot
+        third = asyncio.ensure_future(pool.submit(BackgroundTask(task, 3)))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+
+        release.set()
+        await third
+        await pool.drain()
+
+    asyncio.run(scenario())
+    assert done == [1, 2, 3]
+    assert pool.statistics().completed == 3
+
+
+def test_failed_task_is_counted():
+    pool = TaskPool()
+
+    def fail():
+        raise ValueError("Task failed")
+
+    async def scenario():
+        await pool.submit(BackgroundTask(fail))
+        await pool.drain()
+
+    asyncio.run(scenario())
+    assert pool.statistics().failed == 1
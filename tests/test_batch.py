@@ -0,0 +1,110 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+from squall import Header, HTTPException, Query, Squall
+from squall.batch import Batch
+from squall.testclient import TestClient
+
+
+@dataclass
+class Item:
+    name: str
+    price: float
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(
+        batch=Batch(max_entries=5, concurrency=2), compile_handlers=compile_handlers
+    )
+    app.running = app.max_running = 0
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int, user: str = Header(alias="x-user")):
+        app.running += 1
+        app.max_running = max(app.max_running, app.running)
+        await asyncio.sleep(0.01)
+        app.running -= 1
+        return {"item_id": item_id, "user": user}
+
+    @app.get("/search")
+    async def search(q: str = Query()):
+        return {"q": q}
+
+    @app.post("/items", response_model=Item, status_code=201)
+    async def create_item(item: Item) -> Item:
+        return item
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    @app.get("/broken")
+    async def broken():
+        raise ValueError("Unexpected")
+
+    return app
+
+
+def test_batch(app):
+    client = TestClient(app)
+    response = client.post(
+        "/batch",
+        json=[
+            {"path": "/items/1"},
+            {"path": "/search", "query": {"q": "fish"}},
+            {"path": "/search?q=meat"},
+            {"method": "post", "path": "/items", "body": {"name": "a", "price": 1}},
+            {"path": "/items/2", "headers": {"x-user": "other"}},
+        ],
+        headers={"x-user": "batch"},
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert [i["status"] for i in results] == [200, 200, 200, 201, 200]
+    assert [i["body"] for i in results] == [
+        {"item_id": 1, "user": "batch"},
+        {"q": "fish"},
+        {"q": "meat"},
+        {"name": "a", "price": 1.0},
+        {"item_id": 2, "user": "other"},
+    ]
+    assert results[0]["headers"]["content-type"] == "application/json"
+    assert app.max_running == 2
+
+
+def test_batch_errors(app):
+    client = TestClient(app)
+    response = client.post(
+        "/batch",
+        json=[
+            {"path": "/missing"},
+            {"path": "/broken"},
+            {"path": "/unknown"},
+            {"path": "/items/abc"},
+            {"method": "POST", "path": "/batch", "body": []},
+        ],
+        headers={"x-user": "batch"},
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert [i["status"] for i in results] == [404, 500, 404, 404, 400]
+    assert results[0]["body"] == {"detail": "Item not found"}
+    assert results[1]["body"] == {"detail": "Internal Server Error"}
+    assert results[4]["body"] == {"detail": "Nested batches aren't allowed"}
+
+
+def test_batch_validation(app):
+    client = TestClient(app)
+    response = client.post("/batch", json=[{"method": "GET"}])
+    assert response.status_code == 422
+
+    response = client.post("/batch", json=[{"path": "/search"}] * 6)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Batch exceeds 5 entries"}
+
+
+def test_batch_is_optional():
+    client = TestClient(Squall())
+    assert client.post("/batch", json=[]).status_code == 404
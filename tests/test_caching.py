@@ -0,0 +1,171 @@
+import time
+from typing import Optional
+
+import pytest
+from squall import Header, Query, Squall
+from squall.caching import Cache
+from squall.responses import JSONResponse
+from squall.testclient import TestClient
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+    app.calls = 0
+
+    @app.get("/items/{item_id}", cache=Cache(ttl=60, vary=["Accept-Language"]))
+    async def get_item(item_id: int, q: Optional[str] = Query(None)):
+        app.calls += 1
+        return {"item_id": item_id, "q": q, "calls": app.calls}
+
+    @app.get("/missing", cache=Cache(ttl=60))
+    async def get_missing():
+        app.calls += 1
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+
+    @app.get("/unavailable", cache=Cache(ttl=60))
+    async def get_unavailable():
+        return JSONResponse({"detail": "Service Unavailable"}, status_code=503)
+
+    @app.get("/user", cache=Cache(ttl=60, vary=["x-user"]))
+    async def get_user(user: str = Header(alias="x-user")):
+        app.calls += 1
+        return {"user": user}
+
+    return app
+
+
+def test_cache_hit_skips_endpoint(app):
+    client = TestClient(app)
+    first = client.get("/items/1")
+    second = client.get("/items/1")
+    assert first.json() == second.json() == {"item_id": 1, "q": None, "calls": 1}
+    assert app.calls == 1
+    assert second.headers["cache-control"] == "max-age=60"
+    assert second.headers["vary"] == "accept-language"
+    assert "age" in second.headers
+
+
+def test_path_params_and_vary_select_entry(app):
+    client = TestClient(app)
+    client.get("/items/1", headers={"Accept-Language": "en"})
+    client.get("/items/1", headers={"Accept-Language": "de"})
+    client.get("/items/2", headers={"Accept-Language": "en"})
+    assert app.calls == 3
+    client.get("/items/1", headers={"Accept-Language": "de"})
+    assert app.calls == 3
+
+
+def test_query_string_is_canonicalized(app):
+    client = TestClient(app)
+    client.get("/items/1?q=a&x=1")
+    response = client.get("/items/1?x=1&q=a")
+    assert app.calls == 1
+    assert response.json()["q"] == "a"
+    client.get("/items/1?q=b")
+    assert app.calls == 2
+
+
+def test_not_ok_response_is_not_stored(app):
+    client = TestClient(app)
+    assert client.get("/missing").status_code == 404
+    response = client.get("/missing")
+    assert response.status_code == 404
+    assert app.calls == 2
+    assert "cache-control" not in response.headers
+
+
+def test_error_response_has_no_cache_headers(app):
+    response = TestClient(app).get("/unavailable")
+    assert response.status_code == 503
+    assert "cache-control" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_validation_error_is_not_stored(app):
+    client = TestClient(app)
+    assert client.get("/user").status_code == 400
+    assert client.get("/user", headers={"x-user": "bob"}).json() == {"user": "bob"}
+    assert client.get("/user", headers={"x-user": "bob"}).json() == {"user": "bob"}
+    assert app.calls == 1
+
+
+def test_head_is_served_from_cache(app):
+    client = TestClient(app)
+    get = client.get("/items/1")
+    head = client.head("/items/1")
+    assert head.status_code == 200
+    assert head.content == b""
+    assert head.headers["content-length"] == get.headers["content-length"]
+    assert app.calls == 1
+
+
+def test_expired_entry(app, mocker):
+    client = TestClient(app)
+    client.get("/items/1")
+    now = time.monotonic()
+    mocker.patch("squall.caching.time.monotonic", return_value=now + 61)
+    client.get("/items/1")
+    assert app.calls == 2
+
+
+def test_stale_while_revalidate(mocker):
+    app = Squall()
+    calls = []
+
+    @app.get("/", cache=Cache(ttl=10, stale_while_revalidate=10))
+    async def root():
+        calls.append(1)
+        return {"calls": len(calls)}
+
+    client = TestClient(app)
+    assert client.get("/").json() == {"calls": 1}
+    assert client.get("/").headers["cache-control"] == (
+        "max-age=10, stale-while-revalidate=10"
+    )
+
+    now = time.monotonic()
+    mocker.patch("squall.caching.time.monotonic", return_value=now + 15)
+    # Stale copy is served, fresh one is rendered in the background
+    assert client.get("/").json() == {"calls": 1}
+    assert len(calls) == 2
+    assert client.get("/").json() == {"calls": 2}
+
+    mocker.patch("squall.caching.time.monotonic", return_value=now + 100)
+    assert client.get("/").json() == {"calls": 3}
+
+
+def test_refresh_ignores_conditional_headers(mocker):
+    app = Squall(etag=True)
+    calls = []
+
+    @app.get("/", cache=Cache(ttl=10, stale_while_revalidate=10))
+    async def root():
+        calls.append(1)
+        return {"static": True}
+
+    client = TestClient(app)
+    etag = client.get("/").headers["etag"]
+    now = time.monotonic()
+    mocker.patch("squall.caching.time.monotonic", return_value=now + 15)
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(calls) == 2
+    (route,) = [r for r in app.routes if r.path.path == "/"]
+    (entry,) = route.response_cache.entries.values()
+    assert entry.created_at == now + 15
+
+
+def test_max_entries():
+    app = Squall()
+
+    @app.get("/{item_id}", cache=Cache(ttl=60, max_entries=2))
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    client = TestClient(app)
+    for item_id in range(3):
+        client.get(f"/{item_id}")
+    (route,) = [r for r in app.routes if r.path.path == "/{item_id}"]
+    assert len(route.response_cache.entries) == 2
+    assert route.response_cache.misses == 3
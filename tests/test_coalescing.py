@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+from squall import Header, HTTPException, Squall
+from squall.testclient import TestClient
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+    app.calls = 0
+
+    @app.get("/items/{item_id}", coalesce=True)
+    async def get_item(item_id: int):
+        app.calls += 1
+        await anyio.sleep(0.2)
+        return {"item_id": item_id, "calls": app.calls}
+
+    @app.get("/user", coalesce=True)
+    async def get_user(user: str = Header(alias="x-user")):
+        app.calls += 1
+        await anyio.sleep(0.2)
+        return {"user": user}
+
+    @app.get("/fail", coalesce=True)
+    async def fail():
+        app.calls += 1
+        await anyio.sleep(0.2)
+        raise HTTPException(status_code=503, detail="Unavailable")
+
+    return app
+
+
+def concurrently(client, requests):
+    with ThreadPoolExecutor(len(requests)) as pool:
+        futures = [pool.submit(client.get, *args, **kw) for args, kw in requests]
+        return [f.result() for f in futures]
+
+
+def test_same_requests_share_execution(app):
+    with TestClient(app) as client:
+        responses = concurrently(client, [(("/items/1",), {})] * 5)
+    assert app.calls == 1
+    assert {r.content for r in responses} == {b'{"item_id":1,"calls":1}'}
+
+
+def test_different_requests_are_not_coalesced(app):
+    with TestClient(app) as client:
+        responses = concurrently(
+            client,
+            [
+                (("/items/1",), {}),
+                (("/items/2",), {}),
+                (("/items/1?q=1",), {}),
+                (("/user",), {"headers": {"x-user": "alice"}}),
+                (("/user",), {"headers": {"x-user": "bob"}}),
+            ],
+        )
+    assert app.calls == 5
+    assert responses[3].json() == {"user": "alice"}
+    assert responses[4].json() == {"user": "bob"}
+
+
+def test_exception_is_shared(app):
+    with TestClient(app) as client:
+        responses = concurrently(client, [(("/fail",), {})] * 3)
+    assert app.calls == 1
+    assert [r.status_code for r in responses] == [503] * 3
+
+
+def test_sequential_requests_are_not_coalesced(app):
+    with TestClient(app) as client:
+        client.get("/items/1")
+        client.get("/items/1")
+    assert app.calls == 2
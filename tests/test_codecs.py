@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import List
+
+from squall import Squall
+from squall.codecs import CodecRegistry
+from squall.testclient import TestClient
+
+
+@dataclass
+class Item:
+    name: str
+    price: float
+
+
+def test_registry():
+    registry = CodecRegistry()
+    built = []
+
+    def factory():
+        built.append(1)
+        return object()
+
+    first = registry.get("serializer", Item, factory)
+    assert registry.get("serializer", Item, factory) is first
+    assert registry.get("deserializer", Item, factory) is not first
+    assert registry.get("serializer", List[Item], factory) is not first
+    assert len(built) == 3
+    assert len(registry.codecs) == 3
+
+    stats = registry.statistics()
+    assert stats.built == {"serializer": 2, "deserializer": 1}
+    assert stats.total_built == 3
+    assert stats.reused == 1
+    assert set(stats.build_time) == {"serializer", "deserializer"}
+    assert stats.total_build_time >= 0
+
+
+def test_unhashable_keys_are_not_stored():
+    registry = CodecRegistry()
+    assert registry.get("schema", ({},), dict) is not registry.get(
+        "schema", ({},), dict
+    )
+    assert len(registry.codecs) == 0
+    assert registry.statistics().built == {"schema": 2}
+
+
+def test_routes_share_codecs():
+    app = Squall()
+
+    @app.get("/items/a", response_model=Item)
+    async def get_a() -> Item:
+        return Item("a", 1.0)
+
+    @app.get("/items/b", response_model=Item)
+    async def get_b() -> Item:
+        return Item("b", 2.0)
+
+    @app.post("/items/a", response_model=Item)
+    async def post_a(item: Item) -> Item:
+        return item
+
+    @app.post("/items/b", response_model=Item)
+    async def post_b(item: Item) -> Item:
+        return item
+
+    routes = [route for route in app.routes if route.path.path.startswith("/items")]
+    assert len({id(route.response_serializer) for route in routes}) == 1
+    assert routes[2].request_deserializer is routes[3].request_deserializer
+    assert app.codecs.statistics().built == {
+        "request": 1,
+        "response": 1,
+        "response_class": 1,
+    }
+
+    client = TestClient(app)
+    assert client.post("/items/b", json={"name": "b", "price": 2}).json() == {
+        "name": "b",
+        "price": 2.0,
+    }
+
+    schema = client.get("/openapi.json").json()
+    assert "Item" in schema["components"]["schemas"]
+    stats = app.codecs.statistics()
+    assert stats.built["serialization_schema"] == 1
+    assert stats.built["deserialization_schema"] == 1
@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pytest
+from squall import Body, Form, Query, Request, Router, Squall
+from squall.compiler import HandlerCompiler
+from squall.responses import PlainTextResponse
+from squall.testclient import TestClient
+
+
+@dataclass
+class Item:
+    name: str
+    price: Optional[float] = None
+
+
+def create_app(compile_handlers: bool) -> Squall:
+    app = Squall(compile_handlers=compile_handlers)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/sync")
+    def sync_endpoint():
+        return {"sync": True}
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int, q: Optional[str] = Query(None)):
+        return {"item_id": item_id, "q": q}
+
+    @app.post("/items", response_model=Item, status_code=201)
+    async def create_item(item: Item) -> Item:
+        return item
+
+    @app.get("/items", response_model=List[Item])
+    async def list_items():
+        return [{"name": "foo", "price": 1.5}, {"name": "bar"}]
+
+    @app.post("/raw")
+    async def raw_body(request: Request, payload=Body()):
+        return {"payload": payload, "method": request.method}
+
+    @app.post("/form")
+    async def form_fields(username: str = Form(), password: str = Form()):
+        return {"username": username, "password": password}
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("plain")
+
+    @app.get("/invalid", response_model=Item)
+    async def invalid_item():
+        return {"price": 1.5}
+
+    return app
+
+
+compiled = TestClient(create_app(compile_handlers=True))
+interpreted = TestClient(create_app(compile_handlers=False))
+
+
+@pytest.mark.parametrize(
+    "method,path,kwargs",
+    [
+        ["GET", "/health", {}],
+        ["GET", "/sync", {}],
+        ["GET", "/items/5?q=bar", {}],
+        ["GET", "/items/5", {}],
+        ["GET", "/items/foo", {}],
+        ["POST", "/items", {"json": {"name": "foo", "price": 2.0}}],
+        ["POST", "/items", {"json": {"price": 2.0}}],
+        [
+            "POST",
+            "/items",
+            {"data": "{", "headers": {"content-type": "application/json"}},
+        ],
+        ["GET", "/items", {}],
+        ["POST", "/raw", {"json": {"a": 1}}],
+        ["POST", "/raw", {"data": b"raw"}],
+        ["POST", "/form", {"data": {"username": "foo", "password": "bar"}}],
+        ["POST", "/form", {"data": {"username": "foo"}}],
+        ["GET", "/text", {}],
+    ],
+)
+def test_compiled_handler_parity(method, path, kwargs):
+    expected = interpreted.request(method, path, **kwargs)
+    response = compiled.request(method, path, **kwargs)
+    assert response.status_code == expected.status_code
+    assert response.content == expected.content
+    assert response.headers == expected.headers
+
+
+def test_compiled_handler_response_validation():
+    with pytest.raises(Exception):
+        compiled.get("/invalid")
+
+
+def test_request_is_not_built_without_params():
+    async def endpoint() -> dict:
+        return {}
+
+    handler = HandlerCompiler(endpoint=endpoint).build()
+    assert "Request" not in handler.__code__.co_names
+    assert "isinstance" not in handler.__code__.co_names
+
+
+def test_request_is_built_with_params():
+    async def endpoint(request: Request):
+        return {}
+
+    handler = HandlerCompiler(
+        endpoint=endpoint, body_fields=[{"name": "request", "kind": "request"}]
+    ).build()
+    assert "Request" in handler.__code__.co_names
+    assert "isinstance" in handler.__code__.co_names
+
+
+@pytest.mark.parametrize(
+    "compile_handlers, router_option, expected",
+    [
+        (True, None, True),
+        (False, None, False),
+        (True, False, False),
+        (False, True, True),
+    ],
+)
+def test_included_routers_follow_application(compile_handlers, router_option, expected):
+    app = Squall(compile_handlers=compile_handlers)
+    router = Router(prefix="/router", compile_handlers=router_option)
+
+    @router.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    app.include_router(router)
+    (route,) = [r for r in app.routes if r.path.path == "/router/health"]
+    assert route.compile_handler is expected
+    assert TestClient(app).get("/router/health").json() == {"status": "ok"}
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from squall import Squall
+from squall.dataloaders import DataLoader, Loader
+from squall.testclient import TestClient
+
+USERS = {1: "alice", 2: "bob", 3: "carol"}
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+    app.calls = []
+
+    async def get_users(ids):
+        app.calls.append(ids)
+        return [USERS.get(i) for i in ids]
+
+    def get_emails(ids):
+        app.calls.append(ids)
+        return {i: f"{USERS[i]}@example.com" for i in ids if i in USERS}
+
+    users = Loader(get_users)
+    emails = Loader(get_emails)
+
+    async def get_author(post, loader):
+        return {"post": post["id"], "author": await loader.load(post["author_id"])}
+
+    @app.get("/posts")
+    async def get_posts(loader: DataLoader = users, same: DataLoader = users):
+        posts = [{"id": i, "author_id": i % 2 + 1} for i in range(4)]
+        result = await asyncio.gather(*[get_author(post, loader) for post in posts])
+        # Loaded values are cached for the rest of the request
+        assert await same.load(1) == "alice"
+        return result
+
+    @app.get("/emails")
+    async def get_emails_list(loader: DataLoader = emails):
+        return await loader.load_many([3, 4, 3])
+
+    return app
+
+
+def test_lookups_are_batched_and_deduplicated(app):
+    client = TestClient(app)
+    response = client.get("/posts")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"post": 0, "author": "alice"},
+        {"post": 1, "author": "bob"},
+        {"post": 2, "author": "alice"},
+        {"post": 3, "author": "bob"},
+    ]
+    assert app.calls == [[1, 2]]
+
+    # Loaders are request scoped
+    client.get("/posts")
+    assert app.calls == [[1, 2], [1, 2]]
+
+
+def test_sync_load_function_with_mapping(app):
+    client = TestClient(app)
+    response = client.get("/emails")
+    assert response.json() == ["carol@example.com", None, "carol@example.com"]
+    assert app.calls == [[3, 4]]
+
+
+def test_failed_keys_are_retried():
+    attempts = []
+
+    async def flaky(keys):
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise ConnectionError("Backend unavailable")
+        return keys
+
+    async def main():
+        loader = DataLoader(flaky)
+        with pytest.raises(ConnectionError):
+            await loader.load(1)
+        return await loader.load(1)
+
+    assert asyncio.run(main()) == 1
+    assert attempts == [[1], [1]]
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_keys_cleared_while_loading(fail):
+    async def load(keys):
+        if fail:
+            raise ConnectionError("Backend unavailable")
+        return keys
+
+    async def main():
+        loader = DataLoader(load)
+        futures = [loader.load(1), loader.load(2)]
+        loader.clear(1)
+        return await asyncio.wait_for(
+            asyncio.gather(*futures, return_exceptions=True), timeout=1
+        )
+
+    results = asyncio.run(main())
+    if fail:
+        assert all(isinstance(result, ConnectionError) for result in results)
+    else:
+        assert results == [1, 2]
+
+
+def test_max_batch_size_and_prime():
+    calls = []
+
+    async def echo(keys):
+        calls.append(keys)
+        return keys
+
+    async def main():
+        loader = DataLoader(echo, max_batch_size=2)
+        loader.prime(0, "primed")
+        return await loader.load_many([0, 1, 2, 3, 4])
+
+    assert asyncio.run(main()) == ["primed", 1, 2, 3, 4]
+    assert calls == [[1, 2], [3, 4]]
+
+
+def test_running_batches_are_referenced():
+    async def echo(keys):
+        return keys
+
+    async def main():
+        loader = DataLoader(echo)
+        futures = [loader.load(1), loader.load(2)]
+        await asyncio.sleep(0)
+        assert len(loader._tasks) == 1
+        assert await asyncio.gather(*futures) == [1, 2]
+        await asyncio.sleep(0)
+        assert not loader._tasks
+
+    asyncio.run(main())
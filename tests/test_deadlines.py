@@ -0,0 +1,71 @@
+import time
+from typing import Optional
+
+import anyio
+import pytest
+from squall import Squall
+from squall.deadlines import Deadline
+from squall.testclient import TestClient
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+    app.cancelled = False
+
+    @app.get("/slow", timeout=0.1)
+    async def slow():
+        try:
+            await anyio.sleep(1)
+        except BaseException:
+            app.cancelled = True
+            raise
+        return {}
+
+    @app.get("/budget", timeout=5)
+    async def budget(deadline: Deadline):
+        return {"remaining": deadline.remaining()}
+
+    @app.get("/no-timeout")
+    async def no_timeout(deadline: Optional[Deadline]):
+        return {"deadline": deadline}
+
+    return app
+
+
+def test_timeout(app):
+    client = TestClient(app)
+    started = time.monotonic()
+    response = client.get("/slow")
+    assert time.monotonic() - started < 0.5
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Gateway Timeout"}
+    assert app.cancelled
+
+
+def test_remaining_budget(app):
+    client = TestClient(app)
+    remaining = client.get("/budget").json()["remaining"]
+    assert 4 < remaining <= 5
+
+
+@pytest.mark.parametrize(
+    "header,expected", [("2", 2), ("10", 5), ("invalid", 5), ("0.5", 0.5)]
+)
+def test_deadline_header(app, header, expected):
+    client = TestClient(app)
+    response = client.get("/budget", headers={"X-Request-Deadline": header})
+    remaining = response.json()["remaining"]
+    assert expected - 1 < remaining <= expected
+
+
+@pytest.mark.parametrize("header", ["0", "-1"])
+def test_expired_deadline_header(app, header):
+    client = TestClient(app)
+    response = client.get("/budget", headers={"X-Request-Deadline": header})
+    assert response.status_code == 504
+
+
+def test_route_without_timeout(app):
+    client = TestClient(app)
+    assert client.get("/no-timeout").json() == {"deadline": None}
@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Annotated, Any, List, Optional
+
+import pytest
+from apischema import ValidationError, alias, deserialization_method, schema, validator
+from squall import Squall
+from squall.decoders import DecoderCompiler, Unsupported, get_request_decoder
+from squall.testclient import TestClient
+
+
+@dataclass
+class Tag:
+    name: str
+    weight: float = 1.0
+
+
+@dataclass
+class Item:
+    name: str
+    price: float
+    count: int
+    available: bool
+    tags: List[Tag] = field(default_factory=list)
+    comment: Optional[str] = None
+    extra: Any = None
+
+
+@dataclass
+class Aliased:
+    item_id: int = field(metadata=alias("itemId"))
+
+
+@dataclass
+class Dated:
+    created_at: datetime
+
+
+@dataclass
+class Validated:
+    value: int
+
+    @validator
+    def positive(self):
+        if self.value < 0:
+            raise ValueError("negative")
+
+
+@dataclass
+class Constrained:
+    count: Annotated[int, schema(min=1)]
+    tags: List[Annotated[str, schema(min_len=1)]] = field(default_factory=list)
+
+
+ITEM = {
+    "name": "foo",
+    "price": 1,
+    "count": 2,
+    "available": True,
+    "tags": [{"name": "a"}, {"name": "b", "weight": 0.5}],
+    "extra": {"any": ["value"]},
+}
+
+
+@pytest.mark.parametrize(
+    "model, data",
+    [
+        (Item, ITEM),
+        (Item, {"name": "foo", "price": 1.5, "count": 2, "available": False}),
+        (Item, {**ITEM, "comment": None}),
+        (Item, {**ITEM, "comment": "bar"}),
+        (List[Item], [ITEM, ITEM]),
+        (Optional[Tag], None),
+    ],
+)
+def test_generated_decoder(model, data):
+    decode = DecoderCompiler(model).build()
+    expected = deserialization_method(model)(data)
+    assert decode(data) == expected
+    assert get_request_decoder(model)(data) == expected
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {**ITEM, "count": True},
+        {**ITEM, "count": 1.5},
+        {**ITEM, "price": "1"},
+        {**ITEM, "tags": [{"name": 1}]},
+        {**ITEM, "unknown": 1},
+        {"name": "foo"},
+        [ITEM],
+    ],
+)
+def test_errors_are_reported_by_apischema(data):
+    with pytest.raises(ValidationError) as expected:
+        deserialization_method(Item)(data)
+    with pytest.raises(ValidationError) as actual:
+        get_request_decoder(Item)(data)
+    assert actual.value.errors == expected.value.errors
+
+
+@pytest.mark.parametrize("model", [Aliased, Dated, List[Dated], Validated, Constrained])
+def test_unsupported_models(model):
+    with pytest.raises(Unsupported):
+        DecoderCompiler(model).build()
+    assert get_request_decoder(model) is not None
+
+
+@pytest.mark.parametrize("data", [{"count": -5}, {"count": 1, "tags": [""]}])
+def test_schema_constraints_are_checked(data):
+    with pytest.raises(ValidationError) as expected:
+        deserialization_method(Constrained)(data)
+    with pytest.raises(ValidationError) as actual:
+        get_request_decoder(Constrained)(data)
+    assert actual.value.errors == expected.value.errors
+
+
+@pytest.fixture
+def client(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+
+    @app.post("/items")
+    async def create_item(item: Item) -> Any:
+        return {"tags": [t.weight for t in item.tags], "price": item.price}
+
+    @app.post("/aliased")
+    async def create_aliased(data: Aliased) -> Any:
+        return {"item_id": data.item_id}
+
+    return TestClient(app)
+
+
+def test_endpoints(client):
+    response = client.post("/items", json=ITEM)
+    assert response.status_code == 200
+    assert response.json() == {"tags": [1.0, 0.5], "price": 1.0}
+
+    response = client.post("/items", json={**ITEM, "count": "2", "unknown": 1})
+    assert response.status_code == 422
+    assert response.json() == {
+        "details": [
+            {"loc": ["count"], "err": "expected type integer, found string"},
+            {"loc": ["unknown"], "err": "unexpected property"},
+        ]
+    }
+
+    response = client.post("/aliased", json={"itemId": 1})
+    assert response.json() == {"item_id": 1}
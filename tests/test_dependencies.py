@@ -0,0 +1,188 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+from squall import Depends, Header, HTTPException, Request, Squall
+from squall.dependencies import DependencyResolver
+from squall.testclient import TestClient
+
+
+@dataclass
+class Settings:
+    dsn: str
+
+
+@dataclass
+class Item:
+    name: str
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+    app.calls = []
+    app.closed = []
+
+    def get_settings():
+        app.calls.append("settings")
+        return Settings(dsn="sqlite://")
+
+    async def get_pool(settings: Settings = Depends(get_settings, singleton=True)):
+        app.calls.append("pool")
+        yield {"dsn": settings.dsn}
+        app.closed.append("pool")
+
+    async def get_user(request: Request):
+        app.calls.append("user")
+        user = request.headers.get("x-user")
+        if user is None:
+            raise HTTPException(status_code=401, detail="Unauthorized")
+        return user
+
+    def get_session(
+        pool=Depends(get_pool, singleton=True), user: str = Depends(get_user)
+    ):
+        app.calls.append("session")
+        return {"pool": pool["dsn"], "user": user}
+
+    def get_counter(user: str = Depends(get_user)):
+        app.calls.append("counter")
+        return len(app.calls)
+
+    @app.post("/items")
+    async def create_item(
+        item: Item,
+        session=Depends(get_session),
+        user: str = Depends(get_user),
+        first: int = Depends(get_counter, use_cache=False),
+        second: int = Depends(get_counter, use_cache=False),
+        version: str = Header(default="1", alias="x-version"),
+    ):
+        return {
+            "item": item.name,
+            "session": session,
+            "user": user,
+            "uncached": first != second,
+            "version": version,
+        }
+
+    return app
+
+
+def test_dependencies(app):
+    with TestClient(app) as client:
+        assert app.calls == ["settings", "pool"]
+        response = client.post(
+            "/items", json={"name": "fish"}, headers={"x-user": "bob"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "item": "fish",
+            "session": {"pool": "sqlite://", "user": "bob"},
+            "user": "bob",
+            "uncached": True,
+            "version": "1",
+        }
+        # Singletons are created once, request-scoped dependencies once per request
+        assert app.calls == [
+            "settings",
+            "pool",
+            "user",
+            "session",
+            "counter",
+            "counter",
+        ]
+
+        client.post("/items", json={"name": "fish"}, headers={"x-user": "bob"})
+        assert app.calls.count("pool") == 1
+        assert app.calls.count("user") == 2
+        assert app.closed == []
+
+    assert app.closed == ["pool"]
+
+
+def test_dependency_exception(app):
+    client = TestClient(app)
+    response = client.post("/items", json={"name": "fish"})
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Unauthorized"}
+
+
+def test_singletons_without_lifespan(app):
+    client = TestClient(app)
+    response = client.post("/items", json={"name": "fish"}, headers={"x-user": "bob"})
+    assert response.status_code == 200
+    assert app.calls.count("settings") == app.calls.count("pool") == 1
+
+
+def test_resolution_order():
+    def a():
+        return "a"
+
+    def b(a=Depends(a)):
+        return a + "b"
+
+    async def c(a=Depends(a), b=Depends(b)):
+        return a + b + "c"
+
+    def endpoint(c=Depends(c), b=Depends(b)):
+        pass
+
+    resolver = DependencyResolver(endpoint)
+    assert [call.func for call in resolver.calls] == [a, b, c]
+    assert asyncio.run(resolver(None)) == {"c": "aabc", "b": "ab"}
+
+
+def test_invalid_graphs():
+    def request_scoped(request: Request):
+        pass
+
+    def singleton(value=Depends(request_scoped)):
+        pass
+
+    def endpoint(value=Depends(singleton, singleton=True)):
+        pass
+
+    with pytest.raises(AssertionError, match="can't depend on request-scoped"):
+        DependencyResolver(endpoint)
+
+    def not_injectable(value):
+        pass
+
+    def endpoint(value=Depends(not_injectable)):
+        pass
+
+    with pytest.raises(AssertionError, match="isn't injectable"):
+        DependencyResolver(endpoint)
+
+    def cyclic(value=None):
+        pass
+
+    cyclic.__defaults__ = (Depends(cyclic),)
+
+    def endpoint(value=Depends(cyclic)):
+        pass
+
+    with pytest.raises(AssertionError, match="Circular dependency"):
+        DependencyResolver(endpoint)
+
+
+def test_request_scoped_generators_are_rejected():
+    def sync_gen():
+        yield 1
+
+    async def async_gen():
+        yield 1
+
+    for provider in (sync_gen, async_gen):
+
+        def endpoint(value=Depends(provider)):
+            pass
+
+        with pytest.raises(AssertionError, match="singleton dependency only"):
+            DependencyResolver(endpoint)
+
+        def endpoint(value=Depends(provider, singleton=True)):
+            pass
+
+        DependencyResolver(endpoint)
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from squall import Request, Squall
+from squall.testclient import TestClient
+
+
+def get_route(app, path):
+    (route,) = [r for r in app.routes if r.path.path == path]
+    return route
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+    app.events = []
+
+    @app.get("/search", cancel_on_disconnect=True)
+    async def search():
+        app.events.append("started")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            app.events.append("cancelled")
+            raise
+        return {}
+
+    @app.get("/shared", coalesce=True, cancel_on_disconnect=True)
+    async def shared():
+        app.events.append("shared")
+        await asyncio.sleep(0.3)
+        return {"shared": True}
+
+    @app.post("/echo", cancel_on_disconnect=True)
+    async def echo(request: Request):
+        return {"body": (await request.body()).decode()}
+
+    return app
+
+
+async def call(app, method, path, messages):
+    """Runs the request, `None` in messages pauses receiving for a while.
+    Receiving blocks once messages are over.
+    """
+    sent = []
+
+    async def receive():
+        if not messages:
+            await asyncio.Event().wait()
+        message = messages.pop(0)
+        if message is None:
+            await asyncio.sleep(0.1)
+            message = messages.pop(0)
+        return message
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+    }
+    await asyncio.wait_for(app(scope, receive, send), 1)
+    return sent
+
+
+def test_endpoint_cancelled_on_disconnect(app):
+    messages = [
+        {"type": "http.request", "body": b""},
+        None,
+        {"type": "http.disconnect"},
+    ]
+    sent = asyncio.run(call(app, "GET", "/search", messages))
+    assert sent == []
+    assert app.events == ["started", "cancelled"]
+    assert get_route(app, "/search").disconnects.cancelled == 1
+
+
+def test_request_body_is_pumped(app):
+    messages = [
+        {"type": "http.request", "body": b"hello, ", "more_body": True},
+        {"type": "http.request", "body": b"world"},
+        None,
+        {"type": "http.disconnect"},
+    ]
+    sent = asyncio.run(call(app, "POST", "/echo", messages))
+    assert sent[0]["status"] == 200
+    assert sent[1]["body"] == b'{"body":"hello, world"}'
+    assert get_route(app, "/echo").disconnects.cancelled == 0
+
+
+def test_completed_request(app):
+    client = TestClient(app)
+    response = client.post("/echo", data=b"data")
+    assert response.json() == {"body": "data"}
+
+
+def test_coalesced_request_outlives_disconnected_one(app):
+    request = {"type": "http.request", "body": b""}
+
+    async def main():
+        leading = asyncio.ensure_future(
+            call(app, "GET", "/shared", [request, None, {"type": "http.disconnect"}])
+        )
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(leading, call(app, "GET", "/shared", [request]))
+
+    leading, waiting = asyncio.run(main())
+    assert leading == []
+    assert waiting[0]["status"] == 200
+    assert waiting[1]["body"] == b'{"shared":true}'
+    assert app.events == ["shared", "shared"]
+    assert get_route(app, "/shared").disconnects.cancelled == 1
@@ -0,0 +1,253 @@
+import enum
+import random
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+
+import orjson
+import pytest
+from apischema import alias, serialization_method
+from squall import Router, Squall
+from squall.encoders import (
+    ResponseValidation,
+    ResponseValidator,
+    get_fast_codecs,
+    get_response_codecs,
+)
+from squall.exceptions import ResponsePayloadValidationError
+from squall.responses import HTMLResponse, JSONResponse, NDJSONResponse, default
+from squall.testclient import TestClient
+
+
+class Color(enum.Enum):
+    red = "red"
+
+
+@dataclass
+class Tag:
+    name: str
+    color: Color = Color.red
+
+
+@dataclass
+class Item:
+    id: UUID
+    price: Decimal
+    created_at: datetime
+    tags: List[Tag] = field(default_factory=list)
+    comment: Optional[str] = None
+
+
+@dataclass
+class Aliased:
+    item_id: int = field(metadata=alias("itemId"))
+
+
+ITEM = Item(
+    id=UUID("12345678123456781234567812345678"),
+    price=Decimal("1.5"),
+    created_at=datetime(2021, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc),
+    tags=[Tag("a"), Tag("b")],
+)
+
+WRONG_FIELD = replace(ITEM, tags=[Tag("a"), Tag(5)])
+
+
+def render(value):
+    return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@pytest.mark.parametrize("model, value", [(Item, ITEM), (List[Item], [ITEM, ITEM])])
+def test_instances_are_passed_through(model, value):
+    deserializer, serializer = get_fast_codecs(model, JSONResponse, False)
+    assert deserializer is serializer is None
+    assert render(value) == render(serialization_method(model)(value))
+
+
+def test_results_are_deserialized_into_instances():
+    deserializer, serializer = get_response_codecs(Item, JSONResponse, True)
+    assert deserializer is None
+    result = serializer(serialization_method(Item)(ITEM))
+    assert result == ITEM
+
+
+def test_fallback_to_apischema():
+    _, serializer = get_response_codecs(Aliased, JSONResponse, False)
+    assert serializer(Aliased(1)) == {"itemId": 1}
+
+    _, serializer = get_response_codecs(Item, HTMLResponse, False)
+    assert serializer(ITEM) == serialization_method(Item)(ITEM)
+
+    deserializer, serializer = get_response_codecs(Item, HTMLResponse, True)
+    assert deserializer is not None
+
+
+@pytest.mark.parametrize(
+    "model, value",
+    [
+        (Item, {}),
+        (List[Item], [ITEM, {}]),
+        (Item, WRONG_FIELD),
+        (List[Item], [ITEM, WRONG_FIELD]),
+    ],
+)
+def test_instances_are_checked(model, value):
+    _, serializer = get_response_codecs(model, JSONResponse, False)
+    with pytest.raises(TypeError):
+        serializer(value)
+
+
+@pytest.fixture
+def client(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+
+    @app.get("/items", response_model=List[Item])
+    async def get_items() -> List[Item]:
+        return [ITEM, ITEM]
+
+    @app.get("/dicts", response_model=List[Item])
+    async def get_dicts():
+        return serialization_method(List[Item])([ITEM, ITEM])
+
+    @app.get("/wrong", response_model=Item)
+    async def get_wrong() -> Item:
+        return {"id": 1}
+
+    @app.get("/wrong-field", response_model=Item)
+    async def get_wrong_field() -> Item:
+        return WRONG_FIELD
+
+    @app.get("/stream", response_model=Item, response_class=NDJSONResponse)
+    async def get_stream() -> Item:
+        yield ITEM
+
+    return TestClient(app)
+
+
+def test_endpoints(client):
+    expected = serialization_method(List[Item])([ITEM, ITEM])
+    assert client.get("/items").json() == expected
+    assert client.get("/dicts").json() == expected
+    assert client.get("/stream").text == orjson.dumps(expected[0]).decode() + "\n"
+    with pytest.raises(ResponsePayloadValidationError):
+        client.get("/wrong")
+    with pytest.raises(ResponsePayloadValidationError):
+        client.get("/wrong-field")
+
+
+@pytest.mark.parametrize(
+    "policy, checked",
+    [
+        (ResponseValidation.never(), 0),
+        (ResponseValidation.sampled(0.5), None),
+        (ResponseValidation.sampled(0), 0),
+        (ResponseValidation.startup_only(), 1),
+    ],
+)
+def test_validation_policies(policy, checked):
+    validator = ResponseValidator(policy)
+    deserializer, serializer = validator.get_codecs(List[Item], JSONResponse, False)
+    assert deserializer is None
+    for _ in range(100):
+        value = [ITEM, ITEM]
+        result = value if serializer is None else serializer(value)
+        assert result is value
+
+    if checked is None:
+        assert 0 < validator.checked < 100
+    else:
+        assert validator.checked == checked
+    assert validator.violations == 0
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [ResponseValidation.sampled(1), ResponseValidation.always()],
+)
+def test_validation_failures_raise(policy):
+    _, serializer = ResponseValidator(policy).get_codecs(Item, JSONResponse, False)
+    assert render(serializer(ITEM)) == render(serialization_method(Item)(ITEM))
+    with pytest.raises(TypeError):
+        serializer({})
+    with pytest.raises(TypeError):
+        serializer(WRONG_FIELD)
+
+
+def test_violations_are_counted(caplog):
+    validator = ResponseValidator(ResponseValidation.startup_only())
+    _, serializer = validator.get_codecs(Item, JSONResponse, False)
+    assert serializer({"id": 1}) == {"id": 1}
+    assert serializer({}) == {}
+    assert validator.checked == validator.violations == 1
+    assert "doesn't match the model" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "policy", [ResponseValidation.sampled(0.99), ResponseValidation.startup_only()]
+)
+def test_field_violations_are_counted(policy):
+    random.seed(0)
+    validator = ResponseValidator(policy)
+    _, serializer = validator.get_codecs(List[Item], JSONResponse, False)
+    value = [ITEM, WRONG_FIELD]
+    assert serializer(value) is value
+    assert validator.checked == validator.violations == 1
+
+
+def test_never_skips_checks():
+    _, serializer = ResponseValidator(ResponseValidation.never()).get_codecs(
+        Item, HTMLResponse, False
+    )
+    assert serializer(ITEM) == serialization_method(Item)(ITEM)
+
+    deserializer, serializer = ResponseValidator(ResponseValidation.never()).get_codecs(
+        Item, JSONResponse, True
+    )
+    assert deserializer is None
+    assert serializer(serialization_method(Item)(ITEM)) == ITEM
+
+
+def test_invalid_policies():
+    with pytest.raises(AssertionError):
+        ResponseValidation("sometimes")
+    with pytest.raises(AssertionError):
+        ResponseValidation.sampled(2)
+
+
+def test_route_policies():
+    app = Squall(response_validation=ResponseValidation.never())
+
+    @app.get("/wrong", response_model=Item)
+    async def get_wrong() -> Item:
+        return {"id": 1}
+
+    @app.get(
+        "/strict",
+        response_model=Item,
+        response_validation=ResponseValidation.always(),
+    )
+    async def get_strict() -> Item:
+        return {"id": 1}
+
+    router = Router(prefix="/router")
+
+    @router.get("/wrong", response_model=Item)
+    async def get_router_wrong() -> Item:
+        return {"id": 1}
+
+    @router.get(
+        "/strict",
+        response_model=Item,
+        response_validation=ResponseValidation.always(),
+    )
+    async def get_router_strict() -> Item:
+        return {"id": 1}
+
+    app.include_router(router)
+    client = TestClient(app)
+    for prefix in ("", "/router"):
+        assert client.get(f"{prefix}/wrong").json() == {"id": 1}
+        with pytest.raises(ResponsePayloadValidationError):
+            client.get(f"{prefix}/strict")
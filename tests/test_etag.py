@@ -0,0 +1,141 @@
+import pytest
+from squall import Squall
+from squall.caching import Cache
+from squall.compression import Compression
+from squall.responses import JSONResponse, Versioned, make_etag
+from squall.testclient import TestClient
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(
+        etag=True,
+        compression=Compression(minimal_size=1),
+        compile_handlers=compile_handlers,
+    )
+    app.rendered = 0
+
+    class CountingResponse(JSONResponse):
+        def render(self, content):
+            app.rendered += 1
+            return super().render(content)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    @app.get("/created", status_code=201)
+    async def create():
+        return {"created": True}
+
+    @app.get("/custom")
+    async def get_custom():
+        return JSONResponse({"custom": True}, headers={"ETag": '"custom"'})
+
+    @app.get("/versioned", response_class=CountingResponse)
+    async def get_versioned():
+        return Versioned(42, {"data": "payload"})
+
+    @app.get("/cached", cache=Cache(ttl=60))
+    async def get_cached():
+        return {"cached": True}
+
+    return app
+
+
+def test_etag_header(app):
+    client = TestClient(app)
+    response = client.get("/items/1", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    # Calculated from the body before compression
+    assert response.headers["etag"] == make_etag(b'{"item_id":1}').decode()
+    assert response.headers["etag"].startswith('W/"')
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_not_modified(app, encoding):
+    client = TestClient(app)
+    etag = client.get("/items/1").headers["etag"]
+    response = client.get(
+        "/items/1", headers={"If-None-Match": etag, "Accept-Encoding": encoding}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-encoding" not in response.headers
+    assert "content-type" not in response.headers
+
+
+@pytest.mark.parametrize(
+    "if_none_match,status_code",
+    [
+        ['"other", W/"x"', 200],
+        ["*", 304],
+    ],
+)
+def test_if_none_match_list(app, if_none_match, status_code):
+    client = TestClient(app)
+    etag = client.get("/items/1").headers["etag"]
+    response = client.get("/items/1", headers={"If-None-Match": if_none_match})
+    assert response.status_code == status_code
+    response = client.get("/items/1", headers={"If-None-Match": f'"other", {etag[2:]}'})
+    assert response.status_code == 304
+
+
+def test_head_not_modified(app):
+    client = TestClient(app)
+    etag = client.head("/items/1").headers["etag"]
+    response = client.head("/items/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_non_ok_response_has_no_etag(app):
+    client = TestClient(app)
+    response = client.get("/created")
+    assert response.status_code == 201
+    assert "etag" not in response.headers
+
+
+def test_custom_etag(app):
+    client = TestClient(app)
+    assert client.get("/custom").headers["etag"] == '"custom"'
+    response = client.get("/custom", headers={"If-None-Match": '"custom"'})
+    assert response.status_code == 304
+
+
+def test_versioned_skips_serialization(app):
+    client = TestClient(app)
+    response = client.get("/versioned")
+    assert response.json() == {"data": "payload"}
+    assert response.headers["etag"] == 'W/"42"'
+    assert app.rendered == 1
+
+    response = client.get("/versioned", headers={"If-None-Match": 'W/"42"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == 'W/"42"'
+    assert app.rendered == 1
+
+
+def test_cached_not_modified(app):
+    client = TestClient(app)
+    etag = client.get("/cached").headers["etag"]
+    response = client.get("/cached", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == "max-age=60"
+
+
+def test_etag_disabled():
+    app = Squall()
+
+    @app.get("/")
+    async def root():
+        return {}
+
+    @app.get("/versioned")
+    async def versioned():
+        return Versioned("v1", {})
+
+    client = TestClient(app)
+    assert "etag" not in client.get("/").headers
+    assert client.get("/versioned").headers["etag"] == 'W/"v1"'
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from squall import Query, Squall
+from squall.executors import ProcessPool, ThreadPool, default, inline
+from squall.testclient import TestClient
+
+
+def test_inline_executor(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+
+    @app.get("/", executor=inline)
+    def root():
+        return {"thread": threading.get_ident()}
+
+    @app.get("/threaded")
+    def threaded():
+        return {"thread": threading.get_ident()}
+
+    with TestClient(app) as client:
+        inline_thread = client.get("/").json()["thread"]
+        threaded_thread = client.get("/threaded").json()["thread"]
+        loop_thread = client.portal.call(threading.get_ident)
+    assert inline_thread == loop_thread
+    assert threaded_thread != loop_thread
+
+
+def test_thread_pool(compile_handlers):
+    pool = ThreadPool("reports", size=2)
+    app = Squall(compile_handlers=compile_handlers)
+    threads = set()
+
+    @app.get("/report", executor=pool)
+    def report():
+        threads.add(threading.get_ident())
+        time.sleep(0.1)
+        return {"running": pool.statistics().running}
+
+    with TestClient(app) as client:
+        with ThreadPoolExecutor(4) as requests:
+            futures = [requests.submit(client.get, "/report") for _ in range(4)]
+            responses = [f.result() for f in futures]
+    assert all(r.status_code == 200 for r in responses)
+    assert max(r.json()["running"] for r in responses) == 2
+    assert pool.statistics().running == 0
+    assert pool.statistics().queued == 0
+
+
+def test_thread_pool_queue_limit(compile_handlers):
+    pool = ThreadPool("limited", size=1, queue_limit=1)
+    app = Squall(compile_handlers=compile_handlers)
+    started = threading.Event()
+
+    @app.get("/slow", executor=pool)
+    def slow():
+        started.set()
+        time.sleep(0.3)
+        return {}
+
+    with TestClient(app) as client:
+        # Initialize the pool
+        assert client.get("/slow").status_code == 200
+        started.clear()
+        with ThreadPoolExecutor(3) as requests:
+            first = requests.submit(client.get, "/slow")
+            started.wait()
+            second = requests.submit(client.get, "/slow")
+            while pool.statistics().queued < 1:
+                time.sleep(0.01)
+            third = requests.submit(client.get, "/slow")
+            statuses = [f.result().status_code for f in (first, second, third)]
+    assert statuses == [200, 200, 503]
+    stats = pool.statistics()
+    assert stats.name == "limited"
+    assert stats.rejected == 1
+
+
+def test_default_executor_statistics():
+    app = Squall()
+
+    @app.get("/stats")
+    async def get_stats():
+        return default.statistics()
+
+    client = TestClient(app)
+    stats = client.get("/stats").json()
+    assert stats["name"] == "default"
+    assert stats["size"] == 40
+
+
+def cpu_bound(n: int = Query()):
+    return {"pid": os.getpid(), "result": sum(i * i for i in range(n))}
+
+
+def test_process_pool(compile_handlers):
+    pool = ProcessPool("cpu", size=2)
+    app = Squall(compile_handlers=compile_handlers)
+    app.get("/cpu", executor=pool)(cpu_bound)
+
+    assert pool in app.router.lifespan_contexts
+    with TestClient(app) as client:
+        response = client.get("/cpu?n=10")
+        assert response.status_code == 200
+        assert response.json()["result"] == 285
+        assert response.json()["pid"] != os.getpid()
+        assert pool.statistics().size == 2
+    assert pool._pool is None
+
+
+def test_process_pool_is_not_shared():
+    pool = ProcessPool("cpu", size=1)
+    first, second = Squall(), Squall()
+    first.get("/cpu", executor=pool)(cpu_bound)
+    second.get("/cpu", executor=pool)(cpu_bound)
+
+    with TestClient(first):
+        with pytest.raises(AssertionError):
+            with TestClient(second):
+                pass
+        assert pool._pool is not None
+    assert pool._pool is None
+
+
+def test_process_pool_default_size():
+    assert ProcessPool("cpu").statistics().size == (os.cpu_count() or 1)
+
+
+def test_process_pool_is_not_started():
+    pool = ProcessPool("cpu")
+    app = Squall()
+    app.get("/cpu", executor=pool)(cpu_bound)
+
+    client = TestClient(app)
+    with pytest.raises(AssertionError):
+        client.get("/cpu?n=10")
+
+
+def test_executor_requires_sync_endpoint():
+    app = Squall()
+
+    async def endpoint():
+        return {}
+
+    with pytest.raises(AssertionError):
+        app.get("/", executor=inline)(endpoint)
@@ -0,0 +1,173 @@
+import asyncio
+import sqlite3
+
+import pytest
+from squall import Query, Squall
+from squall.background import BackgroundTasks
+from squall.jobs import JobQueue
+from squall.testclient import TestClient
+
+
+def wait_for(condition, timeout=5.0):
+    async def wait():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    return asyncio.wait_for(wait(), timeout)
+
+
+@pytest.fixture
+def app(compile_handlers, tmp_path):
+    jobs = JobQueue(str(tmp_path / "jobs.sqlite3"), workers=2, poll_interval=0.05)
+    app = Squall(jobs=jobs, compile_handlers=compile_handlers)
+    app.done = []
+
+    @jobs.job
+    async def send_report(user_id):
+        app.done.append(("async", user_id))
+
+    @jobs.job
+    def sync_report(user_id):
+        app.done.append(("sync", user_id))
+
+    @app.post("/reports", status_code=202)
+    async def create_report(queue: JobQueue, user_id: int = Query()):
+        await queue.enqueue(send_report, user_id)
+        return {"job_id": await queue.enqueue(sync_report, user_id=user_id)}
+
+    return app
+
+
+def test_enqueue_from_endpoint(app):
+    with TestClient(app) as client:
+        response = client.post("/reports?user_id=7")
+        assert response.status_code == 202
+        assert response.json() == {"job_id": 2}
+        client.portal.call(wait_for, lambda: len(app.done) == 2)
+        statistics = client.portal.call(app.jobs.statistics)
+
+    assert sorted(app.done) == [("async", 7), ("sync", 7)]
+    assert statistics.completed == 2
+    assert statistics.pending == 0
+
+
+def test_enqueue_from_background_task_on_shutdown(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    jobs = JobQueue(path, workers=0)
+    app = Squall(jobs=jobs)
+
+    @jobs.job
+    async def report(user_id):
+        pass
+
+    async def enqueue_report(user_id):
+        await asyncio.sleep(0.1)
+        await jobs.enqueue(report, user_id)
+
+    @app.post("/reports")
+    async def create_report(background: BackgroundTasks, user_id: int = Query()):
+        background.add_task(enqueue_report, user_id)
+        return {}
+
+    with TestClient(app) as client:
+        assert client.post("/reports?user_id=7").status_code == 200
+
+    assert app.background_pool.statistics().failed == 0
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT count(*) FROM jobs").fetchone() == (1,)
+
+
+def test_storage_is_wal(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+
+    async def main():
+        async with JobQueue(path):
+            pass
+
+    asyncio.run(main())
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_jobs_survive_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    done = []
+
+    async def report(user_id):
+        done.append(user_id)
+
+    async def enqueue():
+        queue = JobQueue(path, workers=0)
+        queue.job(report)
+        async with queue:
+            await queue.enqueue(report, 1)
+            await queue.enqueue(report, 2, delay=3600)
+
+    async def process():
+        queue = JobQueue(path, poll_interval=0.01)
+        queue.job(report)
+        async with queue:
+            await wait_for(lambda: done)
+            return await queue.statistics()
+
+    asyncio.run(enqueue())
+    assert done == []
+    statistics = asyncio.run(process())
+    assert done == [1]
+    assert statistics.pending == 1
+
+
+def test_retries_with_backoff(tmp_path):
+    attempts = []
+
+    async def flaky():
+        attempts.append(asyncio.get_running_loop().time())
+        raise ValueError("Temporary failure")
+
+    async def main():
+        queue = JobQueue(
+            str(tmp_path / "jobs.sqlite3"),
+            max_attempts=3,
+            backoff=0.05,
+            poll_interval=0.01,
+        )
+        queue.job(flaky)
+        async with queue:
+            await queue.enqueue(flaky)
+            await wait_for(lambda: len(attempts) == 3)
+            await asyncio.sleep(0.2)
+            return await queue.statistics()
+
+    statistics = asyncio.run(main())
+    assert len(attempts) == 3
+    assert attempts[2] - attempts[1] >= attempts[1] - attempts[0] >= 0.05
+    assert statistics.failed == 1
+    assert statistics.pending == 0
+    assert statistics.completed == 0
+
+
+def test_batched_dequeue(tmp_path):
+    async def noop(value):
+        pass
+
+    async def main():
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"), workers=0, batch_size=3)
+        queue.job(noop)
+        async with queue:
+            for i in range(5):
+                await queue.enqueue(noop, i)
+            first, second = await queue.dequeue(), await queue.dequeue()
+            return [job.args for job in first], [job.args for job in second]
+
+    first, second = asyncio.run(main())
+    assert first == [[0], [1], [2]]
+    assert second == [[3], [4]]
+
+
+def test_unregistered_job_is_rejected(tmp_path):
+    async def main():
+        async with JobQueue(str(tmp_path / "jobs.sqlite3"), workers=0) as queue:
+            await queue.enqueue("missing.job")
+
+    with pytest.raises(AssertionError, match="isn't registered"):
+        asyncio.run(main())
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List
+
+import orjson
+import pytest
+from squall import Router, Squall
+from squall.responses import (
+    JSONEncoders,
+    JSONOptions,
+    JSONResponse,
+    NDJSONResponse,
+    PlainTextResponse,
+    default,
+    get_json_response_class,
+)
+from squall.testclient import TestClient
+
+
+class Money(Decimal):
+    pass
+
+
+class Point:
+    def __init__(self, x: int, y: int) -> None:
+        self.x, self.y = x, y
+
+
+@dataclass
+class Event:
+    name: str
+    at: datetime
+
+
+def test_default_encoders():
+    assert orjson.loads(
+        orjson.dumps([Decimal("1.5"), Money("2"), {1}, b"a"], default=default)
+    ) == [
+        1.5,
+        2.0,
+        [1],
+        "a",
+    ]
+    with pytest.raises(TypeError):
+        orjson.dumps(Point(1, 2), default=default)
+
+
+def test_registered_encoders():
+    encoders = JSONEncoders({Point: lambda p: [p.x, p.y]})
+    assert orjson.dumps(Point(1, 2), default=encoders) == b"[1,2]"
+
+    encoders.register(Decimal, str)
+    assert (
+        orjson.dumps([Decimal("1.5"), Money("2")], default=encoders) == b'["1.5","2"]'
+    )
+    # The module default isn't affected
+    assert orjson.dumps(Decimal("1.5"), default=default) == b"1.5"
+
+
+def test_json_response_class():
+    encoders = JSONEncoders()
+    assert get_json_response_class(JSONResponse, default, JSONOptions()) is JSONResponse
+    assert get_json_response_class(PlainTextResponse, encoders, JSONOptions()) is (
+        PlainTextResponse
+    )
+
+    response_class = get_json_response_class(
+        NDJSONResponse, encoders, JSONOptions(non_str_keys=False, sort_keys=True)
+    )
+    assert issubclass(response_class, NDJSONResponse)
+    assert response_class.json_default is encoders
+    assert (
+        response_class.json_option == orjson.OPT_APPEND_NEWLINE | orjson.OPT_SORT_KEYS
+    )
+
+
+@pytest.fixture
+def client(compile_handlers):
+    app = Squall(
+        compile_handlers=compile_handlers,
+        json_encoders={Point: lambda p: {"x": p.x, "y": p.y}},
+    )
+
+    @app.get("/point")
+    async def get_point() -> Any:
+        return {"point": Point(1, 2), "price": Decimal("1.5")}
+
+    @app.get(
+        "/events",
+        response_model=List[Event],
+        json_options=JSONOptions(naive_utc=True, omit_microseconds=True),
+    )
+    async def get_events() -> List[Event]:
+        return [Event("a", datetime(2021, 1, 2, 3, 4, 5, 6))]
+
+    @app.get("/events/raw", response_model=List[Event])
+    async def get_raw_events() -> List[Event]:
+        return [Event("a", datetime(2021, 1, 2, 3, 4, 5, 6))]
+
+    @app.get("/passthrough", json_options=JSONOptions(passthrough_dataclass=True))
+    async def get_passthrough() -> Any:
+        return Event("a", datetime(2021, 1, 2))
+
+    @app.get(
+        "/passthrough/model",
+        response_model=Event,
+        json_options=JSONOptions(passthrough_dataclass=True),
+    )
+    async def get_passthrough_model() -> Event:
+        return Event("a", datetime(2021, 1, 2))
+
+    app.json_encoders.register(Event, lambda e: e.name)
+    return TestClient(app)
+
+
+def test_endpoints(client):
+    assert client.get("/point").json() == {"point": {"x": 1, "y": 2}, "price": 1.5}
+    assert client.get("/events").json() == [
+        {"name": "a", "at": "2021-01-02T03:04:05+00:00"}
+    ]
+    assert client.get("/events/raw").json() == [
+        {"name": "a", "at": "2021-01-02T03:04:05.000006"}
+    ]
+    assert client.get("/passthrough").json() == "a"
+    # Response models are serialized by apischema
+    assert client.get("/passthrough/model").json() == {
+        "name": "a",
+        "at": "2021-01-02T00:00:00",
+    }
+
+
+def test_application_options_apply_to_included_routes():
+    app = Squall(json_options=JSONOptions(sort_keys=True))
+    router = Router(prefix="/router")
+
+    @router.get("/sorted")
+    async def get_sorted() -> Any:
+        return {"b": 1, "a": 2}
+
+    @router.get("/unsorted", json_options=JSONOptions())
+    async def get_unsorted() -> Any:
+        return {"b": 1, "a": 2}
+
+    app.include_router(router)
+    client = TestClient(app)
+    assert client.get("/router/sorted").content == b'{"a":2,"b":1}'
+    assert client.get("/router/unsorted").content == b'{"b":1,"a":2}'
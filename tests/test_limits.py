@@ -0,0 +1,112 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+from squall import Squall
+from squall.limits import ConcurrencyLimit, ConcurrencyLimiter
+from squall.testclient import TestClient
+
+
+def create_app(limit):
+    app = Squall()
+
+    @app.get("/slow", concurrency_limit=limit)
+    async def slow():
+        await anyio.sleep(0.3)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    return app
+
+
+def get_limiter(app):
+    (route,) = [r for r in app.routes if r.path.path == "/slow"]
+    return route.concurrency_limiter
+
+
+def run_concurrently(client, count):
+    with ThreadPoolExecutor(count) as pool:
+        futures = [pool.submit(client.get, "/slow") for _ in range(count)]
+        # Fast route stays available while the slow one is saturated
+        time.sleep(0.1)
+        assert client.get("/fast").status_code == 200
+        return sorted(f.result().status_code for f in futures)
+
+
+def test_excess_requests_are_shed():
+    app = create_app(ConcurrencyLimit(max_concurrency=2, retry_after=5))
+    with TestClient(app) as client:
+        statuses = run_concurrently(client, 4)
+        response = client.get("/slow")
+    assert statuses == [200, 200, 503, 503]
+    assert response.status_code == 200
+    limiter = get_limiter(app)
+    assert limiter.shed == 2
+    assert limiter.in_flight == 0
+
+
+def test_shed_response():
+    app = create_app(ConcurrencyLimit(max_concurrency=1, retry_after=5))
+    with TestClient(app) as client:
+        with ThreadPoolExecutor(2) as pool:
+            first = pool.submit(client.get, "/slow")
+            time.sleep(0.1)
+            response = client.get("/slow")
+            first.result()
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert response.json() == {"detail": "Service Unavailable"}
+
+
+def test_queued_requests_wait():
+    app = create_app(ConcurrencyLimit(max_concurrency=1, max_queue=2))
+    with TestClient(app) as client:
+        statuses = run_concurrently(client, 4)
+    assert statuses == [200, 200, 200, 503]
+    assert get_limiter(app).queued == 0
+
+
+def test_queue_timeout():
+    app = create_app(
+        ConcurrencyLimit(max_concurrency=1, max_queue=2, queue_timeout=0.1)
+    )
+    with TestClient(app) as client:
+        statuses = run_concurrently(client, 3)
+    assert statuses == [200, 503, 503]
+
+
+def test_codel_shortens_queue_timeout():
+    limiter = ConcurrencyLimiter(
+        ConcurrencyLimit(
+            max_concurrency=1, max_queue=10, codel_target=0.01, codel_interval=0.1
+        )
+    )
+    assert limiter.get_queue_timeout(0) == 0.1
+    limiter.observe_delay(0.05)
+    assert limiter.get_queue_timeout(0.05) == 0.1
+    # Minimal delay within the interval exceeded the target
+    assert limiter.get_queue_timeout(0.15) == 0.01
+    limiter.observe_delay(0)
+    assert limiter.get_queue_timeout(0.3) == 0.1
+
+
+@pytest.mark.parametrize("max_queue", [0, 1])
+def test_limiter_slots(max_queue):
+    limiter = ConcurrencyLimiter(
+        ConcurrencyLimit(max_concurrency=1, max_queue=max_queue, queue_timeout=0.05)
+    )
+
+    async def scenario():
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        limiter.release()
+        assert await limiter.acquire()
+        limiter.release()
+        return limiter.in_flight
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from squall import Squall
+from squall.microbatching import MicroBatcher, batched
+from squall.testclient import TestClient
+
+
+def test_concurrent_calls_are_merged():
+    app = Squall()
+    calls = []
+
+    @app.batcher(max_batch_size=4, max_delay=0.5)
+    async def square(items):
+        calls.append(items)
+        return [i * i for i in items]
+
+    @app.get("/square/{value}")
+    async def get_square(value: int):
+        return {"result": await square(value)}
+
+    assert square in app.router.lifespan_contexts
+
+    with TestClient(app) as client, ThreadPoolExecutor(8) as pool:
+        responses = list(
+            pool.map(lambda i: client.get(f"/square/{i}").json(), range(8))
+        )
+
+    assert responses == [{"result": i * i} for i in range(8)]
+    assert sorted(len(i) for i in calls) == [4, 4]
+    statistics = square.statistics()
+    assert statistics.batches == 2
+    assert statistics.items == 8
+    assert statistics.histogram == {4: 2}
+
+
+def test_batch_by_delay():
+    @batched(max_batch_size=100, max_delay=0.01)
+    def upper(items):
+        return [i.upper() for i in items]
+
+    async def main():
+        return await asyncio.gather(upper("a"), upper("b"), upper("c"))
+
+    assert asyncio.run(main()) == ["A", "B", "C"]
+    assert upper.statistics().histogram == {4: 1}
+
+
+def test_failure_is_shared():
+    async def broken(items):
+        raise ValueError("Backend unavailable")
+
+    async def wrong_size(items):
+        return items[1:]
+
+    async def main(batcher):
+        return await asyncio.gather(batcher(1), batcher(2), return_exceptions=True)
+
+    batcher = MicroBatcher(broken, max_delay=0)
+    errors = asyncio.run(main(batcher))
+    assert [str(e) for e in errors] == ["Backend unavailable"] * 2
+    assert batcher.statistics().failed == 1
+
+    errors = asyncio.run(main(MicroBatcher(wrong_size, max_delay=0)))
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_flush_on_exit():
+    calls = []
+
+    async def echo(items):
+        calls.append(items)
+        return items
+
+    async def main():
+        batcher = MicroBatcher(echo, max_delay=60)
+        async with batcher:
+            call = asyncio.ensure_future(batcher("item"))
+            await asyncio.sleep(0)
+            assert batcher.statistics().pending == 1
+        return await call
+
+    assert asyncio.run(main()) == "item"
+    assert calls == [["item"]]
+
+
+@pytest.mark.parametrize("size, bucket", [(1, 1), (2, 2), (3, 4), (64, 64)])
+def test_histogram_buckets(size, bucket):
+    async def echo(items):
+        return items
+
+    async def main():
+        batcher = MicroBatcher(echo, max_batch_size=size, max_delay=60)
+        await asyncio.gather(*[batcher(i) for i in range(size)])
+        return batcher.statistics().histogram
+
+    assert asyncio.run(main()) == {bucket: 1}
@@ -24,6 +24,15 @@ def test_add_api_route_defaults(mocker):
         name=None,
         openapi_extra=None,
         trace_internals=False,
+        compile_handler=None,
+        cache=None,
+        coalesce=False,
+        executor=None,
+        concurrency_limit=None,
+        timeout=None,
+        cancel_on_disconnect=False,
+        response_validation=None,
+        json_options=None,
     )
 
 
@@ -79,6 +88,15 @@ def test_add_api_route_custom(mocker):
         name="mocked",
         openapi_extra={"extra": "data"},
         trace_internals=False,
+        compile_handler=None,
+        cache=None,
+        coalesce=False,
+        executor=None,
+        concurrency_limit=None,
+        timeout=None,
+        cancel_on_disconnect=False,
+        response_validation=None,
+        json_options=None,
     )
 
 
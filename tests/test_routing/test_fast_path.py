@@ -0,0 +1,65 @@
+import pytest
+from squall import Squall, WebSocket
+from squall.testclient import TestClient
+
+
+@pytest.fixture
+def app():
+    app = Squall(ignore_trailing_slashes=True)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_text("Hello, world!")
+        await websocket.close()
+
+    return app
+
+
+def test_fast_path_tables(app):
+    assert ("GET", "/health") in app.router._fast_path_route_http
+    assert "/ws" in app.router._fast_path_route_ws
+    assert not [path for _, path in app.router._fast_path_route_http if "{" in path]
+
+
+@pytest.mark.parametrize("path", ["/health", "/health/"])
+def test_static_path_skips_router(app, mocker, path):
+    resolve = mocker.patch.object(app.router, "_router")
+    client = TestClient(app)
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    resolve.resolve.assert_not_called()
+
+
+def test_dynamic_path(app):
+    client = TestClient(app)
+    response = client.get("/items/1")
+    assert response.status_code == 200
+    assert response.json() == {"item_id": 1}
+
+
+def test_static_websocket(app):
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        assert websocket.receive_text() == "Hello, world!"
+
+
+def test_trailing_slash_is_respected():
+    app = Squall(ignore_trailing_slashes=False, redirect_slashes=False)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+    assert client.get("/health/").status_code == 404
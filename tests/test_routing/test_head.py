@@ -0,0 +1,74 @@
+import pytest
+from squall import Squall
+from squall.compression import Compression
+from squall.responses import JSONResponse, StreamingResponse
+from squall.testclient import TestClient
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(
+        compression=Compression(minimal_size=1), compile_handlers=compile_handlers
+    )
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id, "name": "Item"}
+
+    @app.get("/static")
+    async def get_static():
+        return {"static": True}
+
+    @app.head("/explicit")
+    async def head_explicit():
+        return JSONResponse(headers={"x-explicit": "head"})
+
+    @app.get("/explicit")
+    async def get_explicit():
+        return {"explicit": "get"}
+
+    @app.get("/stream")
+    async def get_stream():
+        async def content():
+            yield b"chunk"
+
+        return StreamingResponse(content())
+
+    return app
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+@pytest.mark.parametrize("path", ["/items/1", "/static"])
+def test_head_for_get_route(app, path, encoding):
+    client = TestClient(app)
+    get = client.get(path, headers={"Accept-Encoding": encoding})
+    head = client.head(path, headers={"Accept-Encoding": encoding})
+    assert head.status_code == 200
+    assert head.content == b""
+    assert head.headers == get.headers
+    assert head.headers["content-type"] == "application/json"
+    if encoding == "gzip":
+        assert head.headers["content-encoding"] == "gzip"
+        assert head.headers["vary"] == "Accept-Encoding"
+    else:
+        assert "content-encoding" not in head.headers
+
+
+def test_explicit_head_is_not_replaced(app):
+    client = TestClient(app)
+    response = client.head("/explicit")
+    assert response.status_code == 200
+    assert response.headers["x-explicit"] == "head"
+
+
+def test_head_for_streaming_response(app):
+    client = TestClient(app)
+    response = client.head("/stream")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+def test_head_is_not_in_schema(app):
+    client = TestClient(app)
+    schema = client.get("/openapi.json").json()
+    assert list(schema["paths"]["/static"]) == ["get"]
@@ -0,0 +1,77 @@
+import pytest
+from squall import Squall
+from squall.compression import Compression
+from squall.testclient import TestClient
+
+app = Squall()
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/health")
+async def update_health():
+    return {"status": "ok"}
+
+
+@app.get("/items/{item_id}")
+async def get_item(item_id: int):
+    return {"item_id": item_id}
+
+
+@app.delete("/items/{item_id}")
+async def delete_item(item_id: int):
+    return {"item_id": item_id}
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "method,path,allow",
+    [
+        ["PUT", "/health", "GET, HEAD, POST"],
+        ["PATCH", "/items/1", "DELETE, GET, HEAD"],
+    ],
+)
+def test_method_not_allowed(method, path, allow):
+    response = client.request(method, path)
+    assert response.status_code == 405
+    assert response.headers["allow"] == allow
+    assert response.json() == {"detail": "Method Not Allowed"}
+
+
+def test_method_not_allowed_is_not_raised(mocker):
+    handler = mocker.AsyncMock()
+    app.exception_handlers[405] = handler
+    try:
+        response = client.put("/health")
+    finally:
+        del app.exception_handlers[405]
+    assert response.status_code == 405
+    handler.assert_not_called()
+
+
+def test_unknown_path_is_not_found():
+    response = client.put("/unknown")
+    assert response.status_code == 404
+    response = client.patch("/items/not-a-number")
+    assert response.status_code == 404
+
+
+def test_prepared_response_is_reusable():
+    app = Squall(compression=Compression(minimal_size=1))
+
+    @app.get("/")
+    async def root():
+        return {}
+
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.post("/", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 405
+        assert response.headers["allow"] == "GET, HEAD"
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == {"detail": "Method Not Allowed"}
@@ -0,0 +1,75 @@
+import pytest
+from squall import Squall
+from squall.testclient import TestClient
+
+app = Squall(ignore_trailing_slashes=False)
+
+
+@app.get("/items")
+async def get_items():
+    return []
+
+
+@app.get("/users/")
+async def get_users():
+    return []
+
+
+@app.get("/items/{item_id}")
+async def get_item(item_id: int):
+    return {"item_id": item_id}
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "path,location",
+    [
+        ["/items/", "/items"],
+        ["/users", "/users/"],
+        ["/items/?limit=10", "/items?limit=10"],
+        ["/items/1/", "/items/1"],
+        ["/items/1/?limit=10", "/items/1?limit=10"],
+    ],
+)
+def test_redirect_slashes(path, location):
+    response = client.get(path, allow_redirects=False)
+    assert response.status_code == 308
+    assert response.headers["location"] == location
+
+
+def test_redirect_is_followed():
+    response = client.get("/items/1/")
+    assert response.status_code == 200
+    assert response.json() == {"item_id": 1}
+
+
+@pytest.mark.parametrize("path", ["/unknown", "/unknown/", "/items/foo/"])
+def test_miss_is_not_found(path):
+    response = client.get(path, allow_redirects=False)
+    assert response.status_code == 404
+
+
+def test_redirect_slashes_disabled():
+    app = Squall(ignore_trailing_slashes=False, redirect_slashes=False)
+
+    @app.get("/items")
+    async def get_items():
+        return []
+
+    client = TestClient(app)
+    response = client.get("/items/", allow_redirects=False)
+    assert response.status_code == 404
+
+
+def test_ignore_trailing_slashes_takes_precedence():
+    app = Squall(ignore_trailing_slashes=True, redirect_slashes=True)
+
+    @app.get("/items")
+    async def get_items():
+        return []
+
+    client = TestClient(app)
+    response = client.get("/items/", allow_redirects=False)
+    assert response.status_code == 200
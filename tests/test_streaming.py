@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import pytest
+from squall import Query, Squall
+from squall.responses import JSONArrayResponse, NDJSONResponse
+from squall.testclient import TestClient
+
+
+@dataclass
+class Item:
+    id: int
+    name: str
+
+
+class SmallChunksResponse(JSONArrayResponse):
+    chunk_size = 16
+
+
+@pytest.fixture
+def app(compile_handlers):
+    app = Squall(compile_handlers=compile_handlers)
+
+    @app.get("/ndjson", response_class=NDJSONResponse)
+    async def get_ndjson(count: int = Query()) -> AsyncIterator[dict]:
+        for i in range(count):
+            yield {"id": i}
+
+    @app.get("/array", response_class=JSONArrayResponse)
+    async def get_array(count: int = Query()) -> AsyncIterator[dict]:
+        for i in range(count):
+            yield {"id": i}
+
+    @app.get("/items", response_class=JSONArrayResponse, response_model=Item)
+    async def get_items() -> AsyncIterator[Item]:
+        for i in range(2):
+            yield Item(id=i, name=f"item-{i}")
+
+    @app.get("/iterable", response_class=NDJSONResponse, status_code=206)
+    async def get_iterable():
+        async def rows():
+            yield 1
+            yield 2
+
+        return rows()
+
+    @app.get("/chunks", response_class=SmallChunksResponse)
+    async def get_chunks():
+        for i in range(10):
+            yield {"id": i}
+
+    return app
+
+
+def test_ndjson(app):
+    client = TestClient(app)
+    response = client.get("/ndjson?count=3")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-length" not in response.headers
+    assert response.content == b'{"id":0}\n{"id":1}\n{"id":2}\n'
+
+
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_json_array(app, count):
+    client = TestClient(app)
+    response = client.get(f"/array?count={count}")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [{"id": i} for i in range(count)]
+
+
+def test_items_serialized_with_response_model(app):
+    client = TestClient(app)
+    response = client.get("/items")
+    assert response.json() == [
+        {"id": 0, "name": "item-0"},
+        {"id": 1, "name": "item-1"},
+    ]
+
+
+def test_endpoint_returns_async_iterable(app):
+    client = TestClient(app)
+    response = client.get("/iterable")
+    assert response.status_code == 206
+    assert response.content == b"1\n2\n"
+
+
+def test_head(app):
+    client = TestClient(app)
+    response = client.head("/ndjson?count=3")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+def test_chunks_are_coalesced(app):
+    messages = []
+
+    async def recording_app(scope, receive, send):
+        async def record(message):
+            messages.append(message)
+            await send(message)
+
+        await app(scope, receive, record)
+
+    response = TestClient(recording_app).get("/chunks")
+    assert response.json() == [{"id": i} for i in range(10)]
+
+    bodies = [m for m in messages if m["type"] == "http.response.body"]
+    assert len(bodies) > 2
+    assert all(m["more_body"] for m in bodies[:-1])
+    assert all(len(m["body"]) >= 16 for m in bodies[:-1])
+    assert not bodies[-1].get("more_body", False)
+
+
+def test_openapi_describes_items(app):
+    client = TestClient(app)
+    schema = client.get("/openapi.json").json()
+    content = schema["paths"]["/items"]["get"]["responses"]["200"]["content"]
+    assert content["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/Item"
+    }